@@ -0,0 +1,3 @@
+"""
+PulseGlobe 基准测试
+"""
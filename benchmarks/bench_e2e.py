@@ -0,0 +1,235 @@
+"""
+端到端基准测试：KeywordOrchestrator.run + DataCollectionOrchestrator.collect
+
+所有外部服务（Tavily / TikHub / LLM / Embedding）由 benchmarks.fakes 中的替身提供；
+设置 PULSEGLOBE_BENCH_DSN 时使用本地 Postgres/pgvector 夹具，否则使用内存存储并关闭 RAG 通道。
+
+用法:
+    python -m benchmarks.bench_e2e [options]
+
+选项:
+    --sessions       会话数量 (默认: 10)
+    --concurrency    并发会话数 (默认: 2)
+    --chat-latency   LLM 平均延迟 ms (默认: 800)
+    --error-rate     所有替身服务的错误率 (默认: 0)
+    --output         JSON 报告路径 (默认: bench_e2e_report.json)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fakes import (
+    FakeBehavior,
+    FakeServices,
+    MemoryPacketStorage,
+    install_collection_fakes,
+    install_keyword_fakes,
+)
+from benchmarks.pg_fixture import PgVectorFixture
+
+logger = logging.getLogger("bench_e2e")
+
+# settings.yaml 中没有默认值的环境变量，替身模式下填充占位值
+PLACEHOLDER_ENV = {
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "",
+    "SILICONFLOW_API_KEY": "sk-fake",
+    "TAVILY_API_KEY": "tvly-fake",
+    "TIKHUB_API_TOKEN": "fake",
+    "XMOR_API_KEY": "sk-fake",
+}
+
+
+def percentile(values: list[float], p: float) -> float:
+    """线性插值百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize_latencies(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "mean_s": round(sum(values) / len(values), 4) if values else 0.0,
+        "p50_s": round(percentile(values, 50), 4),
+        "p95_s": round(percentile(values, 95), 4),
+        "max_s": round(max(values), 4) if values else 0.0,
+    }
+
+
+async def run_session(index: int, args, keyword_orchestrator, collection_orchestrator) -> dict:
+    """执行一个完整会话：关键词感知 → 数据采集"""
+    session_id = f"bench_{index:04d}_{int(time.time() * 1000) % 10**8}"
+    result = {"session_id": session_id, "ok": False}
+
+    start = time.perf_counter()
+    try:
+        state = await keyword_orchestrator.run(
+            country="蒙古",
+            query=f"蒙古国舆情基准测试 {index}",
+            session_id=session_id,
+        )
+        result["keyword_run_s"] = time.perf_counter() - start
+
+        collect_start = time.perf_counter()
+        collection = await collection_orchestrator.collect(
+            tavily_keywords=state["tavily_keywords"][:args.keywords_per_channel],
+            social_keywords=state["social_keywords"][:args.keywords_per_channel],
+            rag_keywords=state["rag_keywords"][:args.keywords_per_channel],
+            session_id=session_id,
+        )
+        result["collect_s"] = time.perf_counter() - collect_start
+        result["packets"] = collection.stats.get("total", 0)
+        result["ok"] = True
+    except Exception as e:
+        logger.error(f"[bench] 会话 {session_id} 失败: {e}")
+        result["error"] = str(e)
+
+    result["session_s"] = time.perf_counter() - start
+    return result
+
+
+async def run_benchmark(args) -> dict:
+    for key, value in PLACEHOLDER_ENV.items():
+        os.environ.setdefault(key, value)
+
+    fixture = PgVectorFixture.from_env()
+    if fixture:
+        fixture.setup(corpus_size=args.corpus_size, dimensions=args.dimensions)
+
+    # 配置单例需在夹具设置好数据库环境变量之后再加载
+    from pulseglobe.agents import KeywordOrchestrator, OrchestratorConfig
+    from pulseglobe.agents.collection_orchestrator import CollectionConfig, DataCollectionOrchestrator
+
+    rag_enabled = fixture is not None
+    fakes = FakeServices(
+        tavily=FakeBehavior(latency_ms=args.tavily_latency, error_rate=args.error_rate),
+        tikhub=FakeBehavior(latency_ms=args.tikhub_latency, error_rate=args.error_rate),
+        chat=FakeBehavior(latency_ms=args.chat_latency, error_rate=args.error_rate),
+        embeddings=FakeBehavior(latency_ms=args.embedding_latency, error_rate=args.error_rate),
+        seed=args.seed,
+    )
+
+    keyword_orchestrator = KeywordOrchestrator(OrchestratorConfig(
+        max_iterations=args.iterations,
+        rag_enabled=rag_enabled,
+        social_platforms=["twitter", "tiktok"],
+        social_post_count=3,
+    ))
+    install_keyword_fakes(keyword_orchestrator, fakes, args.dimensions)
+
+    collection_orchestrator = DataCollectionOrchestrator(CollectionConfig(
+        tavily_max_results=args.tavily_max_results,
+        social_platforms=["twitter", "tiktok"],
+        social_post_count=args.social_post_count,
+        social_comments_per_post=args.social_comments,
+        rag_enabled=rag_enabled,
+        rag_max_results=args.rag_max_results,
+        translation_provider="llm",
+    ))
+    install_collection_fakes(
+        collection_orchestrator, fakes, args.dimensions,
+        storage=None if fixture else MemoryPacketStorage(),
+    )
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def guarded(i: int):
+        async with semaphore:
+            return await run_session(i, args, keyword_orchestrator, collection_orchestrator)
+
+    wall_start = time.perf_counter()
+    sessions = await asyncio.gather(*(guarded(i) for i in range(args.sessions)))
+    wall = time.perf_counter() - wall_start
+
+    keyword_orchestrator.close()
+    collection_orchestrator.close()
+    if fixture:
+        fixture.teardown(drop=not args.keep_schema)
+
+    ok = [s for s in sessions if s["ok"]]
+    calls = fakes.stats.snapshot()
+    return {
+        "benchmark": "e2e",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "postgres" if fixture else "memory",
+            "rag_enabled": rag_enabled,
+        },
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "throughput": {
+            "sessions": len(sessions),
+            "succeeded": len(ok),
+            "wall_s": round(wall, 3),
+            "sessions_per_min": round(len(ok) / wall * 60, 3) if wall else 0.0,
+        },
+        "latency": {
+            "keyword_run": summarize_latencies([s["keyword_run_s"] for s in ok]),
+            "collect": summarize_latencies([s["collect_s"] for s in ok]),
+            "session": summarize_latencies([s["session_s"] for s in ok]),
+        },
+        "api_calls_per_session": {
+            service: round(count / max(len(sessions), 1), 2)
+            for service, count in sorted(calls["calls"].items())
+        },
+        "api_calls_total": calls["calls"],
+        "api_errors_total": calls["errors"],
+        "packets_per_session": round(sum(s.get("packets", 0) for s in ok) / max(len(ok), 1), 2),
+        "failed_sessions": [s for s in sessions if not s["ok"]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PulseGlobe 端到端基准测试（本地替身）")
+    parser.add_argument("--sessions", type=int, default=10, help="会话数量")
+    parser.add_argument("--concurrency", type=int, default=2, help="并发会话数")
+    parser.add_argument("--iterations", type=int, default=2, help="关键词感知最大迭代次数")
+    parser.add_argument("--keywords-per-channel", type=int, default=3, help="每个通道采集的关键词数")
+    parser.add_argument("--tavily-max-results", type=int, default=10)
+    parser.add_argument("--social-post-count", type=int, default=5)
+    parser.add_argument("--social-comments", type=int, default=5)
+    parser.add_argument("--rag-max-results", type=int, default=15)
+    parser.add_argument("--tavily-latency", type=float, default=400, help="Tavily 平均延迟 ms")
+    parser.add_argument("--tikhub-latency", type=float, default=300, help="TikHub 平均延迟 ms")
+    parser.add_argument("--chat-latency", type=float, default=800, help="LLM 平均延迟 ms")
+    parser.add_argument("--embedding-latency", type=float, default=80, help="Embedding 平均延迟 ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="替身服务错误率")
+    parser.add_argument("--corpus-size", type=int, default=2000, help="夹具新闻语料规模")
+    parser.add_argument("--dimensions", type=int, default=2560, help="向量维度")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-schema", action="store_true", help="保留夹具 schema 便于排查")
+    parser.add_argument("--output", default="bench_e2e_report.json", help="JSON 报告路径")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger.setLevel(logging.INFO)
+
+    report = asyncio.run(run_benchmark(args))
+
+    Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    throughput = report["throughput"]
+    latency = report["latency"]["session"]
+    print(f"会话: {throughput['succeeded']}/{throughput['sessions']} | "
+          f"吞吐: {throughput['sessions_per_min']} 会话/分钟 | "
+          f"p50={latency['p50_s']}s p95={latency['p95_s']}s")
+    print(f"每会话 API 调用: {report['api_calls_per_session']}")
+    print(f"报告已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+数据包微基准：内存占用与哈希吞吐
+
+对比三种表示:
+    legacy  原 DataPacket（普通 dataclass，每次读取 content_hash 都重新计算）
+    slots   当前 DataPacket（__slots__ + 哈希缓存）
+    batch   PacketBatch（列式并行数组）
+
+用法:
+    python -m benchmarks.bench_packets [--count 100000] [--reads 3] [--output report.json]
+"""
+import argparse
+import gc
+import hashlib
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.models import DataPacket, PacketBatch
+
+
+@dataclass
+class LegacyDataPacket:
+    """改造前的数据包定义（用于对照）"""
+    session_id: str
+    source_type: str
+    source_detail: str = ""
+    keyword: str = ""
+    keyword_type: str = ""
+    title: str = ""
+    content: str = ""
+    content_zh: str = ""
+    summary: str = ""
+    url: str = ""
+    author: str = ""
+    publish_date: Optional[datetime] = None
+    platform: str = ""
+    engagement: dict = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.now)
+    tags: list[str] = field(default_factory=list)
+    id: Optional[int] = None
+
+    @property
+    def content_hash(self) -> str:
+        text = f"{self.source_type}:{self.url}:{self.title}:{self.content[:500]}"
+        return hashlib.sha256(text.encode()).hexdigest()
+
+
+def make_fields(count: int) -> list[dict]:
+    """生成测试字段（字符串在测量前创建，只比较容器开销）"""
+    return [
+        {
+            "session_id": "sess_bench",
+            "source_type": "social",
+            "source_detail": "twitter",
+            "keyword": f"keyword {i % 50}",
+            "keyword_type": "social",
+            "title": f"title {i}",
+            "content": f"content {i} " * 40,
+            "content_zh": f"内容 {i} " * 40,
+            "summary": f"摘要 {i}",
+            "url": f"https://twitter.com/u/status/{i}",
+            "author": f"user{i % 1000}",
+            "platform": "twitter",
+        }
+        for i in range(count)
+    ]
+
+
+def measure_memory(build) -> int:
+    """测量 build() 返回对象保留的内存（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return after - before
+
+
+def bench_memory(rows: list[dict]) -> dict:
+    count = len(rows)
+    legacy = measure_memory(lambda: [LegacyDataPacket(**r) for r in rows])
+    slots = measure_memory(lambda: [DataPacket(**r) for r in rows])
+    # 批次只保留列数组，数据包在构建后即可释放
+    batch = measure_memory(lambda: PacketBatch.from_packets(DataPacket(**r) for r in rows))
+    return {
+        name: {"total_mb": round(size / 2**20, 2), "bytes_per_packet": round(size / count, 1)}
+        for name, size in (("legacy", legacy), ("slots", slots), ("batch", batch))
+    }
+
+
+def _rate(count: int, seconds: float) -> float:
+    return round(count / seconds) if seconds else 0.0
+
+
+def bench_hash(rows: list[dict], reads: int) -> dict:
+    """
+    模拟一个数据包在流程中被读取 reads 次哈希（to_dict / save_packet / 去重检查）
+    """
+    count = len(rows)
+    legacy_packets = [LegacyDataPacket(**r) for r in rows]
+    slot_packets = [DataPacket(**r) for r in rows]
+
+    start = time.perf_counter()
+    for _ in range(reads):
+        for p in legacy_packets:
+            p.content_hash
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(reads):
+        for p in slot_packets:
+            p.content_hash
+    slots_s = time.perf_counter() - start
+
+    batch = PacketBatch.from_packets(DataPacket(**r) for r in rows)
+    start = time.perf_counter()
+    for _ in range(reads):
+        batch.content_hashes()
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    unique = batch.dedup()
+    dedup_s = time.perf_counter() - start
+
+    return {
+        "reads_per_packet": reads,
+        "legacy": {"seconds": round(legacy_s, 4), "packets_per_s": _rate(count, legacy_s)},
+        "slots": {"seconds": round(slots_s, 4), "packets_per_s": _rate(count, slots_s)},
+        "batch": {"seconds": round(batch_s, 4), "packets_per_s": _rate(count, batch_s)},
+        "batch_dedup": {"seconds": round(dedup_s, 4), "unique": len(unique)},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据包内存与哈希微基准")
+    parser.add_argument("--count", type=int, default=100_000, help="数据包数量")
+    parser.add_argument("--reads", type=int, default=3, help="每个数据包读取哈希的次数")
+    parser.add_argument("--output", default=None, help="可选的 JSON 报告路径")
+    args = parser.parse_args()
+
+    rows = make_fields(args.count)
+    report = {
+        "benchmark": "packets",
+        "count": args.count,
+        "python": sys.version.split()[0],
+        "memory": bench_memory(rows),
+        "hash": bench_hash(rows, args.reads),
+    }
+
+    print(f"内存（{args.count} 个数据包，不含共享字符串）:")
+    for name, item in report["memory"].items():
+        print(f"  {name:<8} {item['total_mb']:>8} MB  {item['bytes_per_packet']:>8} B/包")
+    print(f"哈希（每包读取 {args.reads} 次）:")
+    for name in ("legacy", "slots", "batch"):
+        item = report["hash"][name]
+        print(f"  {name:<8} {item['seconds']:>8}s  {item['packets_per_s']:>10} 包/s")
+    print(f"  dedup    {report['hash']['batch_dedup']['seconds']:>8}s")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
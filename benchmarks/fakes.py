@@ -0,0 +1,363 @@
+"""
+基准测试用的本地替身服务
+基于 httpx.MockTransport 模拟 Tavily / TikHub / OpenAI 兼容的 Chat 与 Embeddings 接口，
+延迟与错误率可配置，并统计每个服务的调用次数
+"""
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+import httpx
+
+
+@dataclass
+class FakeBehavior:
+    """单个替身服务的行为配置"""
+    latency_ms: float = 50.0        # 平均延迟
+    jitter: float = 0.3             # 延迟抖动比例（均匀分布 ±jitter）
+    error_rate: float = 0.0         # 返回错误的概率
+    error_status: int = 500         # 错误时的 HTTP 状态码（可设为 429）
+
+    def sample_latency(self, rng: random.Random) -> float:
+        low = max(0.0, 1 - self.jitter)
+        return self.latency_ms * rng.uniform(low, 1 + self.jitter) / 1000
+
+    def should_fail(self, rng: random.Random) -> bool:
+        return self.error_rate > 0 and rng.random() < self.error_rate
+
+
+@dataclass
+class CallStats:
+    """调用统计（线程安全，embedding 同步调用可能来自线程池）"""
+    calls: Counter = field(default_factory=Counter)
+    errors: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, service: str, failed: bool):
+        with self._lock:
+            self.calls[service] += 1
+            if failed:
+                self.errors[service] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"calls": dict(self.calls), "errors": dict(self.errors)}
+
+
+def _words(text: str) -> list[str]:
+    """粗略分词：拉丁/西里尔单词 + 中文单字"""
+    return re.findall(r"[一-鿿]|[^\W\d_]+", text.lower())
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_vector(word: str, dimensions: int) -> tuple[float, ...]:
+    """单个词的确定性随机向量（以词哈希为种子的标准正态分布）"""
+    seed = int.from_bytes(hashlib.blake2b(word.encode(), digest_size=8).digest(), "little")
+    rng = random.Random(seed)
+    return tuple(rng.gauss(0.0, 1.0) for _ in range(dimensions))
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    """
+    确定性的伪 embedding：按词哈希生成随机向量再求和归一化，
+    共享词越多的文本余弦相似度越高
+    """
+    vector = [0.0] * dimensions
+    for word in _words(text)[:256] or [text]:
+        vector = [a + b for a, b in zip(vector, _word_vector(word, dimensions))]
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+class FakeServices:
+    """
+    替身服务集合
+
+    每个 handler 都可直接传给 httpx.MockTransport；
+    Chat 按 prompt 内容返回关键词 JSON / 翻译 / 摘要
+    """
+
+    def __init__(
+        self,
+        tavily: FakeBehavior = None,
+        tikhub: FakeBehavior = None,
+        chat: FakeBehavior = None,
+        embeddings: FakeBehavior = None,
+        seed: int = 42,
+    ):
+        self.tavily = tavily or FakeBehavior(latency_ms=400)
+        self.tikhub = tikhub or FakeBehavior(latency_ms=300)
+        self.chat = chat or FakeBehavior(latency_ms=800)
+        self.embeddings = embeddings or FakeBehavior(latency_ms=80)
+        self.stats = CallStats()
+        self._rng = random.Random(seed)
+        self._keyword_counter = 0
+
+    # ============ 通用 ============
+
+    def _error_response(self, behavior: FakeBehavior, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            behavior.error_status,
+            json={"error": {"message": "fake upstream error", "type": "server_error"}},
+            request=request,
+        )
+
+    async def _async_gate(self, service: str, behavior: FakeBehavior) -> bool:
+        """模拟延迟，返回本次是否失败"""
+        await asyncio.sleep(behavior.sample_latency(self._rng))
+        failed = behavior.should_fail(self._rng)
+        self.stats.record(service, failed)
+        return failed
+
+    def _sync_gate(self, service: str, behavior: FakeBehavior) -> bool:
+        time.sleep(behavior.sample_latency(self._rng))
+        failed = behavior.should_fail(self._rng)
+        self.stats.record(service, failed)
+        return failed
+
+    def _fresh_keywords(self, prefix: str, count: int) -> list[str]:
+        keywords = []
+        for _ in range(count):
+            self._keyword_counter += 1
+            keywords.append(f"{prefix}{self._keyword_counter}")
+        return keywords
+
+    # ============ Tavily ============
+
+    async def tavily_handler(self, request: httpx.Request) -> httpx.Response:
+        if await self._async_gate("tavily", self.tavily):
+            return self._error_response(self.tavily, request)
+
+        body = json.loads(request.content or b"{}")
+        query = body.get("query", "")
+        max_results = body.get("max_results") or 5
+        results = [
+            {
+                "title": f"{query} news {i}",
+                "url": f"https://news.example.com/{abs(hash(query)) % 10000}/{i}",
+                "content": f"Mongolia {query} report {i}. " * 20,
+                "published_date": "2025-01-01",
+                "score": 1 - i / 100,
+            }
+            for i in range(max_results)
+        ]
+        return httpx.Response(200, json={"query": query, "results": results}, request=request)
+
+    # ============ TikHub ============
+
+    async def tikhub_handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        service = "tikhub_comments" if "comments" in path else "tikhub_search"
+        if await self._async_gate(service, self.tikhub):
+            return self._error_response(self.tikhub, request)
+
+        params = request.url.params
+        keyword = params.get("keyword", "")
+        count = int(params.get("count", 10))
+
+        if path.endswith("/twitter/web/fetch_search_timeline"):
+            data = {"timeline": [
+                {"type": "tweet", "tweet_id": f"{i}{abs(hash(keyword)) % 10**8}",
+                 "text": f"{keyword} tweet {i}", "favorites": i * 10, "retweets": i, "views": i * 100,
+                 "user_info": {"name": f"user{i}", "screen_name": f"user{i}"}}
+                for i in range(20)
+            ]}
+        elif path.endswith("/twitter/web/fetch_post_comments"):
+            data = {"thread": [{"text": f"reply {i}", "author": {"name": f"r{i}"}} for i in range(20)]}
+        elif path.endswith("/tiktok/web/fetch_search_video"):
+            data = {"videos": [
+                {"aweme_id": f"{i}{abs(hash(keyword)) % 10**8}", "desc": f"{keyword} video {i}",
+                 "author": {"unique_id": f"u{i}", "nickname": f"u{i}"},
+                 "statistics": {"digg_count": i, "play_count": i * 50, "comment_count": i}}
+                for i in range(count)
+            ]}
+        elif path.endswith("/youtube/web/search_videos"):
+            data = {"videos": [
+                {"video_id": f"v{i}{abs(hash(keyword)) % 10**6}", "title": f"{keyword} {i}",
+                 "description": f"{keyword} description {i}", "channel_name": f"c{i}",
+                 "view_count": i * 100, "like_count": i}
+                for i in range(count)
+            ]}
+        elif "comments" in path:
+            data = {"comments": [{"text": f"comment {i}", "user": {"nickname": f"n{i}"}} for i in range(count)]}
+        else:
+            data = {"posts": []}
+
+        return httpx.Response(200, json={"code": 200, "message": "ok", "data": data}, request=request)
+
+    # ============ OpenAI 兼容接口 ============
+
+    def _chat_reply(self, prompt: str) -> str:
+        """根据 prompt 类型构造回复"""
+        if '"keywords"' in prompt:
+            return json.dumps({"keywords": self._fresh_keywords("kw", 5), "reasoning": "fake"})
+        if '"tavily_new"' in prompt:
+            # 新关键词数量逐渐减少，使迭代能够收敛
+            count = self._rng.choice([0, 1, 2])
+            return json.dumps({
+                "tavily_new": self._fresh_keywords("tv", count),
+                "social_new": self._fresh_keywords("#so", count),
+                "rag_new": self._fresh_keywords("新闻", count),
+                "reasoning": "fake",
+            }, ensure_ascii=False)
+        if "摘要" in prompt:
+            return "这是一条自动生成的摘要。"
+        # 翻译：返回原文最后一段
+        return prompt.rsplit("\n\n", 1)[-1][:2000]
+
+    async def chat_handler(self, request: httpx.Request) -> httpx.Response:
+        if await self._async_gate("chat", self.chat):
+            return self._error_response(self.chat, request)
+
+        body = json.loads(request.content)
+        prompt = body["messages"][-1]["content"]
+        if isinstance(prompt, list):
+            prompt = " ".join(part.get("text", "") for part in prompt)
+        content = self._chat_reply(prompt)
+        return httpx.Response(200, json={
+            "id": "chatcmpl-fake",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2,
+                      "total_tokens": (len(prompt) + len(content)) // 2},
+        }, request=request)
+
+    def _embedding_response(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        inputs = body["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = body.get("dimensions") or 2560
+        data = [
+            {"object": "embedding", "index": i,
+             "embedding": fake_embedding(text if isinstance(text, str) else str(text), dimensions)}
+            for i, text in enumerate(inputs)
+        ]
+        tokens = sum(len(str(t)) for t in inputs) // 2
+        return httpx.Response(200, json={
+            "object": "list", "data": data, "model": body.get("model", "fake"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }, request=request)
+
+    def embeddings_handler(self, request: httpx.Request) -> httpx.Response:
+        """同步版本（OpenAIEmbeddings.embed_query 使用同步客户端）"""
+        if self._sync_gate("embeddings", self.embeddings):
+            return self._error_response(self.embeddings, request)
+        return self._embedding_response(request)
+
+    async def async_embeddings_handler(self, request: httpx.Request) -> httpx.Response:
+        if await self._async_gate("embeddings", self.embeddings):
+            return self._error_response(self.embeddings, request)
+        return self._embedding_response(request)
+
+    # ============ 客户端工厂 ============
+
+    def tavily_client(self):
+        from tavily import AsyncTavilyClient
+        http = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.tavily_handler),
+            base_url="https://api.tavily.com",
+        )
+        return AsyncTavilyClient(api_key="tvly-fake", client=http)
+
+    def tikhub_client(self, base_url: str = "https://api.tikhub.io") -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.tikhub_handler), base_url=base_url)
+
+    def chat_model(self, json_mode: bool = False):
+        from langchain_openai import ChatOpenAI
+        kwargs = {"model_kwargs": {"response_format": {"type": "json_object"}}} if json_mode else {}
+        return ChatOpenAI(
+            model="fake-chat",
+            api_key="sk-fake",
+            base_url="https://llm.fake/v1",
+            http_async_client=httpx.AsyncClient(transport=httpx.MockTransport(self.chat_handler)),
+            **kwargs,
+        )
+
+    def embedding_model(self, dimensions: int):
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(
+            model="fake-embedding",
+            api_key="sk-fake",
+            base_url="https://embedding.fake/v1",
+            dimensions=dimensions,
+            check_embedding_ctx_length=False,
+            http_client=httpx.Client(transport=httpx.MockTransport(self.embeddings_handler)),
+            http_async_client=httpx.AsyncClient(transport=httpx.MockTransport(self.async_embeddings_handler)),
+        )
+
+
+class MemoryPacketStorage:
+    """无数据库时使用的内存版 PacketStorage"""
+
+    def __init__(self):
+        self.packets = {}
+
+    def save_packets(self, packets: list) -> dict:
+        saved = 0
+        for packet in packets:
+            key = (packet.session_id, packet.content_hash)
+            if key not in self.packets:
+                self.packets[key] = packet
+                saved += 1
+        return {"saved": saved, "duplicates": len(packets) - saved}
+
+    def get_session_stats(self, session_id: str) -> dict:
+        stats = {"total": 0}
+        for (sid, _), packet in self.packets.items():
+            if sid == session_id:
+                stats[packet.source_type] = stats.get(packet.source_type, 0) + 1
+                stats["total"] += 1
+        return stats
+
+    def close(self):
+        pass
+
+
+# ============ 注入替身 ============
+
+def install_keyword_fakes(orchestrator, fakes: FakeServices, dimensions: int):
+    """替换 KeywordOrchestrator 及其 Worker 的外部客户端"""
+    orchestrator.llm = fakes.chat_model(json_mode=True)
+    for worker in (orchestrator.tavily_worker, orchestrator.social_worker, orchestrator.rag_worker):
+        if worker is not None:
+            worker.llm = fakes.chat_model(json_mode=True)
+    if orchestrator.tavily_worker:
+        orchestrator.tavily_worker.client = fakes.tavily_client()
+    if orchestrator.social_worker and orchestrator.social_worker.client:
+        orchestrator.social_worker.client.client = fakes.tikhub_client()
+    if orchestrator.rag_worker:
+        orchestrator.rag_worker.retriever.embeddings = fakes.embedding_model(dimensions)
+
+
+def install_collection_fakes(orchestrator, fakes: FakeServices, dimensions: int, storage=None):
+    """替换 DataCollectionOrchestrator 及其采集器的外部客户端"""
+    chat = fakes.chat_model()
+    translator = orchestrator.translator.translator
+    if hasattr(translator, "llm"):
+        translator.llm = chat
+    else:
+        translator.client = httpx.AsyncClient(transport=httpx.MockTransport(fakes.chat_handler))
+    orchestrator.summarizer.llm = chat
+
+    if orchestrator.tavily_collector:
+        orchestrator.tavily_collector.client = fakes.tavily_client()
+    if orchestrator.social_collector and orchestrator.social_collector.client:
+        orchestrator.social_collector.client = fakes.tikhub_client(
+            base_url=str(orchestrator.social_collector.client.base_url)
+        )
+    if orchestrator.rag_collector:
+        orchestrator.rag_collector.retriever.embeddings = fakes.embedding_model(dimensions)
+    if storage is not None:
+        orchestrator.storage = storage
@@ -9,6 +9,8 @@ from dataclasses import dataclass, field
 from typing import Optional
 
 from pulseglobe.agents.collectors import TavilyCollector, SocialCollector, RAGCollector
+from pulseglobe.core.tracing import span, trace_context
+from pulseglobe.services.retrieval import RetrievalOptions
 from pulseglobe.services.storage import PacketStorage
 from pulseglobe.services.translation import TranslationService
 from pulseglobe.services.summarization import SummarizationService
@@ -33,6 +35,10 @@ class CollectionConfig:
     # RAG 配置
     rag_enabled: bool = True
     rag_max_results: int = 15
+    rag_country: Optional[str] = None      # None 表示使用 settings.yaml 中 rag 段的默认值
+    rag_date_from: Optional[str] = None
+    rag_date_to: Optional[str] = None
+    rag_recent_days: Optional[int] = None
     
     # 翻译配置
     translation_provider: str = "xmor"  # "xmor" 或 "llm"
@@ -92,6 +98,12 @@ class DataCollectionOrchestrator:
         
         self.rag_collector = RAGCollector(
             max_results=self.config.rag_max_results,
+            options=RetrievalOptions.from_config(
+                country=self.config.rag_country,
+                date_from=self.config.rag_date_from,
+                date_to=self.config.rag_date_to,
+                recent_days=self.config.rag_recent_days,
+            ),
             translator=self.translator,
             summarizer=self.summarizer,
         ) if self.config.rag_enabled else None
@@ -115,12 +127,23 @@ class DataCollectionOrchestrator:
         Returns:
             CollectionResult 包含 session_id 和统计信息
         """
-        start_time = datetime.now()
-        
         # 生成 session_id
         if not session_id:
             session_id = f"sess_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
+        with trace_context(session_id=session_id), span("collection_orchestrator.collect"):
+            return await self._collect(tavily_keywords, social_keywords, rag_keywords, session_id)
+    
+    async def _collect(
+        self,
+        tavily_keywords: list[str],
+        social_keywords: list[str],
+        rag_keywords: list[str],
+        session_id: str,
+    ) -> CollectionResult:
+        """collect 的执行主体"""
+        start_time = datetime.now()
+        
         logger.info(f"{'='*70}")
         logger.info(f"[DataCollectionOrchestrator] ▶ 开始数据采集")
         logger.info(f"[DataCollectionOrchestrator]   Session: {session_id}")
@@ -169,7 +192,8 @@ class DataCollectionOrchestrator:
         
         # 存储数据
         logger.info(f"\n[DataCollectionOrchestrator] 💾 存储数据包...")
-        save_result = self.storage.save_packets(all_packets)
+        with span("storage.save_packets", packet_count=len(all_packets)):
+            save_result = self.storage.save_packets(all_packets)
         
         # 获取统计
         stats = self.storage.get_session_stats(session_id)
@@ -200,23 +224,13 @@ class DataCollectionOrchestrator:
         keyword_type: str,
         session_id: str,
     ) -> list[DataPacket]:
-        """采集单个通道的所有关键词"""
-        all_packets = []
-        
-        for i, keyword in enumerate(keywords, 1):
-            logger.info(f"[DataCollectionOrchestrator]   [{i}/{len(keywords)}] '{keyword}'")
-            try:
-                packets = await collector.collect(
-                    session_id=session_id,
-                    keyword=keyword,
-                    keyword_type=keyword_type,
-                )
-                all_packets.extend(packets)
-            except Exception as e:
-                logger.warning(f"[DataCollectionOrchestrator]   ✗ 采集失败: {e}")
-                continue
-        
-        return all_packets
+        """采集单个通道的所有关键词（RAG 通道整批检索，见 RAGCollector.collect_batch）"""
+        with span("collection.channel", channel=keyword_type, keyword_count=len(keywords)):
+            return await collector.collect_batch(
+                session_id=session_id,
+                keywords=keywords,
+                keyword_type=keyword_type,
+            )
     
     def close(self):
         """关闭资源"""
@@ -6,6 +6,7 @@ import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
 
+from pulseglobe.core.tracing import span, trace_context
 from pulseglobe.models.data_packet import DataPacket
 from pulseglobe.services.translation import TranslationService
 from pulseglobe.services.summarization import SummarizationService
@@ -67,16 +68,70 @@ class BaseCollector(ABC):
         Returns:
             DataPacket 列表
         """
+        with (
+            trace_context(keyword=keyword),
+            span("collector.collect", collector=self.__class__.__name__, source_type=self.source_type),
+        ):
+            return await self._collect(session_id, keyword, keyword_type)
+    
+    async def _collect(
+        self,
+        session_id: str,
+        keyword: str,
+        keyword_type: str,
+    ) -> list[DataPacket]:
+        """collect 的执行主体"""
         logger.info(f"[{self.__class__.__name__}] 🔍 采集关键词: '{keyword}'")
         
         # 1. 搜索
         try:
-            raw_results = await self.search(keyword)
+            with span("collector.search", collector=self.__class__.__name__) as s:
+                raw_results = await self.search(keyword)
+                s.set_attribute("result_count", len(raw_results))
             logger.info(f"[{self.__class__.__name__}]   获取 {len(raw_results)} 条原始结果")
         except Exception as e:
             logger.error(f"[{self.__class__.__name__}]   搜索失败: {e}")
             return []
         
+        return await self._process_results(raw_results, session_id, keyword, keyword_type)
+    
+    async def collect_batch(
+        self,
+        session_id: str,
+        keywords: list[str],
+        keyword_type: str,
+    ) -> list[DataPacket]:
+        """
+        采集整个关键词列表
+        
+        默认逐个关键词执行 collect；支持批量检索的采集器（如 RAG）可覆盖为一次搜索
+        
+        Returns:
+            所有关键词的 DataPacket 列表
+        """
+        all_packets = []
+        for i, keyword in enumerate(keywords, 1):
+            logger.info(f"[{self.__class__.__name__}]   [{i}/{len(keywords)}] '{keyword}'")
+            try:
+                packets = await self.collect(
+                    session_id=session_id,
+                    keyword=keyword,
+                    keyword_type=keyword_type,
+                )
+                all_packets.extend(packets)
+            except Exception as e:
+                logger.warning(f"[{self.__class__.__name__}]   ✗ 采集失败: {e}")
+                continue
+        return all_packets
+    
+    async def _process_results(
+        self,
+        raw_results: list[dict],
+        session_id: str,
+        keyword: str,
+        keyword_type: str,
+    ) -> list[DataPacket]:
+        """翻译、摘要并构建数据包"""
         if not raw_results:
             return []
         
@@ -84,12 +139,13 @@ class BaseCollector(ABC):
         packets = []
         for i, item in enumerate(raw_results):
             try:
-                packet = await self._process_item(
-                    item=item,
-                    session_id=session_id,
-                    keyword=keyword,
-                    keyword_type=keyword_type,
-                )
+                with span("collector.process_item", index=i):
+                    packet = await self._process_item(
+                        item=item,
+                        session_id=session_id,
+                        keyword=keyword,
+                        keyword_type=keyword_type,
+                    )
                 if packet:
                     packets.append(packet)
             except Exception as e:
@@ -120,11 +176,13 @@ class BaseCollector(ABC):
                 content += "\n\n【评论】\n" + "\n".join(comment_texts[:10])
         
         # 翻译（如果需要）
-        content_zh = await self.translator.translate_if_needed(content)
-        title_zh = await self.translator.translate_if_needed(title) if title else ""
+        with span("collector.translate", chars=len(content) + len(title)):
+            content_zh = await self.translator.translate_if_needed(content)
+            title_zh = await self.translator.translate_if_needed(title) if title else ""
         
         # 生成摘要
-        summary = await self.summarizer.summarize(content_zh, title_zh)
+        with span("collector.summarize", chars=len(content_zh)):
+            summary = await self.summarizer.summarize(content_zh, title_zh)
         
         # 构建数据包
         return DataPacket(
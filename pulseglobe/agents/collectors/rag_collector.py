@@ -4,11 +4,9 @@ RAG 数据采集器
 """
 import logging
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from langchain_openai import OpenAIEmbeddings
-
-from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span, trace_context
+from pulseglobe.models.data_packet import DataPacket
+from pulseglobe.services.retrieval import RetrievalOptions, create_retriever
 from .base import BaseCollector
 
 logger = logging.getLogger(__name__)
@@ -17,37 +15,17 @@ logger = logging.getLogger(__name__)
 class RAGCollector(BaseCollector):
     """RAG 向量检索采集器"""
     
-    def __init__(self, max_results: int = 15, **kwargs):
+    def __init__(self, max_results: int = 15, options: RetrievalOptions = None, **kwargs):
         """
         Args:
             max_results: 每个关键词的最大结果数（默认15）
+            options: 检索参数（模式、日期/国家过滤等），默认读取 settings.yaml 的 rag 段
         """
         super().__init__(**kwargs)
         
-        config = get_config()
-        
-        # 数据库配置
-        db_config = config.database
-        self.db_config = {
-            "host": db_config.get("host"),
-            "port": db_config.get("port"),
-            "dbname": db_config.get("name"),
-            "user": db_config.get("user"),
-            "password": db_config.get("password"),
-        }
-        self.table_name = db_config.get("table", "pulseglobe_news")
-        
-        # Embedding 模型
-        embedding_config = config.embedding
-        self.embeddings = OpenAIEmbeddings(
-            model=embedding_config.get("model", "Qwen/Qwen3-Embedding-4B"),
-            api_key=embedding_config.get("api_key"),
-            base_url=embedding_config.get("base_url"),
-            dimensions=embedding_config.get("dimensions", 2560),
-        )
+        self.retriever = create_retriever(options=options)
         
         self.max_results = max_results
-        self._conn = None
         
         logger.info(f"[RAGCollector] 初始化完成，max_results={max_results}")
     
@@ -59,54 +37,90 @@ class RAGCollector(BaseCollector):
     def source_detail(self) -> str:
         return "news_db"
     
-    def _get_connection(self):
-        if self._conn is None or self._conn.closed:
-            self._conn = psycopg2.connect(**self.db_config)
-        return self._conn
-    
     async def search(self, keyword: str) -> list[dict]:
-        """执行向量检索"""
+        """检索新闻库（向量或混合检索，后端见 create_retriever）"""
         try:
-            # 生成查询向量
-            query_embedding = self.embeddings.embed_query(keyword)
-            
-            conn = self._get_connection()
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    f"""
-                    SELECT 
-                        title,
-                        content,
-                        url,
-                        source_name,
-                        publish_date,
-                        1 - (embedding <=> %s::vector) as similarity
-                    FROM {self.table_name}
-                    WHERE embedding IS NOT NULL
-                    ORDER BY embedding <=> %s::vector
-                    LIMIT %s
-                    """,
-                    (query_embedding, query_embedding, self.max_results)
-                )
-                
-                results = []
-                for row in cur.fetchall():
-                    results.append({
-                        "title": row["title"] or "",
-                        "content": row["content"] or "",
-                        "url": row["url"] or "",
-                        "author": row.get("source_name", ""),
-                        "publish_date": row.get("publish_date"),
-                        "platform": "news_db",
-                        "engagement": {"similarity": float(row["similarity"]) if row["similarity"] else 0},
-                    })
-            
-            return results
+            return [self._format(row) for row in self.retriever.search(keyword, limit=self.max_results)]
             
         except Exception as e:
             logger.error(f"[RAGCollector] 检索失败: {e}")
             raise
     
+    async def collect_batch(
+        self,
+        session_id: str,
+        keywords: list[str],
+        keyword_type: str,
+    ) -> list[DataPacket]:
+        """
+        整个关键词列表一次检索，按文章去重后再翻译、摘要
+        
+        相关关键词常召回同一批文章，去重后每篇只调用一次翻译和摘要；
+        批量检索失败时退回逐个关键词采集，只丢失检索失败的关键词
+        """
+        logger.info(f"[RAGCollector] 🔍 批量检索 {len(keywords)} 个关键词")
+        try:
+            with span("collector.search_batch", collector="RAGCollector", keyword_count=len(keywords)) as s:
+                batch = self.retriever.search_many(keywords, limit=self.max_results)
+                s.set_attribute("result_count", sum(len(rows) for rows in batch.values()))
+        except Exception as e:
+            logger.error(f"[RAGCollector]   批量检索失败，改为逐个关键词采集: {e}")
+            return await super().collect_batch(session_id, keywords, keyword_type)
+        
+        grouped = self._dedup(batch)
+        total = sum(len(rows) for rows in batch.values())
+        unique = sum(len(items) for items in grouped.values())
+        logger.info(f"[RAGCollector]   跨关键词去重: {total} 条 → {unique} 篇")
+        
+        all_packets = []
+        for keyword, items in grouped.items():
+            logger.info(f"[RAGCollector]   '{keyword}': {len(items)} 篇")
+            with (
+                trace_context(keyword=keyword),
+                span("collector.collect", collector="RAGCollector", source_type=self.source_type),
+            ):
+                packets = await self._process_results(items, session_id, keyword, keyword_type)
+            all_packets.extend(packets)
+        return all_packets
+    
+    def _dedup(self, batch: dict[str, list[dict]]) -> dict[str, list[dict]]:
+        """
+        按文章（doc_id，缺失时用 url）合并多个关键词的检索结果
+        
+        每篇文章只处理一次，归入相似度最高的关键词；engagement 记录最高相似度
+        和所有命中的关键词（按相似度降序）
+        
+        Returns:
+            {最佳关键词: [搜索结果, ...]}
+        """
+        articles = {}
+        for keyword, rows in batch.items():
+            for row in rows:
+                key = row.get("doc_id") or row["url"]
+                entry = articles.setdefault(key, {"row": row, "matches": {}})
+                entry["matches"][keyword] = max(row["similarity"], entry["matches"].get(keyword, float("-inf")))
+                if row["similarity"] > entry["row"]["similarity"]:
+                    entry["row"] = row
+        
+        grouped = {}
+        for entry in articles.values():
+            matches = sorted(entry["matches"].items(), key=lambda kv: kv[1], reverse=True)
+            item = self._format(entry["row"])
+            item["engagement"]["matched_keywords"] = [keyword for keyword, _ in matches]
+            grouped.setdefault(matches[0][0], []).append(item)
+        return grouped
+    
+    @staticmethod
+    def _format(row: dict) -> dict:
+        return {
+            "title": row["title"],
+            "content": row["content"],
+            "url": row["url"],
+            "author": row["source_name"],
+            "publish_date": row["publish_date"],
+            "platform": "news_db",
+            "engagement": {"similarity": row["similarity"]},
+        }
+    
     def close(self):
-        if self._conn and not self._conn.closed:
-            self._conn.close()
+        self.retriever.close()
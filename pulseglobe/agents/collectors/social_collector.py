@@ -7,6 +7,7 @@ import logging
 import httpx
 
 from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
 from .base import BaseCollector
 
 logger = logging.getLogger(__name__)
@@ -102,7 +103,9 @@ class SocialCollector(BaseCollector):
     
     async def _api_get(self, endpoint: str, params: dict) -> dict:
         """API GET 请求"""
-        response = await self.client.get(endpoint, params=params)
+        with span("http.tikhub", endpoint=endpoint) as s:
+            response = await self.client.get(endpoint, params=params)
+            s.set_attribute("status_code", response.status_code)
         response.raise_for_status()
         data = response.json()
         if data.get("code") != 200:
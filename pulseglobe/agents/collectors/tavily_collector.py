@@ -7,6 +7,7 @@ import logging
 from tavily import AsyncTavilyClient
 
 from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
 from .base import BaseCollector
 
 logger = logging.getLogger(__name__)
@@ -43,12 +44,13 @@ class TavilyCollector(BaseCollector):
     async def search(self, keyword: str) -> list[dict]:
         """执行 Tavily 搜索"""
         try:
-            response = await self.client.search(
-                query=keyword,
-                search_depth="advanced",  # 更深度的搜索
-                max_results=self.max_results,
-                include_answer=False,
-            )
+            with span("http.tavily.search", search_depth="advanced"):
+                response = await self.client.search(
+                    query=keyword,
+                    search_depth="advanced",  # 更深度的搜索
+                    max_results=self.max_results,
+                    include_answer=False,
+                )
             
             results = []
             for item in response.get("results", []):
@@ -58,6 +60,7 @@ class TavilyCollector(BaseCollector):
                     "url": item.get("url", ""),
                     "publish_date": item.get("published_date"),
                     "platform": "web",
+                    "engagement": {"score": item.get("score", 0)},
                 })
             
             return results
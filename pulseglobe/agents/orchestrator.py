@@ -6,6 +6,7 @@ Orchestrator Agent
 import asyncio
 import json
 import logging
+from datetime import datetime
 from typing import Literal
 
 from langchain_core.messages import HumanMessage
@@ -15,7 +16,9 @@ from pulseglobe.agents.state import KeywordState, OrchestratorConfig
 from pulseglobe.agents.prompts import INITIAL_KEYWORD_PROMPT, SCENARIO_DESCRIPTIONS
 from pulseglobe.agents.workers import TavilyWorker, RAGWorker, SocialWorker
 from pulseglobe.agents.workers.base import CrossKeywordResult
+from pulseglobe.core.tracing import span, trace_context, traced
 from pulseglobe.services.llm import get_json_llm_client
+from pulseglobe.services.retrieval import RetrievalOptions
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +50,12 @@ class KeywordOrchestrator:
     def _init_workers(self):
         """初始化 Worker 实例"""
         self.tavily_worker = TavilyWorker() if self.config.tavily_enabled else None
-        self.rag_worker = RAGWorker() if self.config.rag_enabled else None
+        self.rag_worker = RAGWorker(options=RetrievalOptions.from_config(
+            country=self.config.rag_country,
+            date_from=self.config.rag_date_from,
+            date_to=self.config.rag_date_to,
+            recent_days=self.config.rag_recent_days,
+        )) if self.config.rag_enabled else None
         self.social_worker = SocialWorker(
             platforms=self.config.social_platforms,
             post_count=self.config.social_post_count,
@@ -58,9 +66,13 @@ class KeywordOrchestrator:
         """构建 LangGraph 状态图"""
         workflow = StateGraph(KeywordState)
         
-        workflow.add_node("generate_initial_keywords", self._generate_initial_keywords)
-        workflow.add_node("run_workers", self._run_workers)
-        workflow.add_node("check_convergence", self._check_convergence)
+        # 每个节点包一层 span，便于定位慢节点
+        workflow.add_node(
+            "generate_initial_keywords",
+            traced("node.generate_initial_keywords")(self._generate_initial_keywords),
+        )
+        workflow.add_node("run_workers", traced("node.run_workers")(self._run_workers))
+        workflow.add_node("check_convergence", traced("node.check_convergence")(self._check_convergence))
         
         workflow.set_entry_point("generate_initial_keywords")
         
@@ -75,8 +87,23 @@ class KeywordOrchestrator:
         
         return workflow.compile()
     
-    async def run(self, country: str, query: str) -> KeywordState:
-        """运行关键词感知流程"""
+    async def run(self, country: str, query: str, session_id: str = None) -> KeywordState:
+        """
+        运行关键词感知流程
+        
+        Args:
+            country: 目标国家
+            query: 用户问题
+            session_id: 可选的会话ID（用于链路追踪），默认自动生成
+        """
+        if not session_id:
+            session_id = f"sess_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        
+        with trace_context(session_id=session_id, country=country):
+            with span("keyword_orchestrator.run", query=query[:100]):
+                return await self._run(country, query)
+    
+    async def _run(self, country: str, query: str) -> KeywordState:
         logger.info(f"{'='*70}")
         logger.info(f"[Orchestrator] ▶ 开始关键词感知")
         logger.info(f"[Orchestrator]   国家: {country}")
@@ -157,7 +184,8 @@ class KeywordOrchestrator:
             scenario_description=SCENARIO_DESCRIPTIONS[scenario],
         )
         try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            with span("llm.initial_keywords", scenario=scenario):
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
             result = json.loads(response.content)
             return result.get("keywords", [])
         except Exception as e:
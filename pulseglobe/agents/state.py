@@ -46,6 +46,12 @@ class OrchestratorConfig:
     rag_enabled: bool = True
     social_enabled: bool = True
     
+    # RAG 检索过滤（None 表示使用 settings.yaml 中 rag 段的默认值）
+    rag_country: Optional[str] = None      # source_country，如 "MN"
+    rag_date_from: Optional[str] = None    # 发布日期下限，如 "2025-12-01"
+    rag_date_to: Optional[str] = None      # 发布日期上限
+    rag_recent_days: Optional[int] = None  # 只检索最近 N 天
+    
     # 社交平台配置
     social_platforms: list[str] = field(default_factory=lambda: ["twitter", "tiktok"])
     social_post_count: int = 5
@@ -9,6 +9,7 @@ from abc import ABC, abstractmethod
 from typing import Any
 
 from langchain_core.messages import HumanMessage
+from pulseglobe.core.tracing import span
 from pulseglobe.services.llm import get_json_llm_client
 from pulseglobe.agents.prompts import CROSS_KEYWORD_EXTRACTION_PROMPT
 
@@ -37,7 +38,7 @@ class BaseWorker(ABC):
     Worker Agent 基类
     
     流程:
-    1. 逐个关键词搜索
+    1. 搜索全部关键词（默认逐个，可覆盖 search_batch 批量检索）
     2. 从结果中提取三类关键词（交叉更新）
     3. 返回新关键词
     """
@@ -70,6 +71,29 @@ class BaseWorker(ABC):
         """
         pass
     
+    async def search_batch(self, keywords: list[str]) -> dict[str, list[dict]]:
+        """
+        搜索整个关键词列表
+        
+        默认逐个关键词调用 search；支持批量检索的 Worker（如 RAG）可覆盖为一次调用
+        
+        Returns:
+            {keyword: 搜索结果列表}，搜索失败的关键词不出现在结果中
+        """
+        results_by_keyword = {}
+        for i, keyword in enumerate(keywords, 1):
+            logger.info(f"[{self.name}] 🔍 [{i}/{len(keywords)}] 搜索: '{keyword}'")
+            try:
+                with span("worker.search", worker=self.name, keyword=keyword) as s:
+                    results = await self.search(keyword)
+                    s.set_attribute("result_count", len(results))
+                results_by_keyword[keyword] = results
+                logger.info(f"[{self.name}]    ✓ 获取 {len(results)} 条结果")
+            except Exception as e:
+                logger.warning(f"[{self.name}]    ✗ 搜索失败: {e}")
+                continue
+        return results_by_keyword
+    
     async def run(
         self,
         country: str,
@@ -93,6 +117,26 @@ class BaseWorker(ABC):
         Returns:
             CrossKeywordResult 包含三类新关键词
         """
+        with span("worker.run", worker=self.name, keyword_count=len(keywords)):
+            return await self._run(
+                country=country,
+                query=query,
+                keywords=keywords,
+                tavily_keywords=tavily_keywords,
+                social_keywords=social_keywords,
+                rag_keywords=rag_keywords,
+            )
+    
+    async def _run(
+        self,
+        country: str,
+        query: str,
+        keywords: list[str],
+        tavily_keywords: list[str] = None,
+        social_keywords: list[str] = None,
+        rag_keywords: list[str] = None,
+    ) -> CrossKeywordResult:
+        """run 的执行主体"""
         logger.info(f"{'='*60}")
         logger.info(f"[{self.name}] ▶ 开始执行")
         logger.info(f"[{self.name}]   国家: {country}")
@@ -100,21 +144,9 @@ class BaseWorker(ABC):
         logger.info(f"[{self.name}]   输入关键词 ({len(keywords)}): {keywords[:5]}{'...' if len(keywords) > 5 else ''}")
         logger.info(f"{'='*60}")
         
-        all_results = []
-        search_count = 0
-        
-        # 逐个关键词搜索
-        for i, keyword in enumerate(keywords, 1):
-            logger.info(f"[{self.name}] 🔍 [{i}/{len(keywords)}] 搜索: '{keyword}'")
-            try:
-                results = await self.search(keyword)
-                result_count = len(results)
-                all_results.extend(results)
-                search_count += 1
-                logger.info(f"[{self.name}]    ✓ 获取 {result_count} 条结果")
-            except Exception as e:
-                logger.warning(f"[{self.name}]    ✗ 搜索失败: {e}")
-                continue
+        results_by_keyword = await self.search_batch(keywords)
+        all_results = [item for results in results_by_keyword.values() for item in results]
+        search_count = len(results_by_keyword)
         
         logger.info(f"[{self.name}] 📊 搜索完成: {search_count}/{len(keywords)} 成功，共 {len(all_results)} 条结果")
         
@@ -171,7 +203,8 @@ class BaseWorker(ABC):
         )
         
         try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            with span("llm.cross_keywords", worker=self.name, prompt_chars=len(prompt)):
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
             data = json.loads(response.content)
             
             reasoning = data.get("reasoning", "")
@@ -1,15 +1,11 @@
 """
 RAG 召回 Worker
-使用 PostgreSQL + pgvector 进行向量检索
+使用 PostgreSQL + pgvector 或本地 mmap 索引进行向量检索（rag.backend）
 """
 import logging
-from typing import Optional
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from langchain_openai import OpenAIEmbeddings
-
-from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
+from pulseglobe.services.retrieval import RetrievalOptions, create_retriever
 from pulseglobe.agents.prompts import RAG_KEYWORD_EXTRACTION_PROMPT
 from .base import BaseWorker
 
@@ -19,24 +15,15 @@ logger = logging.getLogger(__name__)
 class RAGWorker(BaseWorker):
     """RAG 向量检索 Worker"""
     
-    def __init__(self):
+    def __init__(self, options: RetrievalOptions = None, limit: int = 5):
+        """
+        Args:
+            options: 检索参数（模式、日期/国家过滤等），默认读取 settings.yaml 的 rag 段
+            limit: 每个关键词的返回条数
+        """
         super().__init__()
-        config = get_config()
-        
-        # 数据库配置
-        self.db_config = config.database
-        
-        # Embedding 模型
-        embedding_config = config.embedding
-        self.embeddings = OpenAIEmbeddings(
-            model=embedding_config.get("model", "Qwen/Qwen3-Embedding-4B"),
-            api_key=embedding_config.get("api_key"),
-            base_url=embedding_config.get("base_url"),
-            dimensions=embedding_config.get("dimensions", 2560),
-        )
-        
-        self.table_name = self.db_config.get("table", "pulseglobe_news")
-        self._conn: Optional[psycopg2.extensions.connection] = None
+        self.retriever = create_retriever(options=options)
+        self.limit = limit
     
     @property
     def name(self) -> str:
@@ -50,21 +37,9 @@ class RAGWorker(BaseWorker):
     def extraction_prompt(self) -> str:
         return RAG_KEYWORD_EXTRACTION_PROMPT
     
-    def _get_connection(self):
-        """获取数据库连接"""
-        if self._conn is None or self._conn.closed:
-            self._conn = psycopg2.connect(
-                host=self.db_config.get("host"),
-                port=self.db_config.get("port"),
-                dbname=self.db_config.get("name"),
-                user=self.db_config.get("user"),
-                password=self.db_config.get("password"),
-            )
-        return self._conn
-    
     async def search(self, keyword: str) -> list[dict]:
         """
-        执行向量相似度搜索
+        检索新闻库（向量或混合检索，后端见 create_retriever）
         
         Args:
             keyword: 搜索关键词（中文）
@@ -73,44 +48,41 @@ class RAGWorker(BaseWorker):
             检索结果列表，每个结果包含 title, content, url
         """
         try:
-            # 生成查询向量
-            query_embedding = self.embeddings.embed_query(keyword)
-            
-            # 执行向量搜索
-            conn = self._get_connection()
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # 使用 pgvector 的 <=> 运算符进行余弦距离搜索
-                cur.execute(
-                    f"""
-                    SELECT 
-                        title,
-                        content,
-                        url,
-                        1 - (embedding <=> %s::vector) as similarity
-                    FROM {self.table_name}
-                    WHERE embedding IS NOT NULL
-                    ORDER BY embedding <=> %s::vector
-                    LIMIT 5
-                    """,
-                    (query_embedding, query_embedding)
-                )
-                
-                results = []
-                for row in cur.fetchall():
-                    results.append({
-                        "title": row["title"] or "",
-                        "content": row["content"] or "",
-                        "url": row["url"] or "",
-                        "similarity": float(row["similarity"]) if row["similarity"] else 0,
-                    })
-            
-            return results
+            results = self.retriever.search(keyword, limit=self.limit)
+            return [self._format(row) for row in results]
             
         except Exception as e:
             logger.error(f"RAG 检索错误: {e}")
             raise
     
+    async def search_batch(self, keywords: list[str]) -> dict[str, list[dict]]:
+        """
+        整个关键词列表一次检索（一次 embedding 请求 + 一条 SQL）
+        
+        批量检索失败时退回逐个关键词检索，只丢失检索失败的关键词
+        """
+        logger.info(f"[{self.name}] 🔍 批量检索 {len(keywords)} 个关键词")
+        try:
+            with span("worker.search_batch", worker=self.name, keyword_count=len(keywords)) as s:
+                batch = self.retriever.search_many(keywords, limit=self.limit)
+                s.set_attribute("result_count", sum(len(rows) for rows in batch.values()))
+        except Exception as e:
+            logger.warning(f"[{self.name}]    ✗ 批量检索失败，改为逐个关键词检索: {e}")
+            return await super().search_batch(keywords)
+        
+        for keyword, rows in batch.items():
+            logger.info(f"[{self.name}]    ✓ '{keyword}': {len(rows)} 条结果")
+        return {keyword: [self._format(row) for row in rows] for keyword, rows in batch.items()}
+    
+    @staticmethod
+    def _format(row: dict) -> dict:
+        return {
+            "title": row["title"],
+            "content": row["content"],
+            "url": row["url"],
+            "similarity": row["similarity"],
+        }
+    
     def close(self):
         """关闭数据库连接"""
-        if self._conn and not self._conn.closed:
-            self._conn.close()
+        self.retriever.close()
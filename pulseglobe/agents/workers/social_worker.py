@@ -8,6 +8,7 @@ from typing import Optional
 import httpx
 
 from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
 from pulseglobe.agents.prompts import SOCIAL_KEYWORD_EXTRACTION_PROMPT
 from .base import BaseWorker
 
@@ -33,7 +34,9 @@ class TikHubClient:
         """发送 GET 请求"""
         url = f"{self.base_url}{endpoint}"
         try:
-            response = await self.client.get(url, params=params)
+            with span("http.tikhub", endpoint=endpoint) as s:
+                response = await self.client.get(url, params=params)
+                s.set_attribute("status_code", response.status_code)
             response.raise_for_status()
             data = response.json()
             if data.get("code") == 200:
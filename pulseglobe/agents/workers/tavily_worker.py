@@ -6,6 +6,7 @@ import logging
 from tavily import AsyncTavilyClient
 
 from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
 from pulseglobe.agents.prompts import TAVILY_KEYWORD_EXTRACTION_PROMPT
 from .base import BaseWorker
 
@@ -46,11 +47,12 @@ class TavilyWorker(BaseWorker):
             搜索结果列表，每个结果包含 title, content, url
         """
         try:
-            response = await self.client.search(
-                query=keyword,
-                search_depth="basic",
-                max_results=5,
-            )
+            with span("http.tavily.search", search_depth="basic"):
+                response = await self.client.search(
+                    query=keyword,
+                    search_depth="basic",
+                    max_results=5,
+                )
             
             results = []
             for item in response.get("results", []):
@@ -0,0 +1,232 @@
+"""
+自适应并发控制（AIMD）
+供调用外部 API 的批处理任务使用（Embedding、翻译），替代固定大小的信号量
+
+    - 请求成功且延迟正常：并发上限加性增长（每个拥塞窗口 +1）
+    - 429 / 5xx / 超时：并发上限乘性减小，同一窗口内的连续失败只减一次
+    - 过载失败的请求退避后重新排队，等待期间不占用并发槽位
+
+用法:
+    from pulseglobe.core.concurrency import AdaptiveLimiter
+
+    limiter = AdaptiveLimiter(initial=4, max_limit=16, name="embedding")
+    result = await limiter.run(client_call, payload)
+"""
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OVERLOAD_STATUS = {408, 429}
+
+
+def is_overload(exc: BaseException) -> bool:
+    """429 / 5xx / 超时视为服务端过载；其余错误（4xx、解析失败等）重试无益"""
+    if isinstance(exc, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    else:
+        # OpenAI SDK 等客户端的异常带 status_code 属性
+        status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and (status in OVERLOAD_STATUS or status >= 500)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """读取响应的 Retry-After（秒），没有时返回 None"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return max(float(headers.get("retry-after")), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float,
+                  hint: Optional[float] = None) -> float:
+    """指数退避 + 全抖动；服务端给出 Retry-After 时不早于该时间"""
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    if hint is not None:
+        delay = max(delay, min(hint, max_delay))
+    return delay
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 并发限制器
+
+    Args:
+        initial: 初始并发上限
+        min_limit / max_limit: 并发上限的范围
+        decrease: 过载时上限乘以的系数
+        latency_target: 单次请求延迟（秒）超过该值时不再增长上限；None 表示只看错误
+        name: 日志中的名称
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        decrease: float = 0.5,
+        latency_target: Optional[float] = None,
+        name: str = "default",
+    ):
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError(f"并发上限范围无效: min={min_limit}, max={max_limit}")
+        if not 0 < decrease < 1:
+            raise ValueError(f"decrease 需在 (0, 1) 之间，当前 {decrease}")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.name = name
+
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.in_flight = 0
+        self.latency: Optional[float] = None   # 成功请求延迟的指数滑动平均（秒）
+        self.stats = {"ok": 0, "overload": 0, "error": 0, "retries": 0, "decreases": 0}
+        self._waiters: deque = deque()
+        self._last_decrease = 0.0
+
+    @classmethod
+    def from_config(cls, config: Optional[dict], name: str, **overrides) -> "AdaptiveLimiter":
+        """
+        从配置段构造（settings.yaml 中 embedding.concurrency / translation.concurrency）
+
+        overrides 中为 None 的项不覆盖配置
+        """
+        config = config or {}
+        options = {
+            "initial": int(config.get("initial", 4)),
+            "min_limit": int(config.get("min", 1)),
+            "max_limit": int(config.get("max", 32)),
+            "latency_target": float(config["latency_target"]) if config.get("latency_target") else None,
+        }
+        options.update({k: v for k, v in overrides.items() if v is not None})
+        options["max_limit"] = max(options["max_limit"], options["initial"])
+        return cls(name=name, **options)
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self):
+        """等待空闲槽位（先到先得）"""
+        while self.in_flight >= self.current_limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                # 被唤醒后又被取消：把名额让给下一个等待者
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+
+    def release(self, outcome: str, latency: float):
+        """
+        归还槽位并调整上限
+
+        Args:
+            outcome: 'ok' | 'overload' | 'error'
+            latency: 本次请求耗时（秒）
+        """
+        saturated = self.in_flight >= self.current_limit
+        self.in_flight -= 1
+        self.stats[outcome] += 1
+        now = time.monotonic()
+
+        if outcome == "overload":
+            # 同一窗口内已发出的请求会接连失败，距上次减小不足一个平均延迟时不重复减小
+            if now - self._last_decrease >= (self.latency or latency):
+                previous = self.current_limit
+                self.limit = max(float(self.min_limit), self.limit * self.decrease)
+                self._last_decrease = now
+                self.stats["decreases"] += 1
+                logger.warning(f"[AdaptiveLimiter:{self.name}] 服务端过载，并发上限 {previous} → {self.current_limit}")
+        elif outcome == "ok":
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            healthy = self.latency_target is None or latency <= self.latency_target
+            # 只有上限被用满时才增长，否则上限会在低负载时空涨
+            if healthy and saturated and self.limit < self.max_limit:
+                previous = self.current_limit
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+                if self.current_limit != previous:
+                    logger.debug(f"[AdaptiveLimiter:{self.name}] 并发上限 {previous} → {self.current_limit}")
+        self._wake()
+
+    def _wake(self):
+        free = self.current_limit - self.in_flight
+        for waiter in list(self._waiters):
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        """占用一个槽位，按结果（成功 / 过载 / 其他错误）和耗时调整上限"""
+        await self.acquire()
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        except BaseException as e:
+            if is_overload(e):
+                outcome = "overload"
+            raise
+        finally:
+            self.release(outcome, time.perf_counter() - start)
+
+    async def run(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        **kwargs,
+    ) -> Any:
+        """
+        在槽位内执行 func(*args, **kwargs)
+
+        过载错误先释放槽位、退避后重新排队，最多重试 retries 次；其他错误直接抛出
+        """
+        attempt = 0
+        while True:
+            try:
+                async with self.slot():
+                    return await func(*args, **kwargs)
+            except Exception as e:
+                if not is_overload(e) or attempt >= retries:
+                    raise
+                delay = backoff_delay(attempt, base_delay, max_delay, retry_after(e))
+                attempt += 1
+                self.stats["retries"] += 1
+                logger.info(f"[AdaptiveLimiter:{self.name}] {type(e).__name__}，{delay:.1f}s 后重试 ({attempt}/{retries})")
+                await asyncio.sleep(delay)
+
+    def snapshot(self) -> dict:
+        """当前状态，用于进度日志"""
+        return {
+            "limit": self.current_limit,
+            "in_flight": self.in_flight,
+            "latency_ms": round(self.latency * 1000, 1) if self.latency is not None else None,
+            **self.stats,
+        }
@@ -5,10 +5,15 @@ PulseGlobe 配置加载器
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 import yaml
 
+# 未设置 embedding.active_column 时的向量列
+DEFAULT_EMBEDDING_COLUMN = "embedding"
+
+_COLUMN_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
 
 class Config:
     """配置管理器"""
@@ -95,7 +100,8 @@ class Config:
     
     @property
     def embedding(self) -> dict:
-        return self._config.get("embedding", {})
+        """当前生效的 embedding 配置（active_column 及其模型），见 embedding_profile"""
+        return embedding_profile(self._config.get("embedding", {}))
     
     @property
     def tavily(self) -> dict:
@@ -110,6 +116,31 @@ class Config:
         return self._config.get("agent", {})
 
 
+def embedding_profile(embedding_config: dict, column: Optional[str] = None) -> dict:
+    """
+    某个向量列对应的 embedding 配置
+
+    embedding 段顶层的 model / dimensions 等为默认值，embedding.columns 按列名覆盖
+    （蓝绿重新向量化时影子列使用新模型）；column 为空时取 active_column。
+    返回值的 column 为列名，检索与向量化脚本据此读写
+    """
+    embedding_config = embedding_config or {}
+    base = {k: v for k, v in embedding_config.items() if k != "columns"}
+    column = column or base.get("active_column") or DEFAULT_EMBEDDING_COLUMN
+    if not _COLUMN_NAME.match(column):
+        raise ValueError(f"无效的向量列名: {column}")
+    overrides = (embedding_config.get("columns") or {}).get(column) or {}
+    return {**base, **overrides, "column": column}
+
+
+def embedding_columns(embedding_config: dict) -> list[str]:
+    """配置中登记的全部向量列：默认列、active_column 与 embedding.columns 中的列"""
+    embedding_config = embedding_config or {}
+    columns = [DEFAULT_EMBEDDING_COLUMN, embedding_profile(embedding_config)["column"]]
+    columns += list(embedding_config.get("columns") or {})
+    return list(dict.fromkeys(columns))
+
+
 # 全局配置实例
 def get_config() -> Config:
     """获取配置实例"""
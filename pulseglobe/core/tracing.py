@@ -0,0 +1,418 @@
+"""
+轻量级链路追踪
+基于 contextvars 记录 span，输出到本地 JSONL 文件或 OTLP 兼容的采集器
+
+用法:
+    from pulseglobe.core.tracing import span, trace_context
+
+    with trace_context(session_id="sess_xxx"):
+        with span("collector.search", keyword="蒙古"):
+            ...
+"""
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Span:
+    """单个追踪片段"""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    start_time: float = 0.0           # Unix 时间戳（秒）
+    end_time: float = 0.0
+    attributes: dict = field(default_factory=dict)
+    status: str = "ok"                # 'ok' | 'error'
+    error: str = ""
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_time - self.start_time) * 1000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Span":
+        return cls(
+            name=data["name"],
+            trace_id=data["trace_id"],
+            span_id=data["span_id"],
+            parent_id=data.get("parent_id"),
+            start_time=data.get("start_time", 0.0),
+            end_time=data.get("end_time", 0.0),
+            attributes=data.get("attributes", {}),
+            status=data.get("status", "ok"),
+            error=data.get("error", ""),
+        )
+
+
+class _NoopSpan:
+    """追踪关闭时使用的空 span"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+# 当前 span 与需要继承到子 span 的公共属性（session_id / keyword 等）
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "pulseglobe_current_span", default=None
+)
+_context_attributes: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "pulseglobe_trace_attributes", default={}
+)
+
+
+# ============ 导出器 ============
+
+class SpanExporter(ABC):
+    """Span 导出器基类"""
+
+    @abstractmethod
+    def export(self, spans: list[Span]):
+        """导出一批已结束的 span"""
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class JsonlSpanExporter(SpanExporter):
+    """写入本地 JSONL 文件，每行一个 span"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]):
+        lines = "".join(
+            json.dumps(s.to_dict(), ensure_ascii=False, default=str) + "\n" for s in spans
+        )
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """以 OTLP/HTTP JSON 格式发送到采集器（如 OpenTelemetry Collector、Jaeger）"""
+
+    def __init__(self, endpoint: str, service_name: str = "pulseglobe", timeout: float = 5.0):
+        import httpx
+
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.client = httpx.Client(timeout=timeout)
+
+    def export(self, spans: list[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "pulseglobe"},
+                    "spans": [self._to_otlp(s) for s in spans],
+                }],
+            }]
+        }
+        try:
+            response = self.client.post(self.endpoint, json=payload)
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"[Tracing] OTLP 导出失败: {e}")
+
+    def _to_otlp(self, s: Span) -> dict:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(int(s.start_time * 1e9)),
+            "endTimeUnixNano": str(int(s.end_time * 1e9)),
+            "attributes": [_otlp_attribute(k, v) for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.status == "error" else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        return item
+
+    def shutdown(self):
+        self.client.close()
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# ============ Tracer ============
+
+class Tracer:
+    """
+    Span 记录器
+
+    结束的 span 先进入缓冲区，达到 batch_size 或进程退出时统一导出
+    """
+
+    def __init__(self, exporter: SpanExporter = None, batch_size: int = 64):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self._buffer: list[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """创建子 span（自动继承当前 span 与上下文属性）"""
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        s = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            attributes={**_context_attributes.get(), **attributes},
+        )
+        token = _current_span.set(s)
+        s.start_time = time.time()
+        start = time.perf_counter()
+        try:
+            yield s
+        except BaseException as e:
+            s.status = "error"
+            s.error = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            s.end_time = s.start_time + (time.perf_counter() - start)
+            _current_span.reset(token)
+            self._record(s)
+
+    def _record(self, s: Span):
+        with self._lock:
+            self._buffer.append(s)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._export(batch)
+
+    def _export(self, batch: list[Span]):
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.warning(f"[Tracing] 导出 span 失败: {e}")
+
+    def flush(self):
+        """立即导出缓冲区中的 span"""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch and self.exporter:
+            self._export(batch)
+
+    def shutdown(self):
+        self.flush()
+        if self.exporter:
+            self.exporter.shutdown()
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _is_true(value) -> bool:
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def _create_tracer_from_config() -> Tracer:
+    """根据 settings.yaml 的 tracing 配置创建 Tracer"""
+    try:
+        from pulseglobe.core.config import get_config
+        tracing_config = get_config().get("tracing", {}) or {}
+    except Exception as e:
+        logger.debug(f"[Tracing] 读取配置失败，追踪关闭: {e}")
+        return Tracer()
+
+    if not _is_true(tracing_config.get("enabled", False)):
+        return Tracer()
+
+    exporter_type = tracing_config.get("exporter", "jsonl")
+    if exporter_type == "otlp":
+        exporter = OtlpHttpSpanExporter(
+            endpoint=tracing_config.get("otlp_endpoint", "http://localhost:4318/v1/traces"),
+            service_name=tracing_config.get("service_name", "pulseglobe"),
+        )
+    else:
+        exporter = JsonlSpanExporter(tracing_config.get("path", "logs/traces.jsonl"))
+
+    logger.info(f"[Tracing] 已启用，导出方式: {exporter_type}")
+    return Tracer(exporter, batch_size=int(tracing_config.get("batch_size", 64)))
+
+
+def get_tracer() -> Tracer:
+    """获取全局 Tracer（首次调用时按配置初始化）"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = _create_tracer_from_config()
+                atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer]):
+    """替换全局 Tracer（测试或基准测试时使用）"""
+    global _tracer
+    if _tracer is not None and _tracer is not tracer:
+        _tracer.flush()
+    _tracer = tracer
+
+
+def span(name: str, **attributes):
+    """在全局 Tracer 上创建 span"""
+    return get_tracer().span(name, **attributes)
+
+
+@contextmanager
+def trace_context(**attributes):
+    """
+    绑定上下文属性，作用域内创建的所有 span 都会带上这些属性
+
+    例: with trace_context(session_id=session_id, keyword=keyword): ...
+    """
+    merged = {**_context_attributes.get(), **{k: v for k, v in attributes.items() if v is not None}}
+    token = _context_attributes.set(merged)
+    try:
+        yield
+    finally:
+        _context_attributes.reset(token)
+
+
+def traced(name: str = None, **attributes):
+    """装饰器：为同步或异步函数创建 span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **attributes):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **attributes):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# ============ 分析工具 ============
+
+def load_spans(path: str) -> list[Span]:
+    """从 JSONL 文件读取 span"""
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spans.append(Span.from_dict(json.loads(line)))
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"[Tracing] 跳过无法解析的行: {e}")
+    return spans
+
+
+def group_by_session(spans: list[Span]) -> dict[str, list[Span]]:
+    """按 session_id 属性分组（无 session_id 的按 trace_id 分组）"""
+    sessions: dict[str, list[Span]] = {}
+    for s in spans:
+        key = s.attributes.get("session_id") or f"trace:{s.trace_id}"
+        sessions.setdefault(key, []).append(s)
+    return sessions
+
+
+def critical_path(spans: list[Span]) -> list[tuple[Span, int, float]]:
+    """
+    计算关键路径
+
+    从根 span 开始，每层选择最晚结束的子 span，再向前回溯与其不重叠的兄弟 span，
+    并行执行（asyncio.gather）时只有决定总耗时的分支会进入关键路径。
+
+    Returns:
+        [(span, 深度, 自耗时ms), ...]，自耗时为扣除关键子 span 后的时间
+    """
+    if not spans:
+        return []
+
+    by_id = {s.span_id: s for s in spans}
+    children: dict[Optional[str], list[Span]] = {}
+    for s in spans:
+        parent = s.parent_id if s.parent_id in by_id else None
+        children.setdefault(parent, []).append(s)
+
+    result: list[tuple[Span, int, float]] = []
+
+    def walk(node: Span, depth: int):
+        chain = []
+        cursor = node.end_time
+        candidates = sorted(children.get(node.span_id, []), key=lambda c: c.end_time, reverse=True)
+        for child in candidates:
+            if child.end_time <= cursor + 1e-6:
+                chain.append(child)
+                cursor = child.start_time
+        chain.reverse()
+
+        self_ms = node.duration_ms - sum(c.duration_ms for c in chain)
+        result.append((node, depth, max(self_ms, 0.0)))
+        for child in chain:
+            walk(child, depth + 1)
+
+    # 多个根 span（如关键词感知 + 数据采集）按时间顺序依次展开
+    for root in sorted(children.get(None, []), key=lambda s: s.start_time):
+        walk(root, 0)
+
+    return result
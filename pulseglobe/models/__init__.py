@@ -2,5 +2,6 @@
 PulseGlobe 模型
 """
 from .data_packet import DataPacket
+from .packet_batch import PacketBatch
 
-__all__ = ["DataPacket"]
+__all__ = ["DataPacket", "PacketBatch"]
@@ -8,9 +8,21 @@ from datetime import datetime
 from typing import Optional
 
 
-@dataclass
+def compute_content_hash(source_type: str, url: str, title: str, content: str) -> str:
+    """内容哈希（去重键），DataPacket 与 PacketBatch 共用"""
+    text = f"{source_type}:{url}:{title}:{(content or '')[:500]}"
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@dataclass(slots=True)
 class DataPacket:
-    """数据包：存储采集的单条数据"""
+    """
+    数据包：存储采集的单条数据
+    
+    使用 __slots__ 去掉每个实例的 __dict__；content_hash 首次读取后缓存，
+    缓存连同计算时的 (source_type, url, title, content) 一起保存，读取时这些字段
+    被重新赋值过（不是同一对象）就重新计算，构造与赋值不需要额外开销
+    """
     
     # 会话标识
     session_id: str
@@ -43,11 +55,32 @@ class DataPacket:
     # 数据库ID
     id: Optional[int] = None
     
+    # 内容哈希缓存及计算时的字段
+    _content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _hash_inputs: Optional[tuple] = field(default=None, init=False, repr=False, compare=False)
+    
     @property
     def content_hash(self) -> str:
-        """生成内容哈希，用于去重"""
-        text = f"{self.source_type}:{self.url}:{self.title}:{self.content[:500]}"
-        return hashlib.sha256(text.encode()).hexdigest()
+        """生成内容哈希，用于去重（缓存到相关字段变化为止）"""
+        cached = self._cached_hash()
+        if cached is None:
+            cached = compute_content_hash(self.source_type, self.url, self.title, self.content)
+            self._cache_hash(cached)
+        return cached
+    
+    def _cached_hash(self) -> Optional[str]:
+        """仍然有效的缓存哈希，没有时返回 None"""
+        if self._content_hash is None:
+            return None
+        # 元组比较先比较对象身份，未重新赋值的字段不会逐字符比较
+        if self._hash_inputs != (self.source_type, self.url, self.title, self.content):
+            return None
+        return self._content_hash
+    
+    def _cache_hash(self, value: Optional[str]):
+        """缓存按当前字段计算（或从数据库读取）的哈希"""
+        self._content_hash = value
+        self._hash_inputs = (self.source_type, self.url, self.title, self.content)
     
     def to_dict(self) -> dict:
         """转换为字典（用于数据库插入）"""
@@ -74,7 +107,7 @@ class DataPacket:
     @classmethod
     def from_dict(cls, data: dict) -> "DataPacket":
         """从字典创建"""
-        return cls(
+        packet = cls(
             id=data.get("id"),
             session_id=data["session_id"],
             source_type=data["source_type"],
@@ -93,3 +126,7 @@ class DataPacket:
             created_at=data.get("created_at", datetime.now()),
             tags=data.get("tags", []),
         )
+        # 数据库中已存有哈希时直接复用，避免重复计算
+        if data.get("content_hash"):
+            packet._cache_hash(data["content_hash"])
+        return packet
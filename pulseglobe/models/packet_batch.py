@@ -0,0 +1,117 @@
+"""
+列式数据包容器
+将大量数据包按字段存放在并行数组中，用于批量哈希、去重和数据库写入
+"""
+from typing import Iterable, Iterator, Optional
+
+from .data_packet import DataPacket, compute_content_hash
+
+
+class PacketBatch:
+    """
+    列式数据包批次
+
+    每个字段一列（list），第 i 行即第 i 个数据包；
+    比同等数量的 DataPacket 对象少了逐对象的开销，适合批量处理
+    """
+
+    # 与 data_packets 表 INSERT 列顺序一致
+    COLUMNS = (
+        "session_id", "source_type", "source_detail",
+        "keyword", "keyword_type",
+        "title", "content", "content_zh", "summary",
+        "url", "author", "publish_date", "platform",
+        "engagement", "created_at", "tags",
+    )
+
+    __slots__ = ("columns", "_hashes")
+
+    def __init__(self):
+        self.columns: dict[str, list] = {name: [] for name in self.COLUMNS}
+        # 与行对齐的哈希缓存，None 表示尚未计算
+        self._hashes: list[Optional[str]] = []
+
+    @classmethod
+    def from_packets(cls, packets: Iterable[DataPacket]) -> "PacketBatch":
+        """从 DataPacket 列表构建"""
+        batch = cls()
+        batch.extend(packets)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self.columns["session_id"])
+
+    def __iter__(self) -> Iterator[DataPacket]:
+        return iter(self.to_packets())
+
+    def append(self, packet: DataPacket):
+        for name in self.COLUMNS:
+            self.columns[name].append(getattr(packet, name))
+        # 复用数据包上已缓存的哈希
+        self._hashes.append(packet._cached_hash())
+
+    def extend(self, packets: Iterable[DataPacket]):
+        for packet in packets:
+            self.append(packet)
+
+    def column(self, name: str) -> list:
+        """获取单列（只读使用）"""
+        return self.columns[name]
+
+    def content_hashes(self) -> list[str]:
+        """批量计算内容哈希（只计算尚未缓存的行）"""
+        hashes = self._hashes
+        if None in hashes:
+            cols = self.columns
+            for i, (source_type, url, title, content) in enumerate(
+                zip(cols["source_type"], cols["url"], cols["title"], cols["content"])
+            ):
+                if hashes[i] is None:
+                    hashes[i] = compute_content_hash(source_type, url, title, content)
+        return hashes
+
+    def take(self, indices: list[int]) -> "PacketBatch":
+        """按行号取子批次"""
+        batch = PacketBatch()
+        for name, values in self.columns.items():
+            batch.columns[name] = [values[i] for i in indices]
+        batch._hashes = [self._hashes[i] for i in indices]
+        return batch
+
+    def dedup(self) -> "PacketBatch":
+        """按 (session_id, content_hash) 去重，保留首次出现的行"""
+        seen = set()
+        keep = []
+        for i, key in enumerate(zip(self.columns["session_id"], self.content_hashes())):
+            if key not in seen:
+                seen.add(key)
+                keep.append(i)
+        if len(keep) == len(self):
+            return self
+        return self.take(keep)
+
+    def rows(self, adapt=None) -> Iterator[tuple]:
+        """
+        按 COLUMNS + content_hash 顺序逐行产出元组（用于 execute_values）
+
+        Args:
+            adapt: 可选的 engagement 适配函数（如 psycopg2.extras.Json）
+        """
+        cols = [self.columns[name] for name in self.COLUMNS]
+        engagement_index = self.COLUMNS.index("engagement")
+        for values in zip(*cols, self.content_hashes()):
+            if adapt is not None:
+                values = list(values)
+                values[engagement_index] = adapt(values[engagement_index] or {})
+                values = tuple(values)
+            yield values
+
+    def to_packets(self) -> list[DataPacket]:
+        """还原为 DataPacket 列表"""
+        packets = []
+        for i, values in enumerate(zip(*(self.columns[name] for name in self.COLUMNS))):
+            packet = DataPacket(**dict(zip(self.COLUMNS, values)))
+            if self._hashes[i] is not None:
+                packet._cache_hash(self._hashes[i])
+            packets.append(packet)
+        return packets
@@ -1,13 +1,25 @@
 """
 PulseGlobe 服务模块
+
+导出的服务按需加载（PEP 562）：LLM 相关服务依赖 langchain，分块、翻译记忆等
+模块会被只声明了少量依赖的独立脚本（scripts/ 下的 PEP 723 脚本）直接导入，
+导入子模块时不应连带加载 langchain
 """
-from .llm import get_llm_client, get_json_llm_client
-from .translation import TranslationService
-from .summarization import SummarizationService
-
-__all__ = [
-    "get_llm_client",
-    "get_json_llm_client",
-    "TranslationService",
-    "SummarizationService",
-]
+from importlib import import_module
+
+_EXPORTS = {
+    "get_llm_client": ".llm",
+    "get_json_llm_client": ".llm",
+    "TranslationService": ".translation",
+    "SummarizationService": ".summarization",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
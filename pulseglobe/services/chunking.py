@@ -0,0 +1,91 @@
+"""
+新闻正文分段：按句子边界切成长度受限的段落，用于段落级向量（pulseglobe_news_chunks）
+
+整篇向量只覆盖正文的前 3000 字符，长文后半部分无法被检索到；
+分段后每段单独向量化，RAG 检索命中段落后只把相关段落交给下游的翻译和摘要
+
+句子边界支持中文（。！？；…）、西文与西里尔蒙古文（. ! ? 后接空白）以及换行，
+单句超过上限时按长度硬切
+"""
+import re
+from dataclasses import dataclass
+
+# 句末标点（含其后的右引号/括号和空白）；英文句点后须有空白，避免切开小数和缩写
+_SENTENCE_END = re.compile(r"(?:[。！？!?；;]+|…+|\.(?=\s)|\n)[”’」』\"')）]*\s*")
+
+DEFAULT_MAX_CHARS = 600
+DEFAULT_OVERLAP = 1
+
+
+@dataclass
+class Chunk:
+    """正文中的一段"""
+    no: int         # 段序号，从 0 开始
+    start: int      # 在正文中的起始字符偏移
+    end: int        # 结束偏移（不含）
+    text: str
+
+
+def split_sentences(text: str) -> list[tuple[int, int]]:
+    """
+    切分句子
+
+    Returns:
+        [(start, end), ...] 各句在 text 中的区间（已去掉首尾空白，跳过空句）
+    """
+    spans = []
+    position = 0
+    for match in _SENTENCE_END.finditer(text):
+        spans.append((position, match.end()))
+        position = match.end()
+    if position < len(text):
+        spans.append((position, len(text)))
+
+    sentences = []
+    for start, end in spans:
+        segment = text[start:end]
+        stripped = segment.strip()
+        if stripped:
+            start += len(segment) - len(segment.lstrip())
+            sentences.append((start, start + len(stripped)))
+    return sentences
+
+
+def chunk_text(text: str, max_chars: int = DEFAULT_MAX_CHARS, overlap: int = DEFAULT_OVERLAP) -> list[Chunk]:
+    """
+    按句子贪心合并为不超过 max_chars 的段落
+
+    Args:
+        text: 正文
+        max_chars: 每段字符数上限（中文约等于 token 数）
+        overlap: 相邻段落重叠的句子数，避免跨段的上下文丢失
+
+    Returns:
+        段落列表，段落文本取自原文区间（保留原有的空白和换行）
+    """
+    if max_chars <= 0:
+        raise ValueError(f"max_chars 必须为正数: {max_chars}")
+
+    pieces = []
+    for start, end in split_sentences(text or ""):
+        # 超长的句子按长度硬切
+        for offset in range(start, end, max_chars):
+            pieces.append((offset, min(offset + max_chars, end)))
+
+    groups = []
+    current = []
+    for piece in pieces:
+        if current and piece[1] - current[0][0] > max_chars:
+            groups.append(current)
+            current = current[-overlap:] if overlap > 0 else []
+            # 重叠的句子放不下时逐句丢弃
+            while current and piece[1] - current[0][0] > max_chars:
+                current.pop(0)
+        current.append(piece)
+    if current:
+        groups.append(current)
+
+    return [
+        Chunk(no=no, start=group[0][0], end=group[-1][1], text=text[group[0][0]:group[-1][1]])
+        for no, group in enumerate(groups)
+    ]
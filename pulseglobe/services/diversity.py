@@ -0,0 +1,60 @@
+"""
+检索结果多样化：最大边际相关（MMR）重排
+
+蒙古国新闻常被多家媒体近乎原样转载，按相似度取 top-k 时容易得到多篇重复稿件。
+MMR 每一步选择 λ·相关度 − (1−λ)·与已选结果的最大相似度 最高的候选，
+在相关度和信息多样性之间折中
+"""
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("MMR 重排需要 numpy，请安装可选依赖: uv sync --extra vector") from e
+    return numpy
+
+
+def parse_vector(text: str):
+    """pgvector 文本格式 '[1,2,3]' -> float32 数组"""
+    np = _require_numpy()
+    return np.array(text[1:-1].split(","), dtype=np.float32)
+
+
+def mmr(query, candidates, k: int, lambda_: float = 0.5) -> list[int]:
+    """
+    最大边际相关选择
+
+    Args:
+        query: 查询向量 [D]
+        candidates: 候选向量 [N, D]（按任意顺序）
+        k: 选出条数
+        lambda_: 1 等价于按相关度排序，越小越偏向多样性
+
+    Returns:
+        选中候选的下标（按选择顺序）
+    """
+    np = _require_numpy()
+    vectors = np.asarray(candidates, dtype=np.float32)
+    if len(vectors) == 0 or k <= 0:
+        return []
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    q = np.asarray(query, dtype=np.float32)
+    q = q / max(float(np.linalg.norm(q)), 1e-12)
+
+    relevance = vectors @ q
+    pairwise = vectors @ vectors.T
+
+    selected = [int(np.argmax(relevance))]
+    redundancy = pairwise[:, selected[0]].copy()
+    available = np.ones(len(vectors), dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, len(vectors)):
+        scores = lambda_ * relevance - (1 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        np.maximum(redundancy, pairwise[:, pick], out=redundancy)
+    return selected
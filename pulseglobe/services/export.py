@@ -0,0 +1,231 @@
+"""
+会话数据导出服务
+通过服务端游标流式读取 data_packets，按批写入 Parquet / Arrow IPC 文件
+内存占用只与 batch_size 有关，与会话大小无关
+"""
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Iterator, Optional
+
+from pulseglobe.core.tracing import span
+from pulseglobe.services.storage import PacketStorage
+
+logger = logging.getLogger(__name__)
+
+
+# 可导出列：列名 -> (SELECT 表达式, Arrow 类型名)
+EXPORT_COLUMNS = {
+    "id": ("id", "int64"),
+    "session_id": ("session_id", "string"),
+    "source_type": ("source_type", "string"),
+    "source_detail": ("source_detail", "string"),
+    "keyword": ("keyword", "string"),
+    "keyword_type": ("keyword_type", "string"),
+    "title": ("title", "string"),
+    "content": ("content", "string"),
+    "content_zh": ("content_zh", "string"),
+    "summary": ("summary", "string"),
+    "url": ("url", "string"),
+    "author": ("author", "string"),
+    "publish_date": ("publish_date", "timestamp"),
+    "platform": ("platform", "string"),
+    "engagement": ("engagement::text", "string"),  # 保留 JSON 文本，避免逐行解析
+    "created_at": ("created_at", "timestamp"),
+    "tags": ("tags", "list_string"),
+    "content_hash": ("content_hash", "string"),
+}
+
+# 常用列投影
+PROJECTIONS = {
+    "full": list(EXPORT_COLUMNS),
+    "summaries": ["id", "source_type", "keyword", "title", "summary", "url", "publish_date", "engagement"],
+    "zh": ["id", "source_type", "keyword", "title", "content_zh", "summary", "url", "publish_date"],
+}
+
+FORMATS = ("parquet", "arrow")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError("导出需要 pyarrow，请安装可选依赖: uv sync --extra export") from e
+    return pyarrow
+
+
+def resolve_columns(columns=None) -> list[str]:
+    """
+    解析列投影
+
+    Args:
+        columns: None / 投影名（'full' | 'summaries' | 'zh'）/ 列名列表 / 逗号分隔字符串
+    """
+    if columns is None:
+        return PROJECTIONS["full"]
+    if isinstance(columns, str):
+        if columns in PROJECTIONS:
+            return PROJECTIONS[columns]
+        columns = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"未知列: {unknown}，可选: {list(EXPORT_COLUMNS)}")
+    return list(columns)
+
+
+def arrow_schema(columns: list[str]):
+    """按列投影生成 Arrow schema"""
+    pa = _require_pyarrow()
+    types = {
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "timestamp": pa.timestamp("us"),
+        "list_string": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[EXPORT_COLUMNS[name][1]]) for name in columns])
+
+
+class SessionExporter:
+    """会话导出器"""
+
+    def __init__(self, storage: PacketStorage = None):
+        self.storage = storage or PacketStorage()
+
+    def iter_record_batches(
+        self,
+        session_id: str,
+        columns=None,
+        batch_size: int = 10_000,
+        source_type: str = None,
+    ) -> Iterator:
+        """
+        以服务端游标流式读取会话，逐批产出 pyarrow.RecordBatch
+
+        Args:
+            session_id: 会话ID
+            columns: 列投影，见 resolve_columns
+            batch_size: 每批行数（同时也是游标的 itersize）
+            source_type: 可选的来源过滤
+        """
+        pa = _require_pyarrow()
+        columns = resolve_columns(columns)
+        schema = arrow_schema(columns)
+
+        select = ", ".join(f"{EXPORT_COLUMNS[c][0]} AS {c}" for c in columns)
+        query = f"SELECT {select} FROM data_packets WHERE session_id = %s"
+        params = [session_id]
+        if source_type:
+            query += " AND source_type = %s"
+            params.append(source_type)
+        query += " ORDER BY id"
+
+        conn = self.storage._get_connection()
+        # 命名游标即服务端游标，结果集留在数据库端按批拉取
+        cursor_name = f"export_{uuid.uuid4().hex[:12]}"
+        try:
+            with conn.cursor(name=cursor_name) as cur:
+                cur.itersize = batch_size
+                with span("sql.data_packets.export_open", session_id=session_id):
+                    cur.execute(query, params)
+                while True:
+                    with span("sql.data_packets.export_fetch", batch_size=batch_size):
+                        rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    arrays = [
+                        pa.array(list(values), type=field.type)
+                        for values, field in zip(zip(*rows), schema)
+                    ]
+                    yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+        finally:
+            # 结束只读事务，释放服务端游标
+            conn.rollback()
+
+    def export_session(
+        self,
+        session_id: str,
+        path: str,
+        columns=None,
+        format: str = "parquet",
+        compression: Optional[str] = "zstd",
+        batch_size: int = 10_000,
+        source_type: str = None,
+    ) -> dict:
+        """
+        导出会话到文件
+
+        Args:
+            session_id: 会话ID
+            path: 输出文件路径
+            columns: 列投影（如 'summaries'）
+            format: 'parquet' 或 'arrow'（Arrow IPC 文件，可零拷贝内存映射）
+            compression: 压缩算法，parquet 支持 zstd/snappy/gzip/none，
+                arrow 支持 zstd/lz4/none（需要零拷贝 mmap 时使用 none）
+            batch_size: 每批行数
+            source_type: 可选的来源过滤
+
+        Returns:
+            {"rows": int, "batches": int, "bytes": int, "seconds": float}
+        """
+        pa = _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        if format not in FORMATS:
+            raise ValueError(f"不支持的格式: {format}，可选: {FORMATS}")
+        if compression in (None, "none"):
+            compression = None
+
+        columns = resolve_columns(columns)
+        schema = arrow_schema(columns)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        start = time.perf_counter()
+        rows = 0
+        batches = 0
+
+        if format == "parquet":
+            writer = pq.ParquetWriter(path, schema, compression=compression or "none")
+        else:
+            sink = pa.OSFile(path, "wb")
+            writer = pa.ipc.new_file(sink, schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+
+        try:
+            with span("export.session", session_id=session_id, format=format):
+                for batch in self.iter_record_batches(session_id, columns, batch_size, source_type):
+                    if format == "parquet":
+                        writer.write_batch(batch, row_group_size=batch_size)
+                    else:
+                        writer.write_batch(batch)
+                    rows += batch.num_rows
+                    batches += 1
+        finally:
+            writer.close()
+            if format == "arrow":
+                sink.close()
+
+        stats = {
+            "rows": rows,
+            "batches": batches,
+            "bytes": Path(path).stat().st_size,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"[SessionExporter] 导出 {session_id} → {path}: {stats}")
+        return stats
+
+
+def open_export(path: str):
+    """
+    以内存映射方式打开导出文件，返回 pyarrow.Table
+
+    Arrow IPC（未压缩）为零拷贝；Parquet 通过 mmap 读取后解码
+    """
+    pa = _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    if str(path).endswith(".parquet"):
+        return pq.read_table(path, memory_map=True)
+    # 不关闭映射：返回的 Table 直接引用映射页
+    source = pa.memory_map(str(path), "r")
+    return pa.ipc.open_file(source).read_all()
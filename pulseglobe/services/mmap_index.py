@@ -0,0 +1,399 @@
+"""
+本地内存映射向量索引（RAG 的 mmap 后端）
+
+把 pulseglobe_news 的向量导出为一个目录（scripts/export_mmap_index.py）:
+    embeddings.npy   float32 [N, D] 行向量，已 L2 归一化（内积即余弦相似度）
+    publish_dates.npy  int32 [N] 发布日期的 proleptic ordinal，0 表示无日期
+    countries.npy    <U8 [N] source_country
+    meta.sqlite      行号 -> doc_id / title / content / url / source_name / publish_date
+    manifest.json    模型、维度、行数、导出时间
+
+检索时矩阵以只读 mmap 打开，按块做矩阵-向量乘积并取 top-k，只有命中的行
+才去 sidecar 读元数据。多个 Worker 进程映射同一文件时共享操作系统页缓存，
+不复制向量数据
+"""
+import json
+import logging
+import sqlite3
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from pulseglobe.core.tracing import span
+from pulseglobe.services.diversity import mmr
+
+logger = logging.getLogger(__name__)
+
+EMBEDDINGS_FILE = "embeddings.npy"
+DATES_FILE = "publish_dates.npy"
+COUNTRIES_FILE = "countries.npy"
+META_FILE = "meta.sqlite"
+MANIFEST_FILE = "manifest.json"
+
+# 每块行数：块内相似度数组为 chunk_rows * 4 字节
+DEFAULT_CHUNK_ROWS = 65536
+
+META_SCHEMA = """
+    CREATE TABLE docs (
+        row INTEGER PRIMARY KEY,
+        doc_id TEXT NOT NULL,
+        title TEXT,
+        content TEXT,
+        url TEXT,
+        source_name TEXT,
+        publish_date TEXT
+    )
+"""
+META_COLUMNS = ("doc_id", "title", "content", "url", "source_name", "publish_date")
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("mmap 后端需要 numpy，请安装可选依赖: uv sync --extra vector") from e
+    return numpy
+
+
+def date_ordinal(value) -> int:
+    """发布日期 -> ordinal（None 为 0，与 SQL 中 NULL 不满足日期过滤一致）"""
+    if value is None or value == "":
+        return 0
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    if hasattr(value, "date"):
+        value = value.date()
+    return value.toordinal()
+
+
+class MmapIndexWriter:
+    """
+    索引写入器：预分配 mmap 文件后逐批写入，内存占用与批大小有关、与总行数无关
+
+    用法:
+        with MmapIndexWriter(path, count, dimensions, model=...) as writer:
+            writer.append(rows, embeddings)
+    """
+
+    def __init__(self, path: str, count: int, dimensions: int, model: str = None):
+        np = _require_numpy()
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.count = count
+        self.dimensions = dimensions
+        self.model = model
+        self.rows = 0
+
+        self._embeddings = np.lib.format.open_memmap(
+            self.path / EMBEDDINGS_FILE, mode="w+", dtype=np.float32, shape=(count, dimensions)
+        )
+        self._dates = np.lib.format.open_memmap(
+            self.path / DATES_FILE, mode="w+", dtype=np.int32, shape=(count,)
+        )
+        self._countries = np.lib.format.open_memmap(
+            self.path / COUNTRIES_FILE, mode="w+", dtype="<U8", shape=(count,)
+        )
+        meta_path = self.path / META_FILE
+        meta_path.unlink(missing_ok=True)
+        self._meta = sqlite3.connect(meta_path)
+        self._meta.execute(META_SCHEMA)
+
+    def append(self, rows: list[dict], embeddings) -> None:
+        """
+        追加一批文档
+
+        Args:
+            rows: 含 META_COLUMNS 与 source_country 的字典列表
+            embeddings: [len(rows), dimensions] 的向量（写入前归一化）
+        """
+        np = _require_numpy()
+        start, end = self.rows, self.rows + len(rows)
+        if end > self.count:
+            raise ValueError(f"写入行数超过预分配的 {self.count} 行")
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        self._embeddings[start:end] = vectors / norms
+        self._dates[start:end] = [date_ordinal(row.get("publish_date")) for row in rows]
+        self._countries[start:end] = [row.get("source_country") or "" for row in rows]
+        self._meta.executemany(
+            f"INSERT INTO docs (row, {', '.join(META_COLUMNS)}) VALUES (?{', ?' * len(META_COLUMNS)})",
+            [
+                (start + i, *(_meta_value(row.get(c)) for c in META_COLUMNS))
+                for i, row in enumerate(rows)
+            ],
+        )
+        self.rows = end
+
+    def close(self):
+        """刷盘并写入 manifest；实际行数少于预分配时截断为实际行数"""
+        for array in (self._embeddings, self._dates, self._countries):
+            array.flush()
+        self._meta.commit()
+        self._meta.close()
+        del self._embeddings, self._dates, self._countries
+
+        if self.rows < self.count:
+            self._truncate()
+
+        manifest = {
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "count": self.rows,
+            "created_at": date.today().isoformat(),
+        }
+        (self.path / MANIFEST_FILE).write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info(f"[MmapIndexWriter] 写入 {self.path}: {manifest}")
+
+    def _truncate(self):
+        np = _require_numpy()
+        for name in (EMBEDDINGS_FILE, DATES_FILE, COUNTRIES_FILE):
+            array = np.load(self.path / name, mmap_mode="r")
+            np.save(self.path / f"{name}.tmp.npy", array[:self.rows])
+            del array
+            (self.path / f"{name}.tmp.npy").replace(self.path / name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _meta_value(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def _top_k(rows, scores, k: int):
+    """按列保留分数最高的 k 行（行内无序）"""
+    np = _require_numpy()
+    if len(scores) <= k:
+        return rows, scores
+    top = np.argpartition(-scores, k, axis=0)[:k]
+    return np.take_along_axis(rows, top, axis=0), np.take_along_axis(scores, top, axis=0)
+
+
+class MmapNewsIndex:
+    """只读的内存映射索引"""
+
+    def __init__(self, path: str, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        np = _require_numpy()
+        self.path = Path(path)
+        manifest_path = self.path / MANIFEST_FILE
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"mmap 索引不存在: {self.path}，请先运行 scripts/export_mmap_index.py")
+        self.manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        self.chunk_rows = chunk_rows
+
+        # 只读映射：多进程共享同一份页缓存
+        self.embeddings = np.load(self.path / EMBEDDINGS_FILE, mmap_mode="r")
+        self.publish_dates = np.load(self.path / DATES_FILE, mmap_mode="r")
+        self.countries = np.load(self.path / COUNTRIES_FILE, mmap_mode="r")
+        self._meta = sqlite3.connect(f"file:{self.path / META_FILE}?mode=ro", uri=True, check_same_thread=False)
+
+    @property
+    def dimensions(self) -> int:
+        return self.embeddings.shape[1]
+
+    def __len__(self) -> int:
+        return self.embeddings.shape[0]
+
+    def search(
+        self,
+        query,
+        limit: int,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        country: Optional[str] = None,
+    ) -> list[tuple[int, float]]:
+        """
+        余弦相似度 top-k（精确检索）
+
+        Returns:
+            按相似度降序的 [(row, similarity), ...]
+        """
+        return self.search_many([query], limit, date_from, date_to, country)[0]
+
+    def search_many(
+        self,
+        queries,
+        limit: int,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        country: Optional[str] = None,
+    ) -> list[list[tuple[int, float]]]:
+        """
+        多个查询向量一次扫描：每块做 [rows, D] × [D, n] 矩阵乘积，按列取 top-k
+
+        Returns:
+            与 queries 顺序对应的 search 结果列表
+        """
+        np = _require_numpy()
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        norms = np.linalg.norm(q, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        q = (q / norms).T
+
+        low = date_ordinal(date_from) if date_from else None
+        high = date_ordinal(date_to) if date_to else None
+
+        # 每列一个查询的当前 top-k（行号与分数）
+        best_rows = np.empty((0, q.shape[1]), dtype=np.int64)
+        best_scores = np.empty((0, q.shape[1]), dtype=np.float32)
+        for start in range(0, len(self), self.chunk_rows):
+            end = min(start + self.chunk_rows, len(self))
+            scores = self.embeddings[start:end] @ q
+
+            mask = None
+            if low is not None:
+                mask = self.publish_dates[start:end] >= low
+            if high is not None:
+                upper = self.publish_dates[start:end] <= high
+                upper &= self.publish_dates[start:end] > 0
+                mask = upper if mask is None else mask & upper
+            if country:
+                same = self.countries[start:end] == country
+                mask = same if mask is None else mask & same
+            if mask is not None:
+                scores = np.where(mask[:, None], scores, -np.inf)
+
+            rows = np.broadcast_to(np.arange(start, end)[:, None], scores.shape)
+            best_rows, best_scores = _top_k(
+                np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), limit
+            )
+
+        results = []
+        for column in range(q.shape[1]):
+            order = np.argsort(-best_scores[:, column], kind="stable")
+            results.append([
+                (int(best_rows[i, column]), float(best_scores[i, column]))
+                for i in order
+                if np.isfinite(best_scores[i, column])
+            ])
+        return results
+
+    def fetch(self, rows: list[int]) -> dict[int, dict]:
+        """从 sidecar 读取行元数据"""
+        if not rows:
+            return {}
+        placeholders = ", ".join("?" * len(rows))
+        cursor = self._meta.execute(
+            f"SELECT row, {', '.join(META_COLUMNS)} FROM docs WHERE row IN ({placeholders})", rows
+        )
+        return {r[0]: dict(zip(META_COLUMNS, r[1:])) for r in cursor.fetchall()}
+
+    def close(self):
+        self._meta.close()
+
+
+class MmapNewsRetriever:
+    """
+    基于 MmapNewsIndex 的检索器，接口与 NewsRetriever 相同
+
+    只支持 vector 模式（精确检索，first_pass / ef_search 等索引参数不适用）；
+    日期与国家过滤在块内用掩码完成
+    """
+
+    def __init__(self, options=None, embeddings=None, path: str = None):
+        from pulseglobe.core.config import get_config
+        from pulseglobe.services.retrieval import RetrievalOptions, create_embeddings
+
+        config = get_config()
+        rag_config = config.get("rag", {}) or {}
+        self.options = options or RetrievalOptions.from_config()
+        if self.options.mode != "vector":
+            raise ValueError(f"mmap 后端只支持 vector 模式，当前为 {self.options.mode}")
+        if self.options.passages:
+            raise ValueError("mmap 后端不支持段落检索，请使用 pgvector 后端")
+
+        self.path = path or rag_config.get("mmap_path") or "data/rag_index"
+        self.index = MmapNewsIndex(self.path, chunk_rows=int(rag_config.get("mmap_chunk_rows") or DEFAULT_CHUNK_ROWS))
+        self.embeddings = embeddings or create_embeddings()
+
+        dimensions = int(config.embedding.get("dimensions", 2560))
+        if self.index.dimensions != dimensions:
+            raise ValueError(
+                f"mmap 索引维度 {self.index.dimensions} 与 embedding.dimensions {dimensions} 不一致，请重新导出"
+            )
+        logger.info(f"[MmapNewsRetriever] 打开 {self.path}: {len(self.index)} 行 × {self.index.dimensions} 维")
+
+    def embed(self, text: str) -> list[float]:
+        """生成查询向量"""
+        with span("http.embedding", model=self.embeddings.model):
+            return self.embeddings.embed_query(text)
+
+    def search(self, keyword: str, limit: int, options=None) -> list[dict]:
+        """
+        检索新闻，返回格式与 NewsRetriever.search 相同（score 即 similarity）
+        """
+        options = options or self.options
+        query_embedding = self.embed(keyword)
+
+        with span("mmap.rag.vector_search", rows=len(self.index), filtered=options.has_filters):
+            hits = self.index.search(
+                query_embedding,
+                options.fetch_limit(limit),
+                date_from=options.effective_date_from,
+                date_to=options.date_to,
+                country=options.country,
+            )
+            hits = self._diversify(hits, query_embedding, limit, options)
+            meta = self.index.fetch([row for row, _ in hits])
+        return self._to_results(hits, meta)
+
+    def search_many(self, keywords: list[str], limit: int, options=None) -> dict[str, list[dict]]:
+        """批量检索：一次 embedding 请求 + 一次矩阵扫描，返回格式同 NewsRetriever.search_many"""
+        options = options or self.options
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords:
+            return {}
+        with span("http.embedding", model=self.embeddings.model, count=len(keywords)):
+            query_embeddings = self.embeddings.embed_documents(keywords)
+
+        with span("mmap.rag.vector_search_many", rows=len(self.index), keyword_count=len(keywords)):
+            batches = self.index.search_many(
+                query_embeddings,
+                options.fetch_limit(limit),
+                date_from=options.effective_date_from,
+                date_to=options.date_to,
+                country=options.country,
+            )
+            batches = [
+                self._diversify(hits, embedding, limit, options)
+                for hits, embedding in zip(batches, query_embeddings)
+            ]
+            meta = self.index.fetch(sorted({row for hits in batches for row, _ in hits}))
+        return {keyword: self._to_results(hits, meta) for keyword, hits in zip(keywords, batches)}
+
+    def _diversify(self, hits: list[tuple[int, float]], query_embedding, limit: int,
+                   options) -> list[tuple[int, float]]:
+        """启用 MMR 时直接从映射矩阵取候选向量挑选 limit 条"""
+        if not options.diversifies or len(hits) <= limit:
+            return hits
+        candidates = self.index.embeddings[[row for row, _ in hits]]
+        return [hits[i] for i in mmr(query_embedding, candidates, limit, options.mmr_lambda)]
+
+    @staticmethod
+    def _to_results(hits: list[tuple[int, float]], meta: dict[int, dict]) -> list[dict]:
+        results = []
+        for row, similarity in hits:
+            doc = meta.get(row)
+            if doc is None:
+                continue
+            results.append({
+                "doc_id": doc["doc_id"],
+                "title": doc["title"] or "",
+                "content": doc["content"] or "",
+                "url": doc["url"] or "",
+                "source_name": doc["source_name"] or "",
+                "publish_date": doc["publish_date"],
+                "similarity": similarity,
+                "score": similarity,
+            })
+        return results
+
+    def close(self):
+        self.index.close()
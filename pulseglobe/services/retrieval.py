@@ -0,0 +1,711 @@
+"""
+新闻库检索服务
+RAGWorker 与 RAGCollector 共用的 pulseglobe_news 检索实现
+
+支持两种模式:
+    vector  纯向量检索（HNSW，余弦距离）
+    hybrid  向量检索 + 全文检索，在同一条 SQL 中做倒数排名融合（RRF）
+
+向量检索的第一阶段可以使用全精度（vector）、半精度（halfvec）、二值量化（binary）
+或截断前缀（prefix，Matryoshka 表示的前 N 维）索引，非全精度的第一阶段再取
+rerank_candidates 个候选用全精度向量精确重排，以较小的索引换取接近的召回。
+vector 类型的 HNSW 最多 2000 维，维度更高时全精度第一阶段按 halfvec 表达式排序，
+与 sql/ 中的表达式索引一致。
+
+两种模式都支持按发布日期、国家过滤；过滤条件直接下推到索引扫描中，
+配合 pgvector 迭代扫描（hnsw.iterative_scan）或按国家的部分 HNSW 索引，
+避免过滤后结果不足或退化为全表精确检索
+
+设置 mmr_lambda 后多取 mmr_candidates 个候选，用最大边际相关（MMR）挑选
+彼此不重复的 limit 条，减少转载稿件造成的冗余
+
+设置 passages 后检索段落向量表（sql/create_news_chunks.sql），按文章聚合，
+结果的 content 只包含命中的段落，交给下游翻译和摘要的 token 更少、更相关
+
+向量列与查询模型取自 embedding.active_column（蓝绿重新向量化，见 scripts/reembed.py），
+新闻表与段落表使用同名的列
+
+rag.backend 为 mmap 时改用本地内存映射索引（见 mmap_index.py），用 create_retriever 创建
+"""
+import logging
+import math
+from dataclasses import dataclass, fields
+from datetime import date, timedelta
+from typing import Optional, get_args
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from langchain_openai import OpenAIEmbeddings
+
+from pulseglobe.core.config import DEFAULT_EMBEDDING_COLUMN, get_config
+from pulseglobe.core.tracing import span
+from pulseglobe.services.diversity import mmr, parse_vector
+
+logger = logging.getLogger(__name__)
+
+MODES = ("vector", "hybrid")
+BACKENDS = ("pgvector", "mmap")
+ITERATIVE_SCAN_MODES = ("off", "relaxed_order", "strict_order")
+FIRST_PASSES = ("vector", "halfvec", "binary", "prefix")
+
+# 只能给出近似排序、必须重排的第一阶段
+RERANK_REQUIRED = ("binary", "prefix")
+
+# hnsw.ef_search 的上限（pgvector 限制）
+MAX_EF_SEARCH = 1000
+
+# vector 类型可建 HNSW 索引的最大维度（pgvector 限制），更高维度用 halfvec 表达式索引
+MAX_VECTOR_INDEX_DIMS = 2000
+
+# 段落检索结果中相邻段落之间的分隔
+PASSAGE_SEPARATOR = "\n……\n"
+
+
+@dataclass
+class RetrievalOptions:
+    """检索参数（默认值可在 settings.yaml 的 rag 段覆盖）"""
+    mode: str = "vector"            # "vector" | "hybrid"
+    vector_candidates: int = 40     # hybrid 模式下向量检索候选数
+    text_candidates: int = 40       # hybrid 模式下全文检索候选数
+    rrf_k: int = 60                 # RRF 平滑常数：score = Σ weight / (rrf_k + rank)
+    vector_weight: float = 1.0
+    text_weight: float = 1.0
+
+    # 过滤条件
+    date_from: Optional[str] = None     # 发布日期下限（含），ISO 格式
+    date_to: Optional[str] = None       # 发布日期上限（含）
+    recent_days: Optional[int] = None   # 只检索最近 N 天，优先于 date_from
+    country: Optional[str] = None       # source_country，如 "MN"
+
+    # HNSW 查询参数（每次查询用 SET LOCAL 设置）
+    ef_search: int = 40                 # 候选列表大小，越大召回越高、越慢
+    iterative_scan: str = "relaxed_order"   # pgvector >= 0.8，过滤后不足 limit 时继续扫描索引
+
+    # 两阶段检索（halfvec / binary 需执行 sql/migrate_news_quantized.sql，prefix 需执行 sql/migrate_news_prefix.sql）
+    first_pass: str = "vector"          # 第一阶段索引："vector" | "halfvec" | "binary" | "prefix"
+    rerank_candidates: int = 100        # 非 vector 第一阶段的候选数，用全精度向量重排；0 表示不重排
+
+    # 结果多样化（MMR，需要 numpy）
+    mmr_lambda: Optional[float] = None  # None 不启用；1 等价于按相关度排序，越小越偏向多样性
+    mmr_candidates: int = 30            # MMR 从多少个候选中挑选 limit 条
+
+    # 段落检索（需执行 sql/create_news_chunks.sql 并运行 vectorize_news.py --chunks）
+    passages: bool = False              # 检索段落向量，按文章聚合，content 只返回命中的段落
+    passage_candidates: int = 60        # 段落候选数（聚合前）
+    max_passages: int = 3               # 每篇文章最多返回的段落数（按原文顺序拼接）
+
+    def __post_init__(self):
+        if self.mode not in MODES:
+            raise ValueError(f"不支持的检索模式: {self.mode}，可选: {MODES}")
+        if self.iterative_scan not in ITERATIVE_SCAN_MODES:
+            raise ValueError(f"不支持的 iterative_scan: {self.iterative_scan}，可选: {ITERATIVE_SCAN_MODES}")
+        if self.first_pass not in FIRST_PASSES:
+            raise ValueError(f"不支持的 first_pass: {self.first_pass}，可选: {FIRST_PASSES}")
+        if self.first_pass in RERANK_REQUIRED and self.rerank_candidates <= 0:
+            raise ValueError(f"{self.first_pass} 第一阶段只给出近似排序，必须设置 rerank_candidates > 0")
+        if self.mmr_lambda is not None and not 0 <= self.mmr_lambda <= 1:
+            raise ValueError(f"mmr_lambda 须在 [0, 1] 内: {self.mmr_lambda}")
+        if self.passages and (self.mode != "vector" or self.first_pass != "vector"):
+            raise ValueError("段落检索只支持 vector 模式与全精度第一阶段（段落表没有全文检索列和量化列）")
+        if self.max_passages < 1:
+            raise ValueError(f"max_passages 至少为 1: {self.max_passages}")
+
+    @property
+    def reranks(self) -> bool:
+        return self.first_pass != "vector" and self.rerank_candidates > 0
+
+    @property
+    def diversifies(self) -> bool:
+        return self.mmr_lambda is not None
+
+    def fetch_limit(self, limit: int) -> int:
+        """MMR 需要多取候选"""
+        return max(self.mmr_candidates, limit) if self.diversifies else limit
+
+    @property
+    def effective_date_from(self) -> Optional[str]:
+        if self.recent_days:
+            return (date.today() - timedelta(days=self.recent_days)).isoformat()
+        return self.date_from
+
+    @property
+    def has_filters(self) -> bool:
+        return bool(self.effective_date_from or self.date_to or self.country)
+
+    @classmethod
+    def from_config(cls, **overrides) -> "RetrievalOptions":
+        """从配置文件读取，overrides 中非 None 的值优先"""
+        section = get_config().get("rag", {}) or {}
+        values = {}
+        for f in fields(cls):
+            value = overrides.get(f.name)
+            if value is None:
+                value = section.get(f.name)
+            # 环境变量替换后的值均为字符串，空字符串视为未设置
+            if value is None or value == "":
+                continue
+            values[f.name] = _coerce(f.type, value)
+        return cls(**values)
+
+
+def _coerce(annotation, value):
+    """按字段注解转换配置值（Optional[X] 取 X）"""
+    args = [a for a in get_args(annotation) if a is not type(None)]
+    target = args[0] if args else annotation
+    if target is bool and isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return value if isinstance(value, target) else target(value)
+
+
+def create_embeddings() -> OpenAIEmbeddings:
+    """按 settings.yaml 的 embedding 段创建查询向量客户端"""
+    embedding_config = get_config().embedding
+    return OpenAIEmbeddings(
+        model=embedding_config.get("model", "Qwen/Qwen3-Embedding-4B"),
+        api_key=embedding_config.get("api_key"),
+        base_url=embedding_config.get("base_url"),
+        dimensions=embedding_config.get("dimensions", 2560),
+    )
+
+
+def create_retriever(options: RetrievalOptions = None, embeddings: OpenAIEmbeddings = None):
+    """
+    按 rag.backend 创建检索器
+
+    pgvector  NewsRetriever（默认）
+    mmap      MmapNewsRetriever，读取 scripts/export_mmap_index.py 导出的本地索引
+    """
+    backend = (get_config().get("rag", {}) or {}).get("backend") or "pgvector"
+    if backend not in BACKENDS:
+        raise ValueError(f"不支持的 RAG 后端: {backend}，可选: {BACKENDS}")
+    if backend == "mmap":
+        from pulseglobe.services.mmap_index import MmapNewsRetriever
+        return MmapNewsRetriever(options=options, embeddings=embeddings)
+    return NewsRetriever(options=options, embeddings=embeddings)
+
+
+class NewsRetriever:
+    """pulseglobe_news 检索器"""
+
+    # 返回给调用方的列
+    RESULT_COLUMNS = "n.doc_id, n.title, n.content, n.url, n.source_name, n.publish_date"
+
+    def _result_columns(self, options: RetrievalOptions, hits: str = "nearest") -> str:
+        """段落检索时 content 取自聚合后的段落（hits 为其来源的别名）；MMR 需要候选的向量"""
+        columns = self.RESULT_COLUMNS
+        if options.passages:
+            columns = columns.replace("n.content", f"{hits}.content")
+        if options.diversifies:
+            columns += f", n.{self.column}::text AS embedding"
+        return columns
+
+    def __init__(self, options: RetrievalOptions = None, embeddings: OpenAIEmbeddings = None):
+        config = get_config()
+
+        db_config = config.database
+        self.db_config = {
+            "host": db_config.get("host"),
+            "port": db_config.get("port"),
+            "dbname": db_config.get("name"),
+            "user": db_config.get("user"),
+            "password": db_config.get("password"),
+        }
+        self.table_name = db_config.get("table", "pulseglobe_news")
+        self.chunk_table = db_config.get("chunk_table", "pulseglobe_news_chunks")
+        self.column = config.embedding["column"]    # 蓝绿切换时为 active_column 指定的影子列
+        self.dimensions = int(config.embedding.get("dimensions", 2560))
+        self.prefix_dimensions = int(config.embedding.get("prefix_dimensions") or 0)
+
+        self.embeddings = embeddings or create_embeddings()
+
+        self.options = options or RetrievalOptions.from_config()
+        self._conn: Optional[psycopg2.extensions.connection] = None
+        self._iterative_scan_supported: Optional[bool] = None
+
+    def _get_connection(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(**self.db_config)
+        return self._conn
+
+    def embed(self, text: str) -> list[float]:
+        """生成查询向量"""
+        with span("http.embedding", model=self.embeddings.model):
+            return self.embeddings.embed_query(text)
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """批量生成查询向量（一次请求）"""
+        with span("http.embedding", model=self.embeddings.model, count=len(texts)):
+            return self.embeddings.embed_documents(texts)
+
+    def search(self, keyword: str, limit: int, options: RetrievalOptions = None) -> list[dict]:
+        """
+        检索新闻
+
+        Args:
+            keyword: 检索词（中文）
+            limit: 返回条数
+            options: 本次检索参数，默认使用实例参数
+
+        Returns:
+            [{doc_id, title, content, url, source_name, publish_date, similarity, score}, ...]
+            vector 模式下 score 即 similarity；hybrid 模式下为 RRF 分数；
+            passages 时 content 为命中的段落，similarity 取最近段落
+        """
+        options = options or self.options
+        query_embedding = self.embed(keyword)
+        fetch_limit = options.fetch_limit(limit)
+
+        if options.mode == "hybrid":
+            sql, params = self._hybrid_query(keyword, query_embedding, fetch_limit, options)
+        else:
+            sql, params = self._vector_query(query_embedding, fetch_limit, options)
+        if options.first_pass == "prefix":
+            params["qp"] = self._prefix_query(query_embedding)
+
+        conn = self._get_connection()
+        try:
+            with (
+                span(f"sql.rag.{options.mode}_search", table=self._search_table(options),
+                     filtered=options.has_filters),
+                conn.cursor(cursor_factory=RealDictCursor) as cur,
+            ):
+                self._apply_index_settings(cur, options, params["first_pass_limit"])
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        finally:
+            conn.rollback()
+
+        return self._diversify(rows, query_embedding, limit, options)
+
+    def search_many(self, keywords: list[str], limit: int, options: RetrievalOptions = None) -> dict[str, list[dict]]:
+        """
+        批量检索：一次 embedding 请求 + 一条 SQL（unnest 查询向量后 LATERAL 逐个检索）
+
+        Args:
+            keywords: 检索词列表（重复项只检索一次）
+            limit: 每个检索词的返回条数
+            options: 本次检索参数，默认使用实例参数
+
+        Returns:
+            {keyword: [同 search 的结果, ...]}，按 keywords 的顺序
+        """
+        options = options or self.options
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords:
+            return {}
+
+        query_embeddings = self.embed_many(keywords)
+        sql, params = self._batch_query(keywords, query_embeddings, options.fetch_limit(limit), options)
+
+        conn = self._get_connection()
+        try:
+            with (
+                span(f"sql.rag.{options.mode}_search_many", table=self._search_table(options),
+                     keyword_count=len(keywords), filtered=options.has_filters),
+                conn.cursor(cursor_factory=RealDictCursor) as cur,
+            ):
+                self._apply_index_settings(cur, options, params["first_pass_limit"])
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+        finally:
+            conn.rollback()
+
+        grouped = {keyword: [] for keyword in keywords}
+        for row in rows:
+            grouped[keywords[row["ord"] - 1]].append(row)
+        return {
+            keyword: self._diversify(grouped[keyword], embedding, limit, options)
+            for keyword, embedding in zip(keywords, query_embeddings)
+        }
+
+    def _search_table(self, options: RetrievalOptions) -> str:
+        return self.chunk_table if options.passages else self.table_name
+
+    def _diversify(self, rows: list[dict], query_embedding: list[float], limit: int,
+                   options: RetrievalOptions) -> list[dict]:
+        """启用 MMR 时从候选中挑选 limit 条（行中带 embedding 列），否则原样转换"""
+        if options.diversifies and len(rows) > limit:
+            with span("rag.mmr", candidates=len(rows), limit=limit):
+                picks = mmr(
+                    query_embedding,
+                    [parse_vector(row["embedding"]) for row in rows],
+                    limit,
+                    options.mmr_lambda,
+                )
+            rows = [rows[i] for i in picks]
+        return [self._to_result(row) for row in rows]
+
+    @staticmethod
+    def _to_result(row: dict) -> dict:
+        similarity = float(row["similarity"]) if row["similarity"] is not None else 0.0
+        return {
+            "doc_id": row["doc_id"],
+            "title": row["title"] or "",
+            "content": row["content"] or "",
+            "url": row["url"] or "",
+            "source_name": row["source_name"] or "",
+            "publish_date": row["publish_date"],
+            "similarity": similarity,
+            "score": float(row["score"]) if row["score"] is not None else similarity,
+        }
+
+    def _apply_index_settings(self, cur, options: RetrievalOptions, first_pass_limit: int):
+        """
+        事务级设置 HNSW 参数（查询结束后 rollback 即恢复）
+        
+        HNSW 单次扫描最多返回 ef_search 行，ef_search 至少取第一阶段的 LIMIT；
+        hnsw.iterative_scan 仅在 pgvector >= 0.8 上设置；更早的版本
+        按国家过滤可依赖部分索引（sql/migrate_news_filters.sql）
+        """
+        ef_search = min(max(options.ef_search, first_pass_limit), MAX_EF_SEARCH)
+        cur.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search),))
+        if options.iterative_scan != "off" and self._supports_iterative_scan(cur):
+            cur.execute("SELECT set_config('hnsw.iterative_scan', %s, true)", (options.iterative_scan,))
+
+    def _supports_iterative_scan(self, cur) -> bool:
+        if self._iterative_scan_supported is None:
+            cur.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            row = cur.fetchone()
+            version = tuple(int(p) for p in row["extversion"].split(".")[:2]) if row else (0, 0)
+            self._iterative_scan_supported = version >= (0, 8)
+            if not self._iterative_scan_supported:
+                logger.info(f"[NewsRetriever] pgvector {row and row['extversion']} 不支持迭代扫描，过滤检索依赖部分索引")
+        return self._iterative_scan_supported
+
+    @staticmethod
+    def _filter_clause(options: RetrievalOptions) -> tuple[str, dict]:
+        """生成过滤条件（国家以字面量形式出现，便于规划器匹配部分索引）"""
+        clauses = []
+        params = {}
+        date_from = options.effective_date_from
+        if date_from:
+            clauses.append("publish_date >= %(date_from)s")
+            params["date_from"] = date_from
+        if options.date_to:
+            clauses.append("publish_date <= %(date_to)s")
+            params["date_to"] = options.date_to
+        if options.country:
+            clauses.append("source_country = %(country)s")
+            params["country"] = options.country
+        return "".join(f" AND {c}" for c in clauses), params
+
+    def _prefix_query(self, query_embedding: list[float]) -> list[float]:
+        if not self.prefix_dimensions:
+            raise ValueError("first_pass=prefix 需要在 settings.yaml 中设置 embedding.prefix_dimensions")
+        return truncate_embedding(query_embedding, self.prefix_dimensions)
+
+    def _first_pass_expr(self, first_pass: str, q: str = "%(q)s", qp: str = "%(qp)s") -> tuple[str, str]:
+        """
+        第一阶段的 (非空判断列, 排序表达式)，表达式须与 migrate_news_quantized.sql 中的索引一致
+
+        q / qp 为查询向量（全维 / 截断前缀）的 SQL 表达式：单条检索为参数占位符，
+        批量检索为 LATERAL 外层的列
+
+        半精度、二值和前缀列都由 embedding 列派生，active_column 为其他列时只能使用 vector
+        """
+        if first_pass == "vector":
+            return self.column, self._vector_order(self.column, q)
+        if self.column != DEFAULT_EMBEDDING_COLUMN:
+            raise ValueError(f"first_pass={first_pass} 的索引列由 {DEFAULT_EMBEDDING_COLUMN} 派生，"
+                             f"active_column 为 {self.column} 时请使用 first_pass=vector")
+        dims = self.dimensions
+        if first_pass == "halfvec":
+            return "embedding_half", f"embedding_half <=> {q}::halfvec({dims})"
+        if first_pass == "binary":
+            return "embedding_half", (
+                f"binary_quantize(embedding_half)::bit({dims}) <~> binary_quantize({q}::halfvec({dims}))"
+            )
+        return "embedding_prefix", f"embedding_prefix <=> {qp}::vector"
+
+    def _vector_order(self, column: str, q: str) -> str:
+        """全精度第一阶段的排序表达式，见 vector_order"""
+        return vector_order(column, self.dimensions, q)
+
+    def _nearest_sql(
+        self,
+        options: RetrievalOptions,
+        filters: str,
+        limit_param: str,
+        q: str = "%(q)s",
+        qp: str = "%(qp)s",
+    ) -> str:
+        """
+        向量近邻子查询，返回按距离升序的 (doc_id, distance)
+
+        重排时第一阶段取 rerank_candidates 个候选（只读索引列），
+        再用全精度 embedding 计算余弦距离；不重排时 distance 即第一阶段距离
+        （vector 第一阶段按 halfvec 表达式排序时距离仍按全精度计算）
+        """
+        column, expr = self._first_pass_expr(options.first_pass, q, qp)
+        if not options.reranks:
+            distance = f"{self.column} <=> {q}::vector" if options.first_pass == "vector" else expr
+            return f"""
+                SELECT doc_id, {distance} AS distance
+                FROM {self.table_name}
+                WHERE {column} IS NOT NULL{filters}
+                ORDER BY {expr}
+                LIMIT %({limit_param})s
+            """
+        return f"""
+            SELECT c.doc_id, n.{self.column} <=> {q}::vector AS distance
+            FROM (
+                SELECT doc_id
+                FROM {self.table_name}
+                WHERE {column} IS NOT NULL{filters}
+                ORDER BY {expr}
+                LIMIT %(first_pass_limit)s
+            ) c
+            JOIN {self.table_name} n ON n.doc_id = c.doc_id
+            ORDER BY distance
+            LIMIT %({limit_param})s
+        """
+
+    def _passage_sql(self, filters: str, q: str = "%(q)s") -> str:
+        """
+        段落近邻子查询，按文章聚合，返回按距离升序的 (doc_id, distance, content)
+
+        先取 passage_candidates 个最近的段落（HNSW），每篇文章以最近段落的距离排序，
+        content 为该文章距离最近的 max_passages 个段落按原文顺序拼接
+
+        排序表达式见 _vector_order，距离按全精度计算
+        """
+        order = self._vector_order(self.column, q)
+        return f"""
+            SELECT doc_id, min(distance) AS distance,
+                   string_agg(text, %(passage_separator)s ORDER BY chunk_no)
+                       FILTER (WHERE passage_rank <= %(max_passages)s) AS content
+            FROM (
+                SELECT c.*, row_number() OVER (PARTITION BY c.doc_id ORDER BY c.distance) AS passage_rank
+                FROM (
+                    SELECT doc_id, chunk_no, text, {self.column} <=> {q}::vector AS distance
+                    FROM {self.chunk_table}
+                    WHERE {self.column} IS NOT NULL{filters}
+                    ORDER BY {order}
+                    LIMIT %(first_pass_limit)s
+                ) c
+            ) ranked
+            GROUP BY doc_id
+            ORDER BY distance
+            LIMIT %(limit)s
+        """
+
+    @staticmethod
+    def _passage_params(options: RetrievalOptions, limit: int) -> dict:
+        return {
+            "limit": limit,
+            # 候选至少够每篇文章取满段落
+            "first_pass_limit": max(options.passage_candidates, limit * options.max_passages),
+            "max_passages": options.max_passages,
+            "passage_separator": PASSAGE_SEPARATOR,
+        }
+
+    @staticmethod
+    def _first_pass_limit(options: RetrievalOptions, limit: int) -> int:
+        return max(options.rerank_candidates, limit) if options.reranks else limit
+
+    def _vector_query(
+        self,
+        query_embedding: list[float],
+        limit: int,
+        options: RetrievalOptions,
+    ) -> tuple[str, dict]:
+        """
+        迭代扫描的 relaxed_order 可能返回略微乱序的结果，
+        先在物化 CTE 中取 limit 条，再按距离重新排序
+        """
+        filters, params = self._filter_clause(options)
+        if options.passages:
+            nearest = self._passage_sql(filters)
+            params.update(self._passage_params(options, limit))
+        else:
+            nearest = self._nearest_sql(options, filters, "limit")
+            params.update({"limit": limit, "first_pass_limit": self._first_pass_limit(options, limit)})
+        sql = f"""
+            WITH nearest AS MATERIALIZED (
+                {nearest}
+            )
+            SELECT {self._result_columns(options)},
+                   1 - nearest.distance AS similarity,
+                   NULL AS score
+            FROM nearest
+            JOIN {self.table_name} n ON n.doc_id = nearest.doc_id
+            ORDER BY nearest.distance
+        """
+        return sql, {"q": query_embedding, **params}
+
+    def _batch_query(
+        self,
+        keywords: list[str],
+        query_embeddings: list[list[float]],
+        limit: int,
+        options: RetrievalOptions,
+    ) -> tuple[str, dict]:
+        """
+        查询向量以文本数组传入，unnest 后每行经 LATERAL 执行与单条检索相同的子查询，
+        每个检索词仍各自走 HNSW / GIN 索引；ord 为检索词序号（从 1 开始）
+        """
+        filters, filter_params = self._filter_clause(options)
+        prefixes = [None] * len(keywords)
+        if options.first_pass == "prefix":
+            prefixes = [_vector_literal(self._prefix_query(e)) for e in query_embeddings]
+
+        if options.mode == "hybrid":
+            hits = f"""
+                SELECT f.doc_id, f.score, row_number() OVER (ORDER BY f.score DESC) AS rank
+                FROM ({self._fused_sql(options, filters, "queries.q", "queries.qp", "queries.keyword")}) f
+            """
+            params = self._hybrid_params(options, limit)
+        elif options.passages:
+            hits = f"""
+                SELECT p.doc_id, p.content, p.distance, NULL::float8 AS score,
+                       row_number() OVER (ORDER BY p.distance) AS rank
+                FROM ({self._passage_sql(filters, "queries.q")}) p
+            """
+            params = self._passage_params(options, limit)
+        else:
+            hits = f"""
+                SELECT v.doc_id, NULL::float8 AS score, row_number() OVER (ORDER BY v.distance) AS rank
+                FROM ({self._nearest_sql(options, filters, "limit", "queries.q", "queries.qp")}) v
+            """
+            params = {"limit": limit, "first_pass_limit": self._first_pass_limit(options, limit)}
+
+        sql = f"""
+            WITH queries AS (
+                SELECT t.ord, t.keyword, t.q::vector AS q, t.qp::vector AS qp
+                FROM unnest(%(keywords)s::text[], %(qs)s::text[], %(qps)s::text[])
+                     WITH ORDINALITY AS t(keyword, q, qp, ord)
+            )
+            SELECT queries.ord, {self._result_columns(options, "hits")},
+                   1 - {"hits.distance" if options.passages else f"(n.{self.column} <=> queries.q)"} AS similarity,
+                   hits.score
+            FROM queries
+            CROSS JOIN LATERAL ({hits}) hits
+            JOIN {self.table_name} n ON n.doc_id = hits.doc_id
+            ORDER BY queries.ord, hits.rank
+        """
+        return sql, {
+            "keywords": keywords,
+            "qs": [_vector_literal(e) for e in query_embeddings],
+            "qps": prefixes,
+            **params,
+            **filter_params,
+        }
+
+    def _hybrid_query(
+        self,
+        keyword: str,
+        query_embedding: list[float],
+        limit: int,
+        options: RetrievalOptions,
+    ) -> tuple[str, dict]:
+        """
+        向量候选与全文候选各自取 top-N，按 weight / (rrf_k + rank) 求和融合
+
+        两路候选都走索引（HNSW / GIN），融合只在 2N 行内进行；过滤条件分别下推到两路候选
+        """
+        filters, filter_params = self._filter_clause(options)
+        sql = f"""
+            SELECT {self._result_columns(options)},
+                   1 - (n.{self.column} <=> %(q)s::vector) AS similarity,
+                   f.score
+            FROM ({self._fused_sql(options, filters)}) f
+            JOIN {self.table_name} n ON n.doc_id = f.doc_id
+            ORDER BY f.score DESC
+        """
+        params = {
+            "q": query_embedding,
+            "keyword": keyword,
+            **self._hybrid_params(options, limit),
+            **filter_params,
+        }
+        return sql, params
+
+    def _fused_sql(
+        self,
+        options: RetrievalOptions,
+        filters: str,
+        q: str = "%(q)s",
+        qp: str = "%(qp)s",
+        keyword: str = "%(keyword)s",
+    ) -> str:
+        """RRF 融合子查询，返回按分数降序的 (doc_id, score)"""
+        return f"""
+            WITH vec AS (
+                SELECT doc_id, row_number() OVER (ORDER BY distance) AS rank
+                FROM ({self._nearest_sql(options, filters, "vector_candidates", q, qp)}) v
+            ),
+            txt AS (
+                SELECT doc_id, row_number() OVER (ORDER BY text_rank DESC) AS rank
+                FROM (
+                    SELECT doc_id, ts_rank_cd(search_vector, query) AS text_rank
+                    FROM {self.table_name}, pulseglobe_search_query({keyword}) AS query
+                    WHERE search_vector @@ query{filters}
+                    ORDER BY text_rank DESC
+                    LIMIT %(text_candidates)s
+                ) t
+            )
+            SELECT doc_id, sum(score) AS score
+            FROM (
+                SELECT doc_id, %(vector_weight)s / (%(rrf_k)s + rank) AS score FROM vec
+                UNION ALL
+                SELECT doc_id, %(text_weight)s / (%(rrf_k)s + rank) AS score FROM txt
+            ) candidates
+            GROUP BY doc_id
+            ORDER BY score DESC
+            LIMIT %(limit)s
+        """
+
+    def _hybrid_params(self, options: RetrievalOptions, limit: int) -> dict:
+        vector_candidates = max(options.vector_candidates, limit)
+        return {
+            "limit": limit,
+            "vector_candidates": vector_candidates,
+            "first_pass_limit": self._first_pass_limit(options, vector_candidates),
+            "text_candidates": options.text_candidates,
+            "rrf_k": options.rrf_k,
+            "vector_weight": float(options.vector_weight),
+            "text_weight": float(options.text_weight),
+        }
+
+    def close(self):
+        if self._conn and not self._conn.closed:
+            self._conn.close()
+
+
+def vector_index_target(column: str, dimensions: int) -> tuple[str, str]:
+    """
+    全精度向量列的 HNSW 索引 (表达式, 操作符类)
+
+    vector 类型的 HNSW 最多 2000 维，维度更高时对 halfvec 表达式建索引，
+    与 sql/create_vector_index.sql、migrate_news_filters.sql、create_news_chunks.sql 一致
+    """
+    if dimensions > MAX_VECTOR_INDEX_DIMS:
+        return f"({column}::halfvec({dimensions}))", "halfvec_cosine_ops"
+    return column, "vector_cosine_ops"
+
+
+def vector_order(column: str, dimensions: int, q: str) -> str:
+    """
+    按全精度向量列排序的表达式，与 vector_index_target 的索引一致才能走索引
+
+    q 为查询向量的 SQL 表达式
+    """
+    target, _ = vector_index_target(column, dimensions)
+    if target != column:
+        return f"{target} <=> {q}::halfvec({dimensions})"
+    return f"{column} <=> {q}::vector"
+
+
+def _vector_literal(embedding: list[float]) -> str:
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+def truncate_embedding(embedding: list[float], dimensions: int) -> list[float]:
+    """
+    截取前 dimensions 维并重新归一化（Matryoshka 表示的低维版本）
+
+    与 scripts/vectorize_news.py 写入 embedding_prefix 的算法一致
+    """
+    prefix = embedding[:dimensions]
+    norm = math.sqrt(sum(x * x for x in prefix))
+    return [x / norm for x in prefix] if norm else prefix
@@ -2,18 +2,42 @@
 数据包存储服务
 负责将采集的数据写入 data_packets 表
 """
+import asyncio
 import logging
-from typing import Optional
+from typing import AsyncIterator, Iterator, Optional
 from datetime import datetime
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from psycopg2.extras import RealDictCursor, Json, execute_values
 
 from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
 from pulseglobe.models.data_packet import DataPacket
+from pulseglobe.models.packet_batch import PacketBatch
 
 logger = logging.getLogger(__name__)
 
+# data_packets 可查询列（用于列投影校验）
+PACKET_COLUMNS = (
+    "id", "session_id", "source_type", "source_detail",
+    "keyword", "keyword_type",
+    "title", "content", "content_zh", "summary",
+    "url", "author", "publish_date", "platform",
+    "engagement", "created_at", "tags", "content_hash",
+)
+
+# 构建 DataPacket 必须投影的列（content_hash 一并读取，避免由部分字段算出错误哈希）
+PACKET_REQUIRED_COLUMNS = ("session_id", "source_type", "content_hash")
+
+# 大纲阶段需要的列（不含大文本 content / content_zh）
+OUTLINE_COLUMNS = ("id", "source_type", "keyword", "summary", "url", "title")
+
+# 检索结果默认列
+SEARCH_COLUMNS = ("id", "source_type", "keyword", "title", "summary", "url", "publish_date")
+
+# 可做子串匹配的列（均有 pg_trgm 索引，见 sql/migrate_packets_search.sql）
+SUBSTRING_FIELDS = ("keyword", "title", "content_zh")
+
 
 class PacketStorage:
     """数据包存储服务"""
@@ -47,7 +71,7 @@ class PacketStorage:
         conn = self._get_connection()
         
         try:
-            with conn.cursor() as cur:
+            with span("sql.data_packets.insert"), conn.cursor() as cur:
                 cur.execute("""
                     INSERT INTO data_packets (
                         session_id, source_type, source_detail,
@@ -97,26 +121,61 @@ class PacketStorage:
         """
         批量保存数据包
         
+        先在内存中按 (session_id, content_hash) 去重，再用多行 INSERT 写入；
+        批量写入失败时退回逐条写入，跳过异常数据包
+        
         Returns:
             {"saved": int, "duplicates": int}
         """
-        saved = 0
-        duplicates = 0
-        
-        for packet in packets:
-            try:
-                result = self.save_packet(packet)
-                if result:
-                    saved += 1
-                else:
-                    duplicates += 1
-            except Exception as e:
-                logger.warning(f"跳过异常数据包: {e}")
-                continue
+        batch = PacketBatch.from_packets(packets)
+        try:
+            saved = self.save_batch(batch)
+            duplicates = len(batch) - saved
+        except Exception as e:
+            logger.warning(f"[PacketStorage] 批量写入失败，改为逐条写入: {e}")
+            saved = 0
+            duplicates = 0
+            for packet in packets:
+                try:
+                    result = self.save_packet(packet)
+                    if result:
+                        saved += 1
+                    else:
+                        duplicates += 1
+                except Exception as e:
+                    logger.warning(f"跳过异常数据包: {e}")
+                    continue
         
         logger.info(f"[PacketStorage] 保存完成: {saved} 新增, {duplicates} 重复")
         return {"saved": saved, "duplicates": duplicates}
     
+    def save_batch(self, batch: PacketBatch, page_size: int = 500) -> int:
+        """
+        以多行 INSERT 写入一个批次（批内先去重）
+        
+        Returns:
+            新增记录数（重复数据不计入）
+        """
+        unique = batch.dedup()
+        if not len(unique):
+            return 0
+        
+        conn = self._get_connection()
+        try:
+            with span("sql.data_packets.insert_batch", rows=len(unique)), conn.cursor() as cur:
+                inserted = execute_values(cur, f"""
+                    INSERT INTO data_packets (
+                        {", ".join(PacketBatch.COLUMNS)}, content_hash
+                    ) VALUES %s
+                    ON CONFLICT (session_id, content_hash) DO NOTHING
+                    RETURNING id
+                """, unique.rows(adapt=Json), page_size=page_size, fetch=True)
+            conn.commit()
+            return len(inserted)
+        except Exception:
+            conn.rollback()
+            raise
+    
     def get_packets_by_session(
         self, 
         session_id: str,
@@ -146,17 +205,211 @@ class PacketStorage:
         
         query += " ORDER BY created_at"
         
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with (
+            span("sql.data_packets.select_session", session_id=session_id),
+            conn.cursor(cursor_factory=RealDictCursor) as cur,
+        ):
             cur.execute(query, params)
             rows = cur.fetchall()
         
         return [DataPacket.from_dict(dict(row)) for row in rows]
     
+    def iter_session_pages(
+        self,
+        session_id: str,
+        columns: tuple[str, ...] = None,
+        page_size: int = 1000,
+        source_type: str = None,
+        tags: list[str] = None,
+        after_id: int = 0,
+    ) -> Iterator[list[dict]]:
+        """
+        按 (session_id, id) 键集分页读取会话，逐页产出字典列表
+        
+        每页是一次独立的短查询（WHERE id > 上一页最后 id），不持有长事务，
+        也不随页数增加而变慢；页间可中断并通过 after_id 续读
+        
+        Args:
+            session_id: 会话ID
+            columns: 列投影，默认全部列；始终包含 id
+            page_size: 每页行数
+            source_type: 可选的来源过滤
+            tags: 可选的标签过滤（任一匹配）
+            after_id: 从该 id 之后开始读取
+        """
+        columns = self._resolve_columns(columns)
+        query = f"SELECT {', '.join(columns)} FROM data_packets WHERE session_id = %s AND id > %s"
+        filters = []
+        if source_type:
+            query += " AND source_type = %s"
+            filters.append(source_type)
+        if tags:
+            query += " AND tags && %s"
+            filters.append(tags)
+        query += " ORDER BY id LIMIT %s"
+        
+        last_id = after_id
+        while True:
+            rows = self._fetch_page(query, [session_id, last_id, *filters, page_size], session_id)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+    
+    async def astream_packets(
+        self,
+        session_id: str,
+        columns: tuple[str, ...] = None,
+        page_size: int = 1000,
+        source_type: str = None,
+        tags: list[str] = None,
+    ) -> AsyncIterator[DataPacket]:
+        """
+        异步流式读取会话数据包（键集分页，每页在线程中执行查询）
+        
+        只投影部分列时，session_id / source_type / content_hash 总会被读取，
+        其余未选择的字段取 DataPacket 默认值
+        """
+        if columns:
+            columns = (*columns, *(c for c in PACKET_REQUIRED_COLUMNS if c not in columns))
+        async for rows in self._astream_pages(session_id, columns, page_size, source_type, tags):
+            for row in rows:
+                yield DataPacket.from_dict(row)
+    
+    async def astream_summaries(
+        self,
+        session_id: str,
+        page_size: int = 1000,
+        source_type: str = None,
+    ) -> AsyncIterator[dict]:
+        """
+        异步流式读取大纲摘要（不读取 content / content_zh）
+        
+        与 get_summaries_for_outline 不同，按 id 顺序产出，需要分组的调用方自行聚合
+        
+        Yields:
+            {id, source_type, keyword, summary, url, title}
+        """
+        async for rows in self._astream_pages(session_id, OUTLINE_COLUMNS, page_size, source_type, None):
+            for row in rows:
+                yield row
+    
+    async def _astream_pages(self, session_id, columns, page_size, source_type, tags):
+        pages = self.iter_session_pages(session_id, columns, page_size, source_type, tags)
+        while True:
+            rows = await asyncio.to_thread(next, pages, None)
+            if rows is None:
+                return
+            yield rows
+    
+    def _fetch_page(self, query: str, params: list, session_id: str) -> list[dict]:
+        conn = self._get_connection()
+        try:
+            with (
+                span("sql.data_packets.page", session_id=session_id),
+                conn.cursor(cursor_factory=RealDictCursor) as cur,
+            ):
+                cur.execute(query, params)
+                rows = [dict(row) for row in cur.fetchall()]
+        finally:
+            # 只读查询，结束事务避免长时间 idle in transaction
+            conn.rollback()
+        return rows
+    
+    @staticmethod
+    def _resolve_columns(columns) -> list[str]:
+        if not columns:
+            return list(PACKET_COLUMNS)
+        unknown = [c for c in columns if c not in PACKET_COLUMNS]
+        if unknown:
+            raise ValueError(f"未知列: {unknown}")
+        # 键集分页依赖 id
+        return ["id"] + [c for c in columns if c != "id"]
+    
+    def search_packets(
+        self,
+        session_id: str,
+        query: str,
+        columns: tuple[str, ...] = None,
+        source_type: str = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """
+        会话内全文检索（search_vector GIN 索引，中文按二元组匹配）
+        
+        标题命中权重最高，其次摘要、中文正文、原文
+        
+        Args:
+            session_id: 会话ID
+            query: 检索词，如 "矿业投资"
+            columns: 返回列，默认 SEARCH_COLUMNS
+            source_type: 可选的来源过滤
+            limit: 返回条数
+        
+        Returns:
+            按相关度降序的字典列表，附带 rank 字段
+        """
+        columns = self._resolve_columns(columns or SEARCH_COLUMNS)
+        sql = f"""
+            SELECT {', '.join(columns)}, ts_rank_cd(search_vector, q) AS rank
+            FROM data_packets, pulseglobe_search_query(%s) AS q
+            WHERE session_id = %s AND search_vector @@ q
+        """
+        params = [query, session_id]
+        if source_type:
+            sql += " AND source_type = %s"
+            params.append(source_type)
+        sql += " ORDER BY rank DESC, id LIMIT %s"
+        params.append(limit)
+        
+        with span("sql.data_packets.search", session_id=session_id):
+            return self._fetch_page(sql, params, session_id)
+    
+    def search_substring(
+        self,
+        session_id: str,
+        text: str,
+        fields: tuple[str, ...] = SUBSTRING_FIELDS,
+        columns: tuple[str, ...] = None,
+        limit: int = 50,
+    ) -> list[dict]:
+        """
+        会话内子串匹配（ILIKE，由 pg_trgm 索引加速）
+        
+        适合人名、地名、型号等不适合分词的精确片段
+        
+        Args:
+            session_id: 会话ID
+            text: 子串
+            fields: 参与匹配的列（任一命中即可）
+            columns: 返回列，默认 SEARCH_COLUMNS
+            limit: 返回条数
+        """
+        unknown = [f for f in fields if f not in SUBSTRING_FIELDS]
+        if unknown:
+            raise ValueError(f"不支持子串匹配的列: {unknown}")
+        columns = self._resolve_columns(columns or SEARCH_COLUMNS)
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        
+        sql = f"""
+            SELECT {', '.join(columns)}
+            FROM data_packets
+            WHERE session_id = %s AND ({' OR '.join(f'{f} ILIKE %s' for f in fields)})
+            ORDER BY id
+            LIMIT %s
+        """
+        params = [session_id, *([pattern] * len(fields)), limit]
+        
+        with span("sql.data_packets.search_substring", session_id=session_id):
+            return self._fetch_page(sql, params, session_id)
+    
     def get_session_stats(self, session_id: str) -> dict:
         """获取session统计信息"""
         conn = self._get_connection()
         
-        with conn.cursor() as cur:
+        with span("sql.data_packets.stats", session_id=session_id), conn.cursor() as cur:
             cur.execute("""
                 SELECT source_type, COUNT(*) as count
                 FROM data_packets
@@ -180,7 +433,10 @@ class PacketStorage:
         """
         conn = self._get_connection()
         
-        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+        with (
+            span("sql.data_packets.outline", session_id=session_id),
+            conn.cursor(cursor_factory=RealDictCursor) as cur,
+        ):
             cur.execute("""
                 SELECT source_type, keyword, summary, url, title
                 FROM data_packets
@@ -190,6 +446,69 @@ class PacketStorage:
             
             return [dict(row) for row in cur.fetchall()]
     
+    def get_outline_digest(
+        self,
+        session_id: str,
+        per_keyword: int = 5,
+        per_source: int = None,
+        source_types: list[str] = None,
+    ) -> list[dict]:
+        """
+        获取大纲摘要：每个 (来源, 关键词) 取排序信号最高的 top-k
+        
+        排序信号见 sql/migrate_packets_outline.sql（rag 按相似度、tavily 按相关度、
+        社交媒体按互动量）；设置 per_source 时再按来源截断，
+        截断按组内名次轮转，保证每个关键词都有机会入选
+        
+        Args:
+            session_id: 会话ID
+            per_keyword: 每个 (来源, 关键词) 保留条数
+            per_source: 每个来源保留条数上限，None 表示不限
+            source_types: 可选的来源过滤
+        
+        Returns:
+            [{id, source_type, keyword, summary, url, title, signal, keyword_rank}, ...]
+            按 source_type, keyword, keyword_rank 排序
+        """
+        source_filter = ""
+        params = [session_id]
+        if source_types:
+            source_filter = "AND source_type = ANY(%s)"
+            params.append(list(source_types))
+        params.append(per_keyword)
+        params.append(per_source)
+        
+        # ranked 只读覆盖索引；摘要等文本列仅对入选行回表
+        sql = f"""
+            WITH ranked AS (
+                SELECT id, source_type, keyword, rank_signal,
+                       row_number() OVER (
+                           PARTITION BY source_type, keyword
+                           ORDER BY rank_signal DESC NULLS LAST, id
+                       ) AS keyword_rank
+                FROM data_packets
+                WHERE session_id = %s {source_filter}
+            ), capped AS (
+                SELECT *,
+                       row_number() OVER (
+                           PARTITION BY source_type
+                           ORDER BY keyword_rank, rank_signal DESC NULLS LAST, id
+                       ) AS source_rank
+                FROM ranked
+                WHERE keyword_rank <= %s
+            )
+            SELECT p.id, p.source_type, p.keyword, p.summary, p.url, p.title,
+                   c.rank_signal AS signal, c.keyword_rank
+            FROM capped c
+            JOIN data_packets p ON p.id = c.id
+            WHERE %s::int IS NULL OR c.source_rank <= %s::int
+            ORDER BY p.source_type, p.keyword, c.keyword_rank
+        """
+        params.append(per_source)
+        
+        with span("sql.data_packets.outline_digest", session_id=session_id):
+            return self._fetch_page(sql, params, session_id)
+    
     def close(self):
         """关闭连接"""
         if self._conn and not self._conn.closed:
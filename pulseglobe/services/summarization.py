@@ -6,6 +6,7 @@ import logging
 
 from langchain_core.messages import HumanMessage
 
+from pulseglobe.core.tracing import span
 from pulseglobe.services.llm import get_llm_client
 
 logger = logging.getLogger(__name__)
@@ -60,7 +61,8 @@ class SummarizationService:
         prompt = SUMMARIZATION_PROMPT.format(content=full_text)
         
         try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            with span("llm.summarize", chars=len(full_text)):
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
             summary = response.content.strip()
             
             # 确保不超过100字
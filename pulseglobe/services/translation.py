@@ -10,7 +10,9 @@ from abc import ABC, abstractmethod
 import httpx
 from langchain_core.messages import HumanMessage
 
+from pulseglobe.core.concurrency import AdaptiveLimiter
 from pulseglobe.core.config import get_config
+from pulseglobe.core.tracing import span
 from pulseglobe.services.llm import get_llm_client
 
 logger = logging.getLogger(__name__)
@@ -28,9 +30,11 @@ class BaseTranslator(ABC):
 class XmorTranslator(BaseTranslator):
     """讯蒙 Tengri API 翻译器"""
     
-    def __init__(self, api_key: str, base_url: str = "https://api.xmor.cn"):
+    def __init__(self, api_key: str, base_url: str = "https://api.xmor.cn", limiter: AdaptiveLimiter = None):
         self.api_key = api_key
         self.base_url = base_url
+        # 自适应并发：429 / 5xx / 超时时收缩并退避重试
+        self.limiter = limiter or AdaptiveLimiter(name="xmor")
         self.client = httpx.AsyncClient(
             timeout=30.0,
             headers={
@@ -45,20 +49,24 @@ class XmorTranslator(BaseTranslator):
             return text
         
         try:
-            response = await self.client.post(
-                f"{self.base_url}/v1/translate",
-                json={
-                    "text": text,
-                    "target_lang": target_lang,
-                }
-            )
-            response.raise_for_status()
-            result = response.json()
+            with span("http.xmor.translate", chars=len(text)):
+                result = await self.limiter.run(self._post, text, target_lang)
             return result.get("translation", text)
         except Exception as e:
             logger.error(f"讯蒙翻译失败: {e}")
             return text  # 失败时返回原文
     
+    async def _post(self, text: str, target_lang: str) -> dict:
+        response = await self.client.post(
+            f"{self.base_url}/v1/translate",
+            json={
+                "text": text,
+                "target_lang": target_lang,
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+    
     async def close(self):
         await self.client.aclose()
 
@@ -86,7 +94,8 @@ class LLMTranslator(BaseTranslator):
 {text}"""
         
         try:
-            response = await self.llm.ainvoke([HumanMessage(content=prompt)])
+            with span("llm.translate", chars=len(text)):
+                response = await self.llm.ainvoke([HumanMessage(content=prompt)])
             return response.content.strip()
         except Exception as e:
             logger.error(f"LLM翻译失败: {e}")
@@ -110,6 +119,9 @@ class TranslationService:
       provider: "xmor"  # 或 "llm"
       api_key: "${XMOR_API_KEY}"
       base_url: "https://api.xmor.cn"
+      concurrency:      # 自适应并发（见 pulseglobe/core/concurrency.py）
+        initial: 4
+        max: 16
     """
     
     def __init__(self, provider: str = None):
@@ -121,7 +133,8 @@ class TranslationService:
         if self.provider == "xmor":
             api_key = trans_config.get("api_key", "")
             base_url = trans_config.get("base_url", "https://api.xmor.cn")
-            self.translator = XmorTranslator(api_key, base_url)
+            limiter = AdaptiveLimiter.from_config(trans_config.get("concurrency"), name="xmor")
+            self.translator = XmorTranslator(api_key, base_url, limiter=limiter)
             logger.info("[TranslationService] 使用讯蒙 Tengri API")
         else:
             self.translator = LLMTranslator()
@@ -0,0 +1,182 @@
+"""
+句段级翻译记忆（精确匹配）
+
+蒙古国媒体大量重复署名、通讯社页脚、固定栏目标题和转载稿。翻译前把标题和正文按句子
+切成句段，先在 PostgreSQL 中的翻译记忆表（sql/create_translation_memory.sql）按句段
+查找，只把未命中的句段交给翻译 API，译文再写回记忆表供后续文章复用。
+
+句段按空白归一化后取 SHA-256 作为键（含源语言和目标语言），超长的句子按长度硬切，
+单次请求的文本长度有上限，避免长文整篇请求超时
+
+用法:
+    memory = TranslationMemory(db_config)
+    segments, gaps = split_segments(text)
+    found = memory.lookup(segments, "auto", "zh")
+"""
+import hashlib
+import logging
+import re
+import threading
+from typing import Optional
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from pulseglobe.services.chunking import chunk_text, split_sentences
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SEGMENT_CHARS = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    """合并连续空白，作为匹配的依据"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def segment_key(text: str, source_lang: str, target_lang: str) -> str:
+    return hashlib.sha256(f"{source_lang}\x1f{target_lang}\x1f{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+def split_segments(text: str, max_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+                   merge: bool = False) -> tuple[list[str], list[str]]:
+    """
+    切分句段
+
+    Args:
+        text: 原文
+        max_chars: 每个句段的字符数上限（超长的句子按长度硬切）
+        merge: 把相邻句子合并到不超过 max_chars（不使用翻译记忆时减少请求数）
+
+    Returns:
+        (segments, gaps)：gaps 比 segments 多一项，gaps[i] 为第 i 个句段之前的原文间隔
+        （换行、空白），用于把译文按原段落结构拼回
+    """
+    text = text or ""
+    if merge:
+        spans = [(chunk.start, chunk.end) for chunk in chunk_text(text, max_chars, overlap=0)]
+    else:
+        spans = [
+            (offset, min(offset + max_chars, end))
+            for start, end in split_sentences(text)
+            for offset in range(start, end, max_chars)
+        ]
+
+    segments = []
+    gaps = []
+    position = 0
+    for start, end in spans:
+        gaps.append(text[position:start])
+        segments.append(text[start:end])
+        position = end
+    gaps.append(text[position:])
+    return segments, gaps
+
+
+def assemble(translations: list[str], gaps: list[str]) -> str:
+    """
+    按原文间隔拼接译文
+
+    中文译文句间不需要空格，只保留间隔中的换行（段落结构）
+    """
+    parts = []
+    for gap, translation in zip(gaps, translations):
+        parts.append("\n" * gap.count("\n"))
+        parts.append(translation)
+    return "".join(parts).strip()
+
+
+class TranslationMemory:
+    """
+    持久化的句段翻译记忆
+
+    使用独立的自动提交连接；方法是同步的，在协程中用 asyncio.to_thread 调用，
+    内部加锁保证多个线程不会同时使用连接
+    """
+
+    def __init__(self, db_config: dict, table: str = "translation_memory"):
+        self.db_config = {
+            "host": db_config.get("host", "localhost"),
+            "port": db_config.get("port", 5432),
+            "dbname": db_config.get("name", "news_db"),
+            "user": db_config.get("user", "postgres"),
+            "password": db_config.get("password", ""),
+        }
+        self.table = table
+        self._conn: Optional[psycopg2.extensions.connection] = None
+        self._lock = threading.Lock()
+        self.stats = {"segments": 0, "hits": 0, "misses": 0, "chars_saved": 0, "chars_sent": 0}
+
+    def _connection(self):
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg2.connect(**self.db_config)
+            self._conn.autocommit = True
+        return self._conn
+
+    def lookup(self, segments: list[str], source_lang: str, target_lang: str) -> dict[str, str]:
+        """
+        查找句段译文并累计命中次数
+
+        Returns:
+            {句段键: 译文}，只包含命中的句段
+        """
+        keys = list({segment_key(s, source_lang, target_lang) for s in segments})
+        if not keys:
+            return {}
+        with self._lock, self._connection().cursor() as cur:
+            cur.execute(f"SELECT source_hash, target_text FROM {self.table} WHERE source_hash = ANY(%s)", (keys,))
+            found = dict(cur.fetchall())
+            if found:
+                cur.execute(f"""
+                    UPDATE {self.table} SET hits = hits + 1, last_used_at = NOW()
+                    WHERE source_hash = ANY(%s)
+                """, (list(found),))
+        return found
+
+    def store(self, pairs: list[tuple[str, str]], source_lang: str, target_lang: str):
+        """写入 (原文句段, 译文)，已存在时覆盖译文"""
+        rows = {
+            segment_key(source, source_lang, target_lang): (source, target)
+            for source, target in pairs if target
+        }
+        if not rows:
+            return
+        with self._lock, self._connection().cursor() as cur:
+            execute_values(cur, f"""
+                INSERT INTO {self.table} (source_hash, source_lang, target_lang, source_text, target_text)
+                VALUES %s
+                ON CONFLICT (source_hash) DO UPDATE SET target_text = EXCLUDED.target_text
+            """, [
+                (key, source_lang, target_lang, normalize(source), target)
+                for key, (source, target) in rows.items()
+            ])
+
+    def record(self, segments: int, hits: list[str], sent: list[str]):
+        """
+        累计本次运行的统计
+
+        Args:
+            segments: 句段总数
+            hits: 命中记忆的句段（按出现次数）
+            sent: 实际发送翻译的句段（同一文本内重复的句段只发送一次）
+        """
+        self.stats["segments"] += segments
+        self.stats["hits"] += len(hits)
+        self.stats["misses"] += segments - len(hits)
+        self.stats["chars_saved"] += sum(len(s) for s in hits)
+        self.stats["chars_sent"] += sum(len(s) for s in sent)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.stats["hits"] / self.stats["segments"] if self.stats["segments"] else 0.0
+
+    def summary(self) -> str:
+        stats = self.stats
+        return (f"翻译记忆: 句段 {stats['segments']}, 命中 {stats['hits']} ({self.hit_rate:.1%}), "
+                f"节省 {stats['chars_saved']} 字符, 发送 {stats['chars_sent']} 字符")
+
+    def close(self):
+        if self._conn and not self._conn.closed:
+            self._conn.close()
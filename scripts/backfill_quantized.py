@@ -0,0 +1,114 @@
+"""
+半精度向量回填工具：为已有向量的新闻写入 embedding_half
+
+先执行 sql/migrate_news_quantized.sql 的第 1、2 步（新写入的数据由触发器同步），
+再用本脚本分批回填存量数据，最后建索引。每批单独提交，可随时中断后重跑。
+
+用法:
+    python scripts/backfill_quantized.py [options]
+
+选项:
+    --batch-size    每批行数 (默认: 2000)
+    --sleep         批次间休眠秒数，降低对线上查询的影响 (默认: 0)
+    --dry-run       只统计待回填数量
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.core.config import DEFAULT_EMBEDDING_COLUMN, embedding_profile, get_config
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def count_pending(conn, table: str) -> int:
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT COUNT(*) FROM {table}
+            WHERE embedding IS NOT NULL AND embedding_half IS NULL
+        """)
+        return cur.fetchone()[0]
+
+
+def backfill(conn, table: str, dimensions: int, batch_size: int, sleep: float) -> int:
+    """按 id 键集分批回填，返回回填行数"""
+    last_id = 0
+    total = 0
+    while True:
+        start = time.perf_counter()
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                UPDATE {table}
+                SET embedding_half = embedding::halfvec({dimensions})
+                WHERE id IN (
+                    SELECT id FROM {table}
+                    WHERE id > %s AND embedding IS NOT NULL AND embedding_half IS NULL
+                    ORDER BY id
+                    LIMIT %s
+                )
+                RETURNING id
+            """, (last_id, batch_size))
+            ids = [row[0] for row in cur.fetchall()]
+        conn.commit()
+
+        if not ids:
+            return total
+        total += len(ids)
+        last_id = max(ids)
+        logger.info(f"回填 {len(ids)} 行 (累计 {total}, id <= {last_id}) "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms")
+        if sleep:
+            time.sleep(sleep)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="半精度向量回填工具")
+    parser.add_argument("--batch-size", type=int, default=2000, help="每批行数")
+    parser.add_argument("--sleep", type=float, default=0.0, help="批次间休眠秒数")
+    parser.add_argument("--dry-run", action="store_true", help="只统计待回填数量")
+    args = parser.parse_args()
+
+    config = get_config()
+    db_config = config.database
+    table = db_config.get("table", "pulseglobe_news")
+    # embedding_half 由 embedding 列派生，维度取该列的配置（与 active_column 无关）
+    dimensions = int(embedding_profile(config.get("embedding", {}), DEFAULT_EMBEDDING_COLUMN).get("dimensions", 2560))
+
+    conn = psycopg2.connect(
+        host=db_config.get("host"),
+        port=db_config.get("port"),
+        dbname=db_config.get("name"),
+        user=db_config.get("user"),
+        password=db_config.get("password"),
+    )
+    try:
+        pending = count_pending(conn, table)
+        logger.info(f"{table}: 待回填 {pending} 行, 维度 {dimensions}")
+        if args.dry_run or not pending:
+            return
+
+        start = time.perf_counter()
+        total = backfill(conn, table, dimensions, args.batch_size, args.sleep)
+        logger.info(f"回填完成: {total} 行, 耗时 {time.perf_counter() - start:.1f}s")
+        logger.info("下一步：执行 sql/migrate_news_quantized.sql 第 3 步创建索引，或运行 "
+                    "python scripts/manage_vector_index.py build --column embedding_half")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
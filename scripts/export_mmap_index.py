@@ -0,0 +1,150 @@
+"""
+mmap 索引导出工具：把 pulseglobe_news 的向量导出为本地内存映射索引
+
+导出目录结构见 pulseglobe/services/mmap_index.py。先写入临时目录，完成后
+整体替换目标目录；正在运行的 Worker 仍持有旧文件的映射，重启后加载新索引。
+导出 embedding.active_column 指定的向量列，切换向量列后需重新导出。
+
+用法:
+    python scripts/export_mmap_index.py [options]
+
+选项:
+    --output        输出目录 (默认: settings.yaml 的 rag.mmap_path)
+    --batch-size    每批行数 (默认: 2000)
+    --country       只导出指定 source_country
+    --limit         最大导出数量 (默认: 无限制)
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.core.config import get_config
+from pulseglobe.services.mmap_index import META_COLUMNS, MmapIndexWriter
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+COLUMNS = (*META_COLUMNS, "source_country")
+
+
+def count_rows(conn, table: str, column: str, country: str = None) -> int:
+    with conn.cursor() as cur:
+        query = f"SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL"
+        params = []
+        if country:
+            query += " AND source_country = %s"
+            params.append(country)
+        cur.execute(query, params)
+        return cur.fetchone()[0]
+
+
+def vector_dimensions(conn, table: str, column: str) -> int:
+    """以库中实际向量维度为准（可能与配置不同，例如换模型前的旧数据）"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT vector_dims({column}) FROM {table} WHERE {column} IS NOT NULL LIMIT 1")
+        row = cur.fetchone()
+        return row[0] if row else 0
+
+
+def export(conn, table: str, column: str, writer: MmapIndexWriter, batch_size: int,
+           country: str = None, limit: int = None) -> int:
+    """服务端游标按 id 顺序流式读取，逐批写入索引，返回导出行数"""
+    query = f"SELECT {', '.join(COLUMNS)}, {column}::text FROM {table} WHERE {column} IS NOT NULL"
+    params = []
+    if country:
+        query += " AND source_country = %s"
+        params.append(country)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    total = 0
+    with conn.cursor(name=f"mmap_export_{uuid.uuid4().hex[:12]}") as cur:
+        cur.itersize = batch_size
+        cur.execute(query, params)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+            writer.append(
+                [dict(zip(COLUMNS, row[:-1])) for row in rows],
+                [json.loads(row[-1]) for row in rows],
+            )
+            total += len(rows)
+            logger.info(f"  导出 +{len(rows)} (累计 {total})")
+    conn.rollback()
+    return total
+
+
+def main():
+    config = get_config()
+    rag_config = config.get("rag", {}) or {}
+
+    parser = argparse.ArgumentParser(description="mmap 索引导出工具")
+    parser.add_argument("--output", default=rag_config.get("mmap_path") or "data/rag_index", help="输出目录")
+    parser.add_argument("--batch-size", type=int, default=2000, help="每批行数")
+    parser.add_argument("--country", default=None, help="只导出指定 source_country")
+    parser.add_argument("--limit", type=int, default=None, help="最大导出数量")
+    args = parser.parse_args()
+
+    db_config = config.database
+    table = db_config.get("table", "pulseglobe_news")
+    column = config.embedding["column"]
+
+    conn = psycopg2.connect(
+        host=db_config.get("host"),
+        port=db_config.get("port"),
+        dbname=db_config.get("name"),
+        user=db_config.get("user"),
+        password=db_config.get("password"),
+    )
+
+    output = Path(args.output)
+    staging = output.with_name(f"{output.name}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        count = count_rows(conn, table, column, args.country)
+        if args.limit:
+            count = min(count, args.limit)
+        dimensions = vector_dimensions(conn, table, column)
+        configured = int(config.embedding.get("dimensions", 2560))
+        if dimensions and dimensions != configured:
+            logger.warning(f"库中向量维度 {dimensions} 与 embedding.dimensions {configured} 不一致，检索时将拒绝加载")
+        logger.info(f"{table}.{column}: 待导出 {count} 行, 维度 {dimensions} → {output}")
+
+        start = time.perf_counter()
+        with MmapIndexWriter(staging, count, dimensions, model=config.embedding.get("model")) as writer:
+            # 以计数为上限：统计之后新写入的行留给下次导出
+            total = export(conn, table, column, writer, args.batch_size, args.country, count)
+        logger.info(f"导出完成: {total} 行, 耗时 {time.perf_counter() - start:.1f}s")
+    finally:
+        conn.close()
+
+    # 整体替换：已映射旧文件的进程不受影响
+    previous = output.with_name(f"{output.name}.old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if output.exists():
+        output.rename(previous)
+    staging.rename(output)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+会话导出工具：将 data_packets 中的一个会话流式导出为 Parquet / Arrow 文件
+
+用法:
+    python scripts/export_session.py --session sess_xxx [options]
+
+选项:
+    --output        输出路径 (默认: exports/<session>.<format>)
+    --format        parquet 或 arrow (默认: parquet)
+    --columns       列投影：full / summaries / zh 或逗号分隔的列名 (默认: full)
+    --compression   zstd / snappy / gzip / lz4 / none (默认: zstd)
+    --batch-size    每批行数 (默认: 10000)
+    --source-type   只导出指定来源：tavily / social / rag
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.services.export import FORMATS, PROJECTIONS, SessionExporter
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话数据导出工具")
+    parser.add_argument("--session", required=True, help="会话ID")
+    parser.add_argument("--output", default=None, help="输出路径")
+    parser.add_argument("--format", choices=FORMATS, default="parquet", help="输出格式")
+    parser.add_argument("--columns", default="full",
+                        help=f"列投影：{' / '.join(PROJECTIONS)} 或逗号分隔的列名")
+    parser.add_argument("--compression", default="zstd", help="压缩算法（none 表示不压缩）")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="每批行数")
+    parser.add_argument("--source-type", default=None, help="只导出指定来源")
+    args = parser.parse_args()
+
+    output = args.output or f"exports/{args.session}.{args.format}"
+
+    exporter = SessionExporter()
+    try:
+        stats = exporter.export_session(
+            session_id=args.session,
+            path=output,
+            columns=args.columns,
+            format=args.format,
+            compression=args.compression,
+            batch_size=args.batch_size,
+            source_type=args.source_type,
+        )
+    finally:
+        exporter.storage.close()
+
+    logger.info(f"导出完成: {output}")
+    logger.info(f"  行数: {stats['rows']}, 批次: {stats['batches']}, "
+                f"文件大小: {stats['bytes'] / 2**20:.2f} MB, 耗时: {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
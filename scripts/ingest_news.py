@@ -0,0 +1,731 @@
+# /// script
+# requires-python = ">=3.10"
+# dependencies = [
+#     "httpx>=0.25.0",
+#     "pgvector>=0.4.0",
+#     "psycopg2-binary>=2.9.9",
+#     "pyyaml>=6.0",
+#     "python-dotenv>=1.0.0",
+# ]
+# ///
+"""
+蒙语新闻入库流水线：翻译 → 写入 pulseglobe_news → 向量化
+
+取代原来的三步手工流程（translate_mn_news.py、sql/migrate_to_pulseglobe.sql、
+vectorize_news.py 各自整表扫描），每篇新文章一次流过三个阶段，写入向量后即可被 RAG 检索。
+
+用法 (使用 uv):
+    uv run ingest_news.py [options]
+
+选项:
+    --workers         同时翻译的文章数 (默认: 翻译并发上限)
+    --translate-concurrency  翻译 API 并发上限 (默认: settings.yaml 的 translation.concurrency.max)
+    --embed-concurrency      Embedding API 并发上限 (默认: embedding.concurrency.max)
+    --embed-workers   同时向量化的批次数 (默认: 2)
+    --page-size       每次读取的文章数 (默认: 100)
+    --batch-size      每批写库的文章数 (默认: 50)
+    --flush-interval  写库最长间隔秒数，不足一批也写入 (默认: 5)
+    --request-size    每个 Embedding 请求的最大文档数 (默认: 32)
+    --request-tokens  每个 Embedding 请求的估算 token 上限 (默认: 16000)
+    --limit           最大处理数量 (默认: 无限制)
+    --follow          处理完后持续轮询新文章
+    --poll-interval   轮询间隔秒数 (默认: 60)
+    --from-id         首次运行时只处理源表 id 大于该值的文章 (默认: 0，即全部)
+    --state           水位文件 (默认: .ingest_state.json)
+    --restart         忽略水位文件从 --from-id 重新开始
+    --no-memory       不使用翻译记忆
+    --dry-run         试运行，不实际写入数据库
+
+各阶段通过有界队列相连、并发互相独立：
+    读取    按源表 id 键集分页（sql/migrate_ingest_queue.sql），LEFT JOIN 带出已有译文
+    翻译    --workers 个协程，讯蒙 API 由 translation.concurrency 自适应限流；
+            已有译文的文章不再请求，译文攒批 upsert 到 news_articles_mn_zh
+    入库    每批一条多行 upsert 写入 pulseglobe_news（doc_id = original_id，国家 MN），
+            标题或正文变化时清空 embedding 和段落
+    向量化  --embed-workers 个批次并发，请求由 embedding.concurrency 自适应限流，
+            二进制 COPY 写回（同 vectorize_news.py）；重新向量化期间（scripts/reembed.py）
+            同时按各自的模型写入已存在的其他向量列，切换 active_column 时新文章不会缺向量
+
+每个阶段维护自己的水位（源表 id，之前的文章都已完成该阶段），每批提交后写入水位文件；
+重跑时从向量化水位之后继续，已翻译、已入库的文章直接复用，upsert 幂等。翻译或向量化
+失败的文章记入水位文件，下次运行时先重试。--follow 模式下新文章在一个轮询间隔加
+一次写库间隔内即可检索。
+
+段落向量（rag.passages）仍由 vectorize_news.py --chunks 增量生成。
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.core.concurrency import AdaptiveLimiter
+from pulseglobe.core.config import DEFAULT_EMBEDDING_COLUMN, embedding_columns, embedding_profile, get_config
+from pulseglobe.services.translation_memory import DEFAULT_MAX_SEGMENT_CHARS, TranslationMemory
+from translate_mn_news import NewsDatabase, ProgressTracker, TranslationResult, XmorTranslator
+from vectorize_news import EmbeddingService, VectorDatabase, pack_requests
+
+# ============================================
+# 日志配置（覆盖被导入脚本的配置）
+# ============================================
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('ingest_news.log', encoding='utf-8')
+    ],
+    force=True,
+)
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# 数据库操作
+# ============================================
+class IngestSource(NewsDatabase):
+    """源表读取：按 id 键集分页，连同已有译文一起读出"""
+
+    def _fetch(self, where: str, params: dict) -> list:
+        if self.reader is None or self.reader.closed:
+            self.reader = psycopg2.connect(**self.config)
+        try:
+            with self.reader.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"""
+                    SELECT s.*, t.title AS title_zh, t.content AS content_zh
+                    FROM {self.source_table} s
+                    LEFT JOIN {self.target_table} t ON t.original_id = s.original_id
+                    WHERE s.language = 'mn' AND {where}
+                    ORDER BY s.id
+                    LIMIT %(size)s
+                """, params)
+                return cur.fetchall()
+        finally:
+            self.reader.rollback()
+
+    def fetch_page(self, after_id: int, size: int) -> list:
+        """读取 id > after_id 的文章（可在线程中调用）"""
+        return self._fetch("s.id > %(after)s", {"after": after_id, "size": size})
+
+    def fetch_ids(self, ids: list[int]) -> list:
+        """按 id 读取指定文章（重试上次失败的文章）"""
+        return self._fetch("s.id = ANY(%(ids)s)", {"ids": list(ids), "size": len(ids)})
+
+
+class NewsLoader:
+    """
+    pulseglobe_news 写入（替代 sql/migrate_to_pulseglobe.sql 按日期范围的整表迁移）
+    """
+
+    COLUMNS = (
+        "doc_id", "title", "content", "publish_date", "source_name",
+        "source_country", "category", "url", "created_at",
+    )
+
+    def __init__(self, config: dict, country: str = "MN", column: str = DEFAULT_EMBEDDING_COLUMN,
+                 vector_columns: Optional[list[str]] = None):
+        self.config = {
+            "host": config.get("host", "localhost"),
+            "port": config.get("port", 5432),
+            "database": config.get("name", "news_db"),
+            "user": config.get("user", "postgres"),
+            "password": config.get("password", "")
+        }
+        self.table = config.get("table", "pulseglobe_news")
+        self.chunk_table = config.get("chunk_table", "pulseglobe_news_chunks")
+        self.country = country
+        self.column = column    # 检索使用的列（active_column），为空时重新生成段落
+        self.vector_columns = vector_columns or [column]
+        self.conn = None
+        self.has_chunks = False
+
+    def connect(self):
+        self.conn = psycopg2.connect(**self.config)
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (self.chunk_table,))
+            self.has_chunks = cur.fetchone()[0]
+            # 内容变化时清空所有已存在的向量列（含重新向量化中的影子列）
+            cur.execute("""
+                SELECT attname FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attname = ANY(%s) AND NOT attisdropped
+            """, (self.table, self.vector_columns))
+            existing = {row[0] for row in cur.fetchall()}
+        self.conn.rollback()
+        self.vector_columns = [c for c in self.vector_columns if c in existing]
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+    def upsert(self, results: list[TranslationResult]) -> dict[str, list[str]]:
+        """
+        一条多行 upsert 写入一批译文（一次提交）
+
+        标题或正文变化时清空各向量列，并删除该文章的段落，由 vectorize_news.py --chunks 重新生成
+
+        Returns:
+            {doc_id: 需要向量化的列（为空的向量列）}
+        """
+        rows = {}
+        now = datetime.now()
+        for result in results:
+            article = result.article
+            # 同一批内重复的 doc_id 只保留最后一条，避免 ON CONFLICT 重复更新同一行
+            rows[article["original_id"]] = (
+                article["original_id"],
+                result.title_zh,
+                result.content_zh,
+                article.get("publish_date"),
+                article.get("source_name"),
+                self.country,
+                article.get("category"),
+                article.get("url"),
+                now,
+            )
+        if not rows:
+            return {}
+
+        unchanged = "(n.title, n.content) IS NOT DISTINCT FROM (EXCLUDED.title, EXCLUDED.content)"
+        resets = "".join(
+            f",\n                    {column} = CASE WHEN {unchanged} THEN n.{column} END"
+            for column in self.vector_columns
+        )
+        nulls = ", ".join(f"{column} IS NULL" for column in self.vector_columns)
+        with self.conn.cursor() as cur:
+            returned = execute_values(cur, f"""
+                INSERT INTO {self.table} AS n ({", ".join(self.COLUMNS)})
+                VALUES %s
+                ON CONFLICT (doc_id) DO UPDATE SET
+                    title = EXCLUDED.title,
+                    content = EXCLUDED.content{resets}
+                RETURNING doc_id, {nulls}
+            """, list(rows.values()), page_size=len(rows), fetch=True)
+            pending = {
+                doc_id: [column for column, empty in zip(self.vector_columns, flags) if empty]
+                for doc_id, *flags in returned
+            }
+            changed = [doc_id for doc_id, columns in pending.items() if self.column in columns]
+            if self.has_chunks and changed:
+                cur.execute(f"DELETE FROM {self.chunk_table} WHERE doc_id = ANY(%s)", (changed,))
+        self.conn.commit()
+        return pending
+
+
+# ============================================
+# 水位
+# ============================================
+class IngestState:
+    """
+    各阶段水位：源表 id 不超过水位的文章都已完成该阶段（成功或记为失败）
+
+    translated  译文已写入 news_articles_mn_zh
+    loaded      已写入 pulseglobe_news
+    embedded    已写入 embedding，可被检索
+    failed      翻译或向量化失败的源表 id，下次运行时先重试
+    """
+
+    STAGES = ("translated", "loaded", "embedded")
+
+    def __init__(self, path: str, key: str, from_id: int = 0):
+        self.path = Path(path)
+        self.key = key
+        self.from_id = from_id
+        self.marks = dict.fromkeys(self.STAGES, from_id)
+        self.failed: set[int] = set()
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("key") == self.key:
+                self.marks.update({stage: int(value) for stage, value in data.get("marks", {}).items()})
+                self.failed = set(map(int, data.get("failed", [])))
+
+    def advance(self, stage: str, source_id: int):
+        # 重试的失败文章排在前面，其 id 可能小于当前水位
+        self.marks[stage] = max(self.marks[stage], source_id)
+
+    def save(self):
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({
+            "key": self.key,
+            "marks": self.marks,
+            "failed": sorted(self.failed),
+        }), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def reset(self):
+        self.marks = dict.fromkeys(self.STAGES, self.from_id)
+        self.failed = set()
+        self.path.unlink(missing_ok=True)
+
+    def describe(self) -> str:
+        return (f"翻译 {self.marks['translated']} / 入库 {self.marks['loaded']} / "
+                f"向量 {self.marks['embedded']}")
+
+
+# ============================================
+# 各阶段协程
+# ============================================
+async def read_source(
+    db: IngestSource,
+    queue: asyncio.Queue,
+    trackers: dict[str, ProgressTracker],
+    state: IngestState,
+    read_at: dict[int, float],
+    page_size: int,
+    workers: int,
+    limit: Optional[int] = None,
+    follow: bool = False,
+    poll_interval: float = 60.0,
+):
+    """读取协程：先重试上次失败的文章，再从向量化水位之后键集分页读取，结束时为每个翻译协程放入 None"""
+    seq = 0
+
+    async def emit(page: list):
+        nonlocal seq
+        for article in page:
+            for tracker in trackers.values():
+                tracker.issue(seq, True, article["id"])
+            read_at[seq] = time.perf_counter()
+            await queue.put((seq, article))
+            seq += 1
+
+    try:
+        retry = sorted(state.failed)
+        if retry:
+            logger.info(f"重试上次失败的文章: {len(retry)} 篇")
+        for start in range(0, len(retry), page_size):
+            ids = retry[start:start + page_size]
+            page = await asyncio.to_thread(db.fetch_ids, ids)
+            # 已从源表删除的文章不再重试
+            state.failed.difference_update(set(ids) - {article["id"] for article in page})
+            await emit(page)
+
+        after_id = state.marks["embedded"]
+        while limit is None or seq < limit:
+            size = page_size if limit is None else min(page_size, limit - seq)
+            page = await asyncio.to_thread(db.fetch_page, after_id, size)
+            if not page:
+                if not follow:
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+            await emit(page)
+            after_id = page[-1]["id"]
+    finally:
+        for _ in range(workers):
+            await queue.put(None)
+
+
+async def translate_articles(translator: XmorTranslator, inbox: asyncio.Queue, outbox: asyncio.Queue):
+    """翻译协程：已有译文的文章直接复用，其余逐篇翻译"""
+    while (item := await inbox.get()) is not None:
+        seq, article = item
+        if article.get("content_zh") is not None:
+            result = TranslationResult(article, article["title_zh"], article["content_zh"], success=True)
+            await outbox.put((seq, result, True))
+            continue
+        result = await translator.translate_article(article)
+        await outbox.put((seq, result, False))
+
+
+async def write_translations(
+    db: IngestSource,
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    tracker: ProgressTracker,
+    state: IngestState,
+    batch_size: int,
+    flush_interval: float,
+    dry_run: bool,
+    stats: dict,
+):
+    """译文写库协程：攒满 batch_size 篇或等待超过 flush_interval 秒时批量写入，整批交给入库阶段"""
+    buffer = []
+
+    async def flush():
+        fresh = [result for _, result, reused in buffer if result.success and not reused]
+        await asyncio.to_thread(db.upsert_translations, fresh, dry_run)
+        for _, result, reused in buffer:
+            if not result.success:
+                logger.warning(f"  ✗ 翻译 {result.article['original_id']}: {result.error}")
+                state.failed.add(result.article["id"])
+            elif reused:
+                stats["reused"] += 1
+        stats["translated"] += len(fresh)
+
+        mark = tracker.complete(seq for seq, _, _ in buffer)
+        if mark:
+            state.advance("translated", mark[1])
+            if not dry_run:
+                state.save()
+        await outbox.put([(seq, result) for seq, result, _ in buffer])
+        buffer.clear()
+
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(inbox.get(), timeout=flush_interval)
+            except asyncio.TimeoutError:
+                if buffer:
+                    await flush()
+                continue
+            if item is None:
+                break
+            buffer.append(item)
+            if len(buffer) >= batch_size:
+                await flush()
+        if buffer:
+            await flush()
+    finally:
+        await outbox.put(None)
+
+
+async def load_articles(
+    loader: NewsLoader,
+    inbox: asyncio.Queue,
+    outbox: asyncio.Queue,
+    tracker: ProgressTracker,
+    state: IngestState,
+    embed_workers: int,
+    dry_run: bool,
+    stats: dict,
+):
+    """
+    入库协程：每批译文一条 upsert 写入 pulseglobe_news
+
+    交给向量化阶段的条目为 (序号, 源表 id, 待向量化文档或 None, 翻译是否成功)，
+    文档的 columns 为需要写入的向量列
+    """
+    try:
+        while (batch := await inbox.get()) is not None:
+            succeeded = [result for _, result in batch if result.success]
+            if dry_run:
+                pending = {result.article["original_id"]: loader.vector_columns for result in succeeded}
+            else:
+                pending = await asyncio.to_thread(loader.upsert, succeeded)
+            stats["loaded"] += len(pending)
+
+            items = []
+            for seq, result in batch:
+                doc_id = result.article["original_id"]
+                doc = None
+                if result.success and pending.get(doc_id):
+                    doc = {"doc_id": doc_id, "title": result.title_zh, "content": result.content_zh,
+                           "columns": pending[doc_id]}
+                items.append((seq, result.article["id"], doc, result.success))
+
+            mark = tracker.complete(seq for seq, _ in batch)
+            if mark:
+                state.advance("loaded", mark[1])
+                if not dry_run:
+                    state.save()
+            await outbox.put(items)
+    finally:
+        for _ in range(embed_workers):
+            await outbox.put(None)
+
+
+async def embed_column(
+    db: VectorDatabase,
+    embedder: EmbeddingService,
+    docs: list[dict],
+    write_lock: asyncio.Lock,
+    request_size: int,
+    request_tokens: int,
+    dry_run: bool,
+) -> set[str]:
+    """用该列的模型向量化需要写入 db.column 的文档，COPY 写回，返回成功的 doc_id"""
+    docs = [doc for doc in docs if db.column in doc["columns"]]
+    requests = pack_requests(docs, request_size, request_tokens)
+    outcomes = await asyncio.gather(*(embedder.embed_documents(r) for r in requests), return_exceptions=True)
+
+    embedded = []
+    for request, outcome in zip(requests, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"  ✗ 向量化异常 ({db.column}, {len(request)} 篇): {outcome}")
+            continue
+        embedded.extend(result for result in outcome if result.success and result.embedding)
+    # 同一连接上的 COPY 与提交不能交错
+    async with write_lock:
+        await asyncio.to_thread(db.update_embeddings, embedded, dry_run)
+    return {result.doc_id for result in embedded}
+
+
+async def embed_articles(
+    targets: list[tuple[VectorDatabase, EmbeddingService]],
+    translate_limiter: AdaptiveLimiter,
+    inbox: asyncio.Queue,
+    tracker: ProgressTracker,
+    state: IngestState,
+    write_lock: asyncio.Lock,
+    read_at: dict[int, float],
+    request_size: int,
+    request_tokens: int,
+    dry_run: bool,
+    stats: dict,
+    start_time: float,
+):
+    """
+    向量化协程：每批打包成多条输入的请求并发调用，COPY 写回后推进向量化水位
+
+    targets 的第一项为 active_column，其余为重新向量化中的影子列；文章需要的各列都写入后才算完成，
+    否则记为失败，重试时只补写仍为空的列
+    """
+    embedder = targets[0][1]
+    while (items := await inbox.get()) is not None:
+        docs = [doc for _, _, doc, _ in items if doc]
+        written = await asyncio.gather(*(
+            embed_column(db, target_embedder, docs, write_lock, request_size, request_tokens, dry_run)
+            for db, target_embedder in targets
+        ))
+        columns_written = {db.column: done for (db, _), done in zip(targets, written)}
+
+        now = time.perf_counter()
+        for seq, source_id, doc, translated in items:
+            if not translated:
+                stats["failed"] += 1
+            elif doc is None or all(doc["doc_id"] in columns_written[c] for c in doc["columns"]):
+                stats["embedded" if doc else "unchanged"] += 1
+                state.failed.discard(source_id)
+            else:
+                logger.warning(f"  ✗ 向量化 {doc['doc_id']}")
+                stats["failed"] += 1
+                state.failed.add(source_id)
+        lag = max(now - read_at.pop(seq) for seq, _, _, _ in items)
+
+        mark = tracker.complete(seq for seq, _, _, _ in items)
+        if mark:
+            state.advance("embedded", mark[1])
+        if not dry_run:
+            state.save()
+
+        elapsed = now - start_time
+        translate_limit = translate_limiter.snapshot()
+        embed_limit = embedder.limiter.snapshot()
+        logger.info(f"--- 水位 {state.describe()} | 新增向量 {stats['embedded']}, 未变 {stats['unchanged']}, "
+                    f"失败 {stats['failed']} | {(stats['embedded'] + stats['unchanged']) / elapsed:.2f} 篇/s | "
+                    f"读取到可检索 {lag:.1f}s | 翻译并发 {translate_limit['limit']}, "
+                    f"向量并发 {embed_limit['limit']} ---")
+
+
+# ============================================
+# 主逻辑
+# ============================================
+async def ingest_pipeline(
+    source: IngestSource,
+    loader: NewsLoader,
+    vector_db: VectorDatabase,
+    translator: XmorTranslator,
+    embedder: EmbeddingService,
+    state: IngestState,
+    shadows: tuple[tuple[VectorDatabase, EmbeddingService], ...] = (),
+    workers: int = 16,
+    embed_workers: int = 2,
+    page_size: int = 100,
+    batch_size: int = 50,
+    flush_interval: float = 5.0,
+    request_size: int = 32,
+    request_tokens: int = 16000,
+    limit: Optional[int] = None,
+    follow: bool = False,
+    poll_interval: float = 60.0,
+    dry_run: bool = False,
+) -> dict:
+    """
+    读取 → 翻译协程池 → 译文写库 → 入库 → 向量化协程池
+
+    shadows 为需要同步写入的其他向量列及其模型
+    """
+    logger.info(f"起始水位: {state.describe()}, 待重试 {len(state.failed)} 篇")
+
+    trackers = {stage: ProgressTracker() for stage in IngestState.STAGES}
+    read_at: dict[int, float] = {}
+    stats = {"translated": 0, "reused": 0, "loaded": 0, "embedded": 0, "unchanged": 0, "failed": 0}
+    start_time = time.perf_counter()
+
+    articles = asyncio.Queue(maxsize=workers * 2)
+    translations = asyncio.Queue(maxsize=batch_size * 2)
+    loads = asyncio.Queue(maxsize=2)
+    embeds = asyncio.Queue(maxsize=embed_workers)
+
+    reader = asyncio.create_task(read_source(
+        source, articles, trackers, state, read_at, page_size, workers, limit, follow, poll_interval,
+    ))
+    pool = [asyncio.create_task(translate_articles(translator, articles, translations)) for _ in range(workers)]
+    writer = asyncio.create_task(write_translations(
+        source, translations, loads, trackers["translated"], state, batch_size, flush_interval, dry_run, stats,
+    ))
+    loading = asyncio.create_task(load_articles(
+        loader, loads, embeds, trackers["loaded"], state, embed_workers, dry_run, stats,
+    ))
+    write_lock = asyncio.Lock()
+    targets = [(vector_db, embedder), *shadows]
+    embedding = [
+        asyncio.create_task(embed_articles(
+            targets, translator.limiter, embeds, trackers["embedded"], state, write_lock, read_at,
+            request_size, request_tokens, dry_run, stats, start_time,
+        ))
+        for _ in range(embed_workers)
+    ]
+    tasks = [reader, *pool, writer, loading, *embedding]
+
+    async def close_pool():
+        await asyncio.gather(*pool)
+        await translations.put(None)
+
+    try:
+        # 任一阶段写库失败时立即中止，避免上游阻塞在已满的队列上
+        await asyncio.gather(reader, close_pool(), writer, loading, *embedding)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    stats["elapsed"] = time.perf_counter() - start_time
+    return stats
+
+
+async def main():
+    config = get_config()
+    trans_config = config.get("translation", {}) or {}
+    embed_config = config.embedding    # active_column 及其模型
+
+    parser = argparse.ArgumentParser(description="蒙语新闻入库流水线（翻译 → 入库 → 向量化）")
+    parser.add_argument("--workers", type=int, default=None, help="同时翻译的文章数 (默认: 翻译并发上限)")
+    parser.add_argument("--translate-concurrency", type=int, default=None, help="翻译 API 并发上限")
+    parser.add_argument("--embed-concurrency", type=int, default=None, help="Embedding API 并发上限")
+    parser.add_argument("--embed-workers", type=int, default=2, help="同时向量化的批次数 (默认: 2)")
+    parser.add_argument("--page-size", type=int, default=100, help="每次读取的文章数 (默认: 100)")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批写库的文章数 (默认: 50)")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="写库最长间隔秒数 (默认: 5)")
+    parser.add_argument("--request-size", type=int, default=32, help="每个 Embedding 请求的最大文档数")
+    parser.add_argument("--request-tokens", type=int, default=16000, help="每个 Embedding 请求的估算 token 上限")
+    parser.add_argument("--limit", type=int, default=None, help="最大处理数量")
+    parser.add_argument("--follow", action="store_true", help="处理完后持续轮询新文章")
+    parser.add_argument("--poll-interval", type=float, default=60.0, help="轮询间隔秒数 (默认: 60)")
+    parser.add_argument("--from-id", type=int, default=0, help="首次运行时只处理源表 id 大于该值的文章")
+    parser.add_argument("--state", default=".ingest_state.json", help="水位文件")
+    parser.add_argument("--restart", action="store_true", help="忽略水位文件从 --from-id 重新开始")
+    parser.add_argument("--no-memory", action="store_true", help="不使用翻译记忆")
+    parser.add_argument("--dry-run", action="store_true", help="试运行模式")
+    args = parser.parse_args()
+
+    limiter = AdaptiveLimiter.from_config(
+        trans_config.get("concurrency"), name="xmor", max_limit=args.translate_concurrency,
+    )
+    workers = args.workers or limiter.max_limit
+    memory_config = trans_config.get("memory") or {}
+    memory = None
+    if not args.no_memory and str(memory_config.get("enabled", "true")).lower() in ("1", "true", "yes", "on"):
+        memory = TranslationMemory(config.database, table=memory_config.get("table", "translation_memory"))
+
+    source = IngestSource(
+        config.database,
+        source_table=trans_config.get("source_table", "news_articles"),
+        target_table=trans_config.get("target_table", "news_articles_mn_zh"),
+    )
+    loader = NewsLoader(
+        config.database, column=embed_config["column"],
+        vector_columns=embedding_columns(config.get("embedding", {})),
+    )
+    vector_db = VectorDatabase(
+        config.database, prefix_dimensions=int(embed_config.get("prefix_dimensions") or 0),
+        column=embed_config["column"],
+    )
+    translator = XmorTranslator(
+        trans_config.get("api_key", ""),
+        base_url=trans_config.get("base_url", "https://api.xmor.cn"),
+        limiter=limiter,
+        memory=memory,
+        max_segment_chars=int(trans_config.get("max_segment_chars") or DEFAULT_MAX_SEGMENT_CHARS),
+    )
+    embedder = EmbeddingService(embed_config, max_concurrency=args.embed_concurrency)
+    state = IngestState(
+        args.state, f"{source.source_table}->{source.target_table}->{loader.table}", from_id=args.from_id,
+    )
+    if args.restart:
+        state.reset()
+    shadows = []
+
+    logger.info("=" * 60)
+    logger.info("蒙语新闻入库流水线")
+    logger.info(f"翻译: {workers} 协程, 并发上限 {limiter.max_limit}, 翻译记忆: {'开启' if memory else '关闭'}")
+    logger.info(f"向量化: {args.embed_workers} 批次, 并发上限 {embedder.limiter.max_limit}, "
+                f"模型 {embedder.model}, 向量列 {vector_db.column}")
+    logger.info(f"每批写库: {args.batch_size}, 最长间隔 {args.flush_interval}s"
+                + (f", 持续轮询 (间隔 {args.poll_interval}s)" if args.follow else ""))
+    logger.info("=" * 60)
+
+    if args.dry_run:
+        logger.info(">>> 试运行模式: 不会实际写入数据库 <<<")
+
+    try:
+        source.connect()
+        source.ensure_target_table_exists()
+        loader.connect()
+        vector_db.connect()
+        # 重新向量化期间同时写入已存在的其他向量列，切换后新列不缺新文章
+        for column in loader.vector_columns:
+            if column == vector_db.column:
+                continue
+            profile = embedding_profile(config.get("embedding", {}), column)
+            shadow_db = VectorDatabase(
+                config.database, prefix_dimensions=int(profile.get("prefix_dimensions") or 0), column=column,
+            )
+            shadows.append((shadow_db, EmbeddingService(profile, max_concurrency=args.embed_concurrency)))
+            shadow_db.connect()
+            logger.info(f"同步写入向量列 {column}（模型 {profile['model']}）")
+
+        stats = await ingest_pipeline(
+            source=source,
+            loader=loader,
+            vector_db=vector_db,
+            translator=translator,
+            embedder=embedder,
+            state=state,
+            shadows=shadows,
+            workers=workers,
+            embed_workers=args.embed_workers,
+            page_size=args.page_size,
+            batch_size=args.batch_size,
+            flush_interval=args.flush_interval,
+            request_size=args.request_size,
+            request_tokens=args.request_tokens,
+            limit=args.limit,
+            follow=args.follow,
+            poll_interval=args.poll_interval,
+            dry_run=args.dry_run,
+        )
+
+        logger.info(f"\n入库完成! 新翻译: {stats['translated']}, 复用译文: {stats['reused']}, "
+                    f"写入 pulseglobe_news: {stats['loaded']}, 新增向量: {stats['embedded']}, "
+                    f"失败: {stats['failed']}, 耗时 {stats['elapsed']:.1f}s")
+        logger.info(f"水位: {state.describe()}, 待重试 {len(state.failed)} 篇")
+        if memory:
+            logger.info(memory.summary())
+
+    finally:
+        await translator.close()
+        await embedder.close()
+        for shadow_db, shadow_embedder in shadows:
+            await shadow_embedder.close()
+            shadow_db.close()
+        if memory:
+            memory.close()
+        vector_db.close()
+        loader.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,509 @@
+"""
+向量索引管理工具：批量写入后重建 HNSW / IVFFlat 索引，并用抽样查询验证召回与延迟
+
+用法:
+    python scripts/manage_vector_index.py status
+    python scripts/manage_vector_index.py build [options]
+    python scripts/manage_vector_index.py probe [options]
+    python scripts/manage_vector_index.py drop --name idx_news_embedding_ivfflat
+
+公共选项:
+    --table           索引所在的表 (默认: settings.yaml 的 database.table；段落表为 database.chunk_table)
+    --column          向量列 (默认: embedding)；vector 类型超过 2000 维时对 halfvec 表达式建索引
+                      （与 NewsRetriever 的排序表达式一致，见 pulseglobe/services/retrieval.py）
+    --method          hnsw / ivfflat (默认: vector_index.method)
+    --country         按国家的部分索引（如 MN，与 sql/migrate_news_filters.sql 一致）
+
+build 选项:
+    --m / --ef-construction  HNSW 参数 (默认: vector_index.m / ef_construction)
+    --lists           IVFFlat 聚类数 (默认: 行数 <= 100 万时为 行数 / 1000，否则为 sqrt(行数))
+    --maintenance-work-mem   构建内存 (默认: vector_index.maintenance_work_mem)
+    --parallel-workers       并行构建进程数 (默认: vector_index.parallel_workers)
+    --if-missing      已有同名的有效索引时跳过（批量写入脚本结束后调用）
+    --no-probe        构建后不做召回探测
+    --progress-interval      进度输出间隔秒数 (默认: 10)
+
+probe 选项:
+    --queries         抽样查询数 (默认: vector_index.probe_queries)
+    --k               比较前 k 个结果 (默认: vector_index.probe_k)
+    --ef-search       HNSW 查询参数 (默认: rag.ef_search)
+    --probes          IVFFlat 查询参数 (默认: sqrt(lists))
+
+构建流程：CREATE INDEX CONCURRENTLY 建到临时名称（不阻塞读写，RAG 继续使用旧索引），
+期间从 pg_stat_progress_create_index 输出阶段与进度；成功后 DROP INDEX CONCURRENTLY 旧索引
+并把新索引改为正式名称，检索始终有可用的索引。构建失败留下的 INVALID 索引会被删除。
+
+召回探测：从表中随机抽取向量作为查询，分别用索引和顺序扫描（精确结果）检索前 k 个，
+输出 recall@k、两种方式的 p50 / p95 延迟，以及查询计划是否使用了该索引。
+recall 低于 vector_index.min_recall 时 probe 以非零状态退出。
+"""
+
+import argparse
+import json
+import logging
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional
+
+import psycopg2
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.core.config import get_config
+from pulseglobe.services.retrieval import vector_index_target, vector_order
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+METHODS = ("hnsw", "ivfflat")
+
+# 各向量类型可建索引的最大维度（pgvector 限制），vector 超过上限时按 halfvec 建表达式索引
+MAX_INDEX_DIMS = {"vector": 2000, "halfvec": 4000}
+
+OPCLASSES = {"vector": "vector_cosine_ops", "halfvec": "halfvec_cosine_ops"}
+
+# PostgreSQL 标识符长度上限
+MAX_IDENTIFIER = 63
+
+
+def index_name(table: str, column: str, method: str, country: Optional[str] = None) -> str:
+    """与 sql/ 中已有脚本一致的索引名，如 idx_news_embedding_hnsw、idx_news_embedding_hnsw_mn"""
+    name = f"idx_{table.removeprefix('pulseglobe_')}_{column}_{method}"
+    if country:
+        name += f"_{country.lower()}"
+    return name[:MAX_IDENTIFIER]
+
+
+def default_lists(rows: int) -> int:
+    """pgvector 建议的 IVFFlat 聚类数"""
+    if rows <= 1_000_000:
+        return max(1, rows // 1000)
+    return int(math.sqrt(rows))
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def _plan_indexes(plan: dict) -> set[str]:
+    """查询计划中用到的索引名"""
+    names = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        names |= _plan_indexes(child)
+    return names
+
+
+class VectorIndexManager:
+    """向量索引的构建、替换、探测与删除"""
+
+    def __init__(self, db_config: dict, table: str):
+        self.db_config = {
+            "host": db_config.get("host", "localhost"),
+            "port": db_config.get("port", 5432),
+            "dbname": db_config.get("name", "news_db"),
+            "user": db_config.get("user", "postgres"),
+            "password": db_config.get("password", ""),
+        }
+        self.table = table
+        self.conn = psycopg2.connect(**self.db_config)
+        self.conn.autocommit = True    # CREATE / DROP INDEX CONCURRENTLY 不能在事务块中执行
+
+    def close(self):
+        self.conn.close()
+
+    # ---------- 元数据 ----------
+    def column_type(self, column: str) -> tuple[str, int]:
+        """返回 (类型名, 维度)，维度未声明时为 -1"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT t.typname, a.atttypmod
+                FROM pg_attribute a JOIN pg_type t ON t.oid = a.atttypid
+                WHERE a.attrelid = %s::regclass AND a.attname = %s AND NOT a.attisdropped
+            """, (self.table, column))
+            row = cur.fetchone()
+        if not row:
+            raise ValueError(f"{self.table} 没有列 {column}")
+        if row[0] not in OPCLASSES:
+            raise ValueError(f"{self.table}.{column} 的类型为 {row[0]}，只支持 {list(OPCLASSES)}")
+        return row[0], row[1]
+
+    def count_rows(self, column: str, country: Optional[str] = None) -> int:
+        where, params = self._where(column, country)
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM {self.table} WHERE {where}", params)
+            return cur.fetchone()[0]
+
+    def index_info(self, name: str) -> Optional[dict]:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT i.indisvalid, pg_relation_size(c.oid)
+                FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid
+                WHERE c.oid = to_regclass(%s)
+            """, (name,))
+            row = cur.fetchone()
+        return {"valid": row[0], "size": row[1]} if row else None
+
+    def list_indexes(self) -> list[dict]:
+        """表上所有 HNSW / IVFFlat 索引"""
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT c.relname, am.amname, i.indisvalid, pg_relation_size(c.oid),
+                       pg_get_indexdef(c.oid), c.reloptions
+                FROM pg_index i
+                JOIN pg_class c ON c.oid = i.indexrelid
+                JOIN pg_am am ON am.oid = c.relam
+                WHERE i.indrelid = %s::regclass AND am.amname = ANY(%s)
+                ORDER BY c.relname
+            """, (self.table, list(METHODS)))
+            return [
+                {"name": name, "method": method, "valid": valid, "size": size,
+                 "definition": definition, "options": options or []}
+                for name, method, valid, size, definition, options in cur.fetchall()
+            ]
+
+    def index_target(self, column: str) -> tuple[str, str]:
+        """
+        列上索引的 (表达式, 操作符类)
+
+        超过 2000 维的 vector 列按 halfvec 表达式建索引（检索按同一表达式排序），
+        超过 halfvec 上限时无法建索引
+        """
+        typname, dims = self.column_type(column)
+        if dims > MAX_INDEX_DIMS["halfvec"]:
+            raise ValueError(f"{column} 为 {dims} 维 {typname}，超过索引上限 {MAX_INDEX_DIMS['halfvec']} 维"
+                             f"（建议选用低维模型或配置 dimensions）")
+        if typname == "vector":
+            return vector_index_target(column, dims)
+        return column, OPCLASSES[typname]
+
+    def order_expr(self, column: str, q: str) -> str:
+        """与 index_target 一致的排序表达式"""
+        typname, dims = self.column_type(column)
+        if typname == "vector":
+            return vector_order(column, dims, q)
+        return f"{column} <=> {q}::{typname}"
+
+    @staticmethod
+    def _where(column: str, country: Optional[str]) -> tuple[str, tuple]:
+        if country:
+            return f"{column} IS NOT NULL AND source_country = %s", (country,)
+        return f"{column} IS NOT NULL", ()
+
+    # ---------- 构建 ----------
+    def build(
+        self,
+        column: str,
+        method: str,
+        name: str,
+        country: Optional[str] = None,
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: Optional[int] = None,
+        maintenance_work_mem: str = "1GB",
+        parallel_workers: int = 2,
+        progress_interval: float = 10.0,
+    ) -> dict:
+        """
+        CONCURRENTLY 构建到临时名称，成功后替换同名旧索引
+
+        Returns:
+            {"name", "build_s", "size", "lists"}
+        """
+        if method not in METHODS:
+            raise ValueError(f"不支持的索引方法: {method}，可选: {METHODS}")
+        target, opclass = self.index_target(column)
+
+        if method == "hnsw":
+            options = f"m = {m}, ef_construction = {ef_construction}"
+        else:
+            if lists is None:
+                rows = self.count_rows(column, country)
+                if not rows:
+                    raise ValueError("IVFFlat 需要在有数据后构建（聚类中心取自现有向量）")
+                lists = default_lists(rows)
+            options = f"lists = {lists}"
+        predicate = f" WHERE source_country = '{country}'" if country else ""
+
+        temp_name = f"{name[:MAX_IDENTIFIER - 4]}_new"
+        if self.index_info(temp_name):
+            logger.warning(f"删除上次未完成的临时索引 {temp_name}")
+            self.drop(temp_name)
+
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT set_config('maintenance_work_mem', %s, false)", (maintenance_work_mem,))
+            cur.execute("SELECT set_config('max_parallel_maintenance_workers', %s, false)", (str(parallel_workers),))
+            cur.execute("SELECT pg_backend_pid()")
+            pid = cur.fetchone()[0]
+
+        sql = (f"CREATE INDEX CONCURRENTLY {temp_name} ON {self.table} "
+               f"USING {method} ({target} {opclass}) WITH ({options}){predicate}")
+        logger.info(f"构建: {sql}")
+        logger.info(f"maintenance_work_mem = {maintenance_work_mem}, 并行进程 = {parallel_workers}")
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(self._execute, sql)
+            try:
+                self._report_progress(future, pid, progress_interval, start)
+                future.result()
+            except BaseException:
+                self.conn.cancel()    # Ctrl+C 时取消服务端的构建
+                wait([future])
+                if self.index_info(temp_name):
+                    logger.warning(f"构建失败，删除无效索引 {temp_name}")
+                    self.drop(temp_name)
+                raise
+        build_s = time.perf_counter() - start
+        for notice in self.conn.notices:
+            # 如 HNSW 图超出 maintenance_work_mem 的提示
+            logger.warning(f"PostgreSQL: {notice.strip()}")
+        self.conn.notices.clear()
+
+        if self.index_info(name):
+            logger.info(f"替换旧索引 {name}")
+            self.drop(name)
+        with self.conn.cursor() as cur:
+            cur.execute(f"ALTER INDEX {temp_name} RENAME TO {name}")
+        info = self.index_info(name)
+        logger.info(f"索引 {name} 构建完成: {build_s:.1f}s, {info['size'] / 2**20:.1f} MB")
+        return {"name": name, "build_s": build_s, "size": info["size"], "lists": lists}
+
+    def _execute(self, sql: str):
+        with self.conn.cursor() as cur:
+            cur.execute(sql)
+
+    def _report_progress(self, future, pid: int, interval: float, start: float):
+        """用独立连接轮询 pg_stat_progress_create_index，直到构建结束"""
+        monitor = psycopg2.connect(**self.db_config)
+        monitor.autocommit = True
+        try:
+            while not wait([future], timeout=interval).done:
+                with monitor.cursor() as cur:
+                    cur.execute("""
+                        SELECT phase, tuples_done, tuples_total, blocks_done, blocks_total
+                        FROM pg_stat_progress_create_index
+                        WHERE pid = %s
+                    """, (pid,))
+                    row = cur.fetchone()
+                if not row:
+                    continue
+                phase, tuples_done, tuples_total, blocks_done, blocks_total = row
+                if tuples_total:
+                    progress = f"{tuples_done}/{tuples_total} 行 ({tuples_done / tuples_total:.0%})"
+                elif blocks_total:
+                    progress = f"{blocks_done}/{blocks_total} 块 ({blocks_done / blocks_total:.0%})"
+                else:
+                    progress = f"{tuples_done} 行"
+                logger.info(f"  [{time.perf_counter() - start:.0f}s] {phase}: {progress}")
+        finally:
+            monitor.close()
+
+    def drop(self, name: str):
+        with self.conn.cursor() as cur:
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+    # ---------- 召回探测 ----------
+    def sample_queries(self, column: str, count: int, country: Optional[str] = None) -> list[str]:
+        """按随机 id 抽取向量（文本形式），避免 ORDER BY random() 的整表排序"""
+        where, params = self._where(column, country)
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT MIN(id), MAX(id) FROM {self.table}")
+            low, high = cur.fetchone()
+            if low is None:
+                return []
+            queries = set()
+            for _ in range(count * 3):
+                if len(queries) >= count:
+                    break
+                cur.execute(f"""
+                    SELECT {column}::text FROM {self.table}
+                    WHERE id >= %s AND {where}
+                    ORDER BY id LIMIT 1
+                """, (random.randint(low, high), *params))
+                row = cur.fetchone()
+                if row:
+                    queries.add(row[0])
+        return list(queries)
+
+    def probe(
+        self,
+        column: str,
+        method: str,
+        name: str,
+        country: Optional[str] = None,
+        queries: int = 50,
+        k: int = 10,
+        ef_search: int = 40,
+        probes: Optional[int] = None,
+    ) -> Optional[dict]:
+        """用索引和顺序扫描分别检索抽样查询，比较结果与延迟"""
+        info = self.index_info(name)
+        if not info or not info["valid"]:
+            raise ValueError(f"索引 {name} 不存在或无效")
+        samples = self.sample_queries(column, queries, country)
+        if not samples:
+            logger.warning("没有可用于探测的向量")
+            return None
+
+        if method == "ivfflat" and probes is None:
+            with self.conn.cursor() as cur:
+                cur.execute("SELECT reloptions FROM pg_class WHERE oid = to_regclass(%s)", (name,))
+                options = dict(option.split("=", 1) for option in cur.fetchone()[0] or [])
+            probes = max(1, round(math.sqrt(int(options.get("lists", 100)))))
+
+        where, params = self._where(column, country)
+        sql = (f"SELECT id FROM {self.table} WHERE {where} "
+               f"ORDER BY {self.order_expr(column, '%s')} LIMIT {k}")
+
+        recalls = []
+        index_latencies = []
+        exact_latencies = []
+        plan_indexes = None
+        self.conn.autocommit = False
+        try:
+            with self.conn.cursor() as cur:
+                for query in samples:
+                    if method == "hnsw":
+                        cur.execute("SELECT set_config('hnsw.ef_search', %s, true)", (str(ef_search),))
+                    else:
+                        cur.execute("SELECT set_config('ivfflat.probes', %s, true)", (str(probes),))
+                    if plan_indexes is None:
+                        cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", (*params, query))
+                        plan = cur.fetchone()[0]
+                        plan = json.loads(plan) if isinstance(plan, str) else plan
+                        plan_indexes = _plan_indexes(plan[0]["Plan"])
+                    start = time.perf_counter()
+                    cur.execute(sql, (*params, query))
+                    found = {row[0] for row in cur.fetchall()}
+                    index_latencies.append(time.perf_counter() - start)
+                    self.conn.rollback()
+
+                    cur.execute("SET LOCAL enable_indexscan = off")
+                    cur.execute("SET LOCAL enable_bitmapscan = off")
+                    start = time.perf_counter()
+                    cur.execute(sql, (*params, query))
+                    exact = {row[0] for row in cur.fetchall()}
+                    exact_latencies.append(time.perf_counter() - start)
+                    self.conn.rollback()
+
+                    recalls.append(len(found & exact) / len(exact) if exact else 1.0)
+        finally:
+            self.conn.rollback()
+            self.conn.autocommit = True
+
+        result = {
+            "queries": len(samples),
+            "k": k,
+            "recall": sum(recalls) / len(recalls),
+            "uses_index": name in plan_indexes,
+            "index_p50_ms": percentile(index_latencies, 0.5) * 1000,
+            "index_p95_ms": percentile(index_latencies, 0.95) * 1000,
+            "exact_p50_ms": percentile(exact_latencies, 0.5) * 1000,
+            "exact_p95_ms": percentile(exact_latencies, 0.95) * 1000,
+        }
+        param = f"ef_search={ef_search}" if method == "hnsw" else f"probes={probes}"
+        logger.info(f"探测 {name} ({param}, {result['queries']} 个查询): recall@{k} = {result['recall']:.3f}, "
+                    f"索引 p50 {result['index_p50_ms']:.1f}ms / p95 {result['index_p95_ms']:.1f}ms, "
+                    f"顺序扫描 p50 {result['exact_p50_ms']:.1f}ms / p95 {result['exact_p95_ms']:.1f}ms")
+        if plan_indexes and name not in plan_indexes:
+            logger.warning(f"查询计划使用的是 {', '.join(sorted(plan_indexes))} 而不是 {name}（同一列上有多个索引）")
+        elif not plan_indexes:
+            logger.warning(f"查询计划未使用索引 {name}（表太小或统计信息过期时规划器会选择顺序扫描）")
+        return result
+
+
+def main():
+    config = get_config()
+    db_config = config.database
+    index_config = config.get("vector_index", {}) or {}
+    rag_config = config.get("rag", {}) or {}
+
+    parser = argparse.ArgumentParser(description="向量索引管理工具")
+    parser.add_argument("action", choices=("status", "build", "probe", "drop"))
+    parser.add_argument("--table", default=None, help="索引所在的表")
+    parser.add_argument("--column", default="embedding", help="向量列")
+    parser.add_argument("--method", default=index_config.get("method", "hnsw"), choices=METHODS)
+    parser.add_argument("--country", default=None, help="按国家的部分索引")
+    parser.add_argument("--name", default=None, help="索引名 (默认按表、列、方法生成)")
+    parser.add_argument("--m", type=int, default=int(index_config.get("m", 16)))
+    parser.add_argument("--ef-construction", type=int, default=int(index_config.get("ef_construction", 64)))
+    parser.add_argument("--lists", type=int, default=None, help="IVFFlat 聚类数")
+    parser.add_argument("--maintenance-work-mem", default=index_config.get("maintenance_work_mem", "1GB"))
+    parser.add_argument("--parallel-workers", type=int, default=int(index_config.get("parallel_workers", 2)))
+    parser.add_argument("--if-missing", action="store_true", help="已有同名的有效索引时跳过")
+    parser.add_argument("--no-probe", action="store_true", help="构建后不做召回探测")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="进度输出间隔秒数")
+    parser.add_argument("--queries", type=int, default=int(index_config.get("probe_queries", 50)))
+    parser.add_argument("--k", type=int, default=int(index_config.get("probe_k", 10)))
+    parser.add_argument("--ef-search", type=int, default=int(rag_config.get("ef_search", 40)))
+    parser.add_argument("--probes", type=int, default=None, help="IVFFlat 查询参数")
+    args = parser.parse_args()
+
+    table = args.table or db_config.get("table", "pulseglobe_news")
+    if args.country and not args.country.isalnum():
+        parser.error(f"无效的国家代码: {args.country}")
+    name = args.name or index_name(table, args.column, args.method, args.country)
+    min_recall = float(index_config.get("min_recall", 0.9))
+
+    manager = VectorIndexManager(db_config, table)
+    try:
+        if args.action == "status":
+            indexes = manager.list_indexes()
+            if not indexes:
+                logger.warning(f"{table} 没有向量索引，检索为顺序扫描")
+            for index in indexes:
+                state = "有效" if index["valid"] else "无效（构建失败，需重建或删除）"
+                logger.info(f"{index['name']}: {index['method']} {state}, {index['size'] / 2**20:.1f} MB, "
+                            f"{', '.join(index['options'])}")
+                logger.info(f"  {index['definition']}")
+            return
+
+        if args.action == "drop":
+            manager.drop(name)
+            logger.info(f"已删除索引 {name}")
+            return
+
+        if args.action == "build":
+            existing = manager.index_info(name)
+            if args.if_missing and existing and existing["valid"]:
+                logger.info(f"索引 {name} 已存在，跳过构建")
+            else:
+                manager.build(
+                    args.column, args.method, name, country=args.country,
+                    m=args.m, ef_construction=args.ef_construction, lists=args.lists,
+                    maintenance_work_mem=args.maintenance_work_mem,
+                    parallel_workers=args.parallel_workers,
+                    progress_interval=args.progress_interval,
+                )
+            if args.no_probe:
+                return
+
+        result = manager.probe(
+            args.column, args.method, name, country=args.country,
+            queries=args.queries, k=args.k, ef_search=args.ef_search, probes=args.probes,
+        )
+        if result and result["recall"] < min_recall:
+            logger.warning(f"recall@{args.k} {result['recall']:.3f} 低于 {min_recall}，"
+                           f"可提高 ef_search / probes 或用更大的 m / ef_construction 重建")
+            if args.action == "probe":
+                sys.exit(1)
+    except ValueError as e:
+        logger.error(str(e))
+        sys.exit(1)
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
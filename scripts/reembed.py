@@ -0,0 +1,331 @@
+"""
+重新向量化工具（蓝绿切换）：更换 Embedding 模型时在影子列中回填新向量，检索不停机
+
+用法:
+    python scripts/reembed.py prepare --column embedding_v2
+    python scripts/reembed.py backfill --column embedding_v2 [options]
+    python scripts/reembed.py backfill --column embedding_v2 --chunks [options]
+    python scripts/reembed.py status --column embedding_v2
+
+公共选项:
+    --column          影子列，需先在 settings.yaml 的 embedding.columns 中登记其模型与维度
+
+backfill 选项:
+    --chunks          回填段落表 pulseglobe_news_chunks 的同名列
+    --max-concurrency 并发上限 (默认: 2，后台回填不与线上查询争抢 Embedding 配额)
+    --max-rate        平均处理速度上限，篇/s (默认: 不限)
+    --batch-size      每批写库的文档数 (默认: 50)
+    --request-size    每个 Embedding 请求的最大文档数 (默认: 32)
+    --request-tokens  每个 Embedding 请求的估算 token 上限 (默认: 16000)
+    --limit           最大处理数量 (默认: 无限制)
+    --checkpoint      断点文件 (默认: .reembed_checkpoint.json，--chunks 为 .reembed_chunks_checkpoint.json)
+    --restart         忽略断点从头扫描（补上回填期间内容变化而被清空的行）
+
+流程：
+    1. prepare 为新闻表和段落表加上影子列（可空列，只改元数据，瞬间完成）
+    2. 重启 ingest_news.py：此后新入库的文章同时写入当前列和影子列（各用各的模型），
+       内容变化时两列一并清空重写
+    3. backfill 按 id 键集分批回填，每批提交并推进断点，可随时中断后重跑；
+       回填期间 RAG 继续读当前列，切换前再跑一次 backfill --restart 补齐
+    4. 用 manage_vector_index.py build --column <影子列> 在影子列上建索引并探测召回
+    5. status 显示两列的覆盖率与索引，全部就绪后设置 EMBEDDING_ACTIVE_COLUMN=<影子列>
+       并重启服务：检索列与查询模型同时切换，回滚只需改回环境变量
+    6. 切换后运行一次 vectorize_news.py 与 vectorize_news.py --chunks：断点按列区分，
+       会从头补齐新列中为空的行（最后一次回填之后由其他途径写入、只有旧列向量的文章和段落）。
+       ingest_news.py 继续同步写入旧列以便回滚，确认不再回滚后删除旧列即停止
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from pulseglobe.core.config import DEFAULT_EMBEDDING_COLUMN, embedding_profile, get_config
+from pulseglobe.services.retrieval import RetrievalOptions
+from manage_vector_index import MAX_INDEX_DIMS, VectorIndexManager
+from vectorize_news import STAGING_TABLE, Checkpoint, EmbeddingService, VectorDatabase, copy_binary, vectorize_batch
+
+load_dotenv()
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.StreamHandler(),
+        logging.FileHandler('reembed.log', encoding='utf-8')
+    ],
+    force=True,
+)
+logger = logging.getLogger(__name__)
+
+# 加列时等待表锁的上限，避免排在长事务之后阻塞线上查询
+LOCK_TIMEOUT = "5s"
+
+
+class ChunkVectorDatabase(VectorDatabase):
+    """
+    回填段落表的影子列
+
+    段落已经切好，按段落 id 键集分页，以「标题 + 段落」向量化（与 vectorize_news.py --chunks 一致）；
+    doc_id 字段放段落 id，写回时按 id 匹配
+    """
+
+    def __init__(self, config: dict, column: str):
+        super().__init__(config, column=column)
+        self.news_table = self.table
+        self.table = self.chunk_table
+
+    def _fetch_pending(self, condition: str, param, size: int, chunks: bool) -> list:
+        if self.reader is None or self.reader.closed:
+            self.reader = psycopg2.connect(**self.config)
+        try:
+            with self.reader.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"""
+                    SELECT c.id, c.id::text AS doc_id, n.title, c.text AS content
+                    FROM {self.chunk_table} c
+                    JOIN {self.news_table} n ON n.doc_id = c.doc_id
+                    WHERE c.{self.column} IS NULL AND c.{condition}
+                    ORDER BY c.id
+                    LIMIT %s
+                """, (param, size))
+                return cur.fetchall()
+        finally:
+            self.reader.rollback()
+
+    def update_embeddings(self, results: list, dry_run: bool = False):
+        if dry_run or not results:
+            return
+        with self.conn.cursor() as cur:
+            if not self._staging_ready:
+                cur.execute(f"""
+                    CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                        doc_id TEXT, embedding vector, embedding_prefix vector
+                    ) ON COMMIT DELETE ROWS
+                """)
+                self._staging_ready = True
+            cur.copy_expert(
+                f"COPY {STAGING_TABLE} (doc_id, embedding) FROM STDIN WITH (FORMAT binary)",
+                copy_binary([(r.doc_id, r.embedding) for r in results]),
+            )
+            cur.execute(f"""
+                UPDATE {self.chunk_table} c
+                SET {self.column} = s.embedding
+                FROM {STAGING_TABLE} s
+                WHERE c.id = s.doc_id::bigint
+            """)
+        self.conn.commit()
+
+
+class ReembedPlanner:
+    """影子列的创建与覆盖率统计"""
+
+    def __init__(self, db_config: dict, table: str, chunk_table: str):
+        self.db_config = db_config
+        self.table = table
+        self.chunk_table = chunk_table
+        self.conn = psycopg2.connect(
+            host=db_config.get("host", "localhost"),
+            port=db_config.get("port", 5432),
+            dbname=db_config.get("name", "news_db"),
+            user=db_config.get("user", "postgres"),
+            password=db_config.get("password", ""),
+        )
+        self.conn.autocommit = True
+
+    def close(self):
+        self.conn.close()
+
+    def tables(self) -> list[str]:
+        """新闻表，以及已创建时的段落表"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (self.chunk_table,))
+            has_chunks = cur.fetchone()[0]
+        return [self.table, self.chunk_table] if has_chunks else [self.table]
+
+    def has_column(self, table: str, column: str) -> bool:
+        with self.conn.cursor() as cur:
+            cur.execute("""
+                SELECT 1 FROM pg_attribute
+                WHERE attrelid = %s::regclass AND attname = %s AND NOT attisdropped
+            """, (table, column))
+            return cur.fetchone() is not None
+
+    def add_column(self, table: str, column: str, dimensions: int) -> bool:
+        """加上可空的向量列（无默认值，不重写表）；已存在时返回 False"""
+        if self.has_column(table, column):
+            return False
+        with self.conn.cursor() as cur:
+            cur.execute("SET lock_timeout = %s", (LOCK_TIMEOUT,))
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} vector({int(dimensions)})")
+            cur.execute("RESET lock_timeout")
+        return True
+
+    def coverage(self, table: str, active: str, column: str) -> dict:
+        """两列各自已有向量的行数，以及当前列有向量而影子列缺失的行数"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"""
+                SELECT COUNT(*),
+                       COUNT({active}),
+                       COUNT({column}),
+                       COUNT(*) FILTER (WHERE {active} IS NOT NULL AND {column} IS NULL)
+                FROM {table}
+            """)
+            total, active_count, column_count, missing = cur.fetchone()
+        return {"total": total, "active": active_count, "column": column_count, "missing": missing}
+
+    def column_indexes(self, table: str, column: str) -> list[dict]:
+        manager = VectorIndexManager(self.db_config, table)
+        try:
+            # 列索引形如 (embedding_v2 vector_cosine_ops)，halfvec 表达式索引形如 (((embedding_v2)::halfvec(...
+            return [
+                index for index in manager.list_indexes()
+                if f"({column} " in index["definition"] or f"(({column})::" in index["definition"]
+            ]
+        finally:
+            manager.close()
+
+
+def cmd_prepare(planner: ReembedPlanner, column: str, profile: dict):
+    dimensions = int(profile.get("dimensions", 2560))
+    for table in planner.tables():
+        if planner.add_column(table, column, dimensions):
+            logger.info(f"已添加 {table}.{column} vector({dimensions})")
+        else:
+            logger.info(f"{table}.{column} 已存在")
+    if dimensions > MAX_INDEX_DIMS["halfvec"]:
+        logger.warning(f"{dimensions} 维超过 halfvec 可建索引的上限 {MAX_INDEX_DIMS['halfvec']}，"
+                       f"影子列只能顺序扫描，建议选用低维模型或配置 dimensions")
+    elif dimensions > MAX_INDEX_DIMS["vector"]:
+        logger.info(f"{dimensions} 维超过 vector 类型的索引上限 {MAX_INDEX_DIMS['vector']}，回填后用 "
+                    f"manage_vector_index.py build --column {column} 按 halfvec 表达式建索引（pgvector >= 0.7），"
+                    f"检索按同一表达式排序")
+
+
+def cmd_status(planner: ReembedPlanner, column: str, active: str, passages: bool) -> bool:
+    """
+    输出覆盖率与索引，返回影子列是否可以切换
+
+    未开启 rag.passages 时段落表只做展示，不影响是否就绪
+    """
+    ready = True
+    for table in planner.tables():
+        required = table == planner.table or passages
+        if not planner.has_column(table, column):
+            logger.warning(f"{table} 没有列 {column}，请先执行 prepare")
+            ready = ready and not required
+            continue
+        stats = planner.coverage(table, active, column)
+        logger.info(f"{table}: 总数 {stats['total']}, {active} {stats['active']}, "
+                    f"{column} {stats['column']}, 待回填 {stats['missing']}")
+        indexes = planner.column_indexes(table, column)
+        for index in indexes:
+            state = "有效" if index["valid"] else "无效"
+            logger.info(f"  索引 {index['name']}: {index['method']} {state}, {index['size'] / 2**20:.1f} MB")
+        has_index = any(index["valid"] for index in indexes)
+        if not has_index:
+            logger.warning(f"  {table}.{column} 没有有效的向量索引，"
+                           f"可执行 manage_vector_index.py build --table {table} --column {column}")
+        if required and (stats["missing"] or not has_index):
+            ready = False
+
+    if ready:
+        logger.info(f"{column} 已就绪：设置 EMBEDDING_ACTIVE_COLUMN={column} 并重启服务即完成切换，"
+                    f"回滚时改回 {active}；切换后运行一次 vectorize_news.py（含 --chunks）补齐新列")
+    else:
+        logger.info(f"{column} 尚未就绪，RAG 继续使用 {active}")
+    return ready
+
+
+async def cmd_backfill(args, db_config: dict, profile: dict):
+    column = profile["column"]
+    if args.chunks:
+        db = ChunkVectorDatabase(db_config, column)
+        default_checkpoint = ".reembed_chunks_checkpoint.json"
+    else:
+        db = VectorDatabase(db_config, prefix_dimensions=int(profile.get("prefix_dimensions") or 0), column=column)
+        default_checkpoint = ".reembed_checkpoint.json"
+    embedder = EmbeddingService(profile, max_concurrency=args.max_concurrency)
+    # 水位按表、列和模型区分
+    checkpoint = Checkpoint(args.checkpoint or default_checkpoint, f"{db.table}.{column}", embedder.model)
+    if args.restart:
+        checkpoint.reset()
+
+    logger.info("=" * 60)
+    logger.info(f"重新向量化: {db.table}.{column}")
+    logger.info(f"模型: {embedder.model}, 维度: {profile.get('dimensions')}, "
+                f"并发上限: {args.max_concurrency}, 限速: {args.max_rate or '不限'} 篇/s")
+    logger.info("=" * 60)
+    try:
+        db.connect()
+        await vectorize_batch(
+            db=db,
+            embedder=embedder,
+            checkpoint=checkpoint,
+            batch_size=args.batch_size,
+            limit=args.limit,
+            request_size=args.request_size,
+            request_tokens=args.request_tokens,
+            max_rate=args.max_rate,
+        )
+    finally:
+        await embedder.close()
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重新向量化工具（蓝绿切换）")
+    parser.add_argument("action", choices=("prepare", "backfill", "status"))
+    parser.add_argument("--column", required=True, help="影子列")
+    parser.add_argument("--chunks", action="store_true", help="回填段落表的同名列")
+    parser.add_argument("--max-concurrency", type=int, default=2, help="并发上限")
+    parser.add_argument("--max-rate", type=float, default=None, help="平均处理速度上限（篇/s）")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批写库的文档数")
+    parser.add_argument("--request-size", type=int, default=32, help="每个 Embedding 请求的最大文档数")
+    parser.add_argument("--request-tokens", type=int, default=16000, help="每个 Embedding 请求的估算 token 上限")
+    parser.add_argument("--limit", type=int, default=None, help="最大处理数量")
+    parser.add_argument("--checkpoint", default=None, help="断点文件")
+    parser.add_argument("--restart", action="store_true", help="忽略断点从头扫描")
+    args = parser.parse_args()
+
+    config = get_config()
+    embedding_config = config.get("embedding", {}) or {}
+    active = config.embedding["column"]
+    try:
+        profile = embedding_profile(embedding_config, args.column)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.column == active:
+        parser.error(f"{args.column} 是当前检索使用的列（embedding.active_column），"
+                     f"增量向量化请使用 vectorize_news.py")
+    if args.column != DEFAULT_EMBEDDING_COLUMN and args.column not in (embedding_config.get("columns") or {}):
+        parser.error(f"请先在 settings.yaml 的 embedding.columns 中登记 {args.column} 的模型与维度")
+
+    db_config = config.database
+    if args.action == "backfill":
+        asyncio.run(cmd_backfill(args, db_config, profile))
+        return
+
+    planner = ReembedPlanner(
+        db_config,
+        db_config.get("table", "pulseglobe_news"),
+        db_config.get("chunk_table", "pulseglobe_news_chunks"),
+    )
+    try:
+        if args.action == "prepare":
+            cmd_prepare(planner, args.column, profile)
+        elif not cmd_status(planner, args.column, active, RetrievalOptions.from_config().passages):
+            sys.exit(1)
+    finally:
+        planner.close()
+
+
+if __name__ == "__main__":
+    main()
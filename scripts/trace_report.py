@@ -0,0 +1,116 @@
+"""
+链路追踪报告：按会话输出关键路径耗时（火焰图风格）
+
+用法:
+    python scripts/trace_report.py [options]
+
+选项:
+    --path       span JSONL 文件路径 (默认: logs/traces.jsonl)
+    --session    只显示指定 session_id（默认列出全部会话）
+    --top        按名称汇总时显示的条目数 (默认: 15)
+    --width      进度条宽度 (默认: 40)
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.core.tracing import Span, load_spans, group_by_session, critical_path
+
+
+def _bar(value: float, total: float, width: int) -> str:
+    if total <= 0:
+        return ""
+    filled = int(round(value / total * width))
+    return "█" * filled + "·" * (width - filled)
+
+
+def _span_label(s: Span) -> str:
+    """span 名称 + 关键属性"""
+    extras = []
+    for key in ("worker", "collector", "channel", "keyword", "endpoint"):
+        value = s.attributes.get(key)
+        if value:
+            extras.append(f"{key}={value}")
+    label = s.name
+    if extras:
+        label += f" [{', '.join(extras)}]"
+    if s.status == "error":
+        label += " ✗"
+    return label
+
+
+def print_session(session_id: str, spans: list[Span], top: int, width: int):
+    """打印单个会话的关键路径"""
+    path = critical_path(spans)
+    if not path:
+        return
+
+    start = min(s.start_time for s in spans)
+    end = max(s.end_time for s in spans)
+    wall_ms = (end - start) * 1000
+
+    print("=" * 80)
+    print(f"会话 {session_id} | span 数: {len(spans)} | 墙钟耗时: {wall_ms / 1000:.2f}s")
+    print("=" * 80)
+
+    print("\n关键路径（缩进表示调用层级，█ 为占总耗时比例）:")
+    for s, depth, _ in path:
+        offset_ms = (s.start_time - start) * 1000
+        print(f"  {s.duration_ms / 1000:8.2f}s  +{offset_ms / 1000:7.2f}s  "
+              f"{_bar(s.duration_ms, wall_ms, width)}  {'  ' * depth}{_span_label(s)}")
+
+    # 关键路径上各 span 名称的自耗时汇总
+    self_time: dict[str, float] = {}
+    for s, _, self_ms in path:
+        self_time[s.name] = self_time.get(s.name, 0.0) + self_ms
+    total_self = sum(self_time.values()) or 1.0
+
+    print(f"\n关键路径自耗时汇总（Top {top}）:")
+    for name, ms in sorted(self_time.items(), key=lambda x: x[1], reverse=True)[:top]:
+        print(f"  {ms / 1000:8.2f}s  {ms / total_self:6.1%}  {_bar(ms, total_self, width)}  {name}")
+
+    # 全部 span 的调用次数与累计耗时（含并行部分）
+    totals: dict[str, list[float]] = {}
+    for s in spans:
+        totals.setdefault(s.name, []).append(s.duration_ms)
+    errors = sum(1 for s in spans if s.status == "error")
+
+    print(f"\n全部 span 累计（含并行，Top {top}）:")
+    print(f"  {'名称':<40} {'次数':>6} {'累计':>10} {'平均':>10} {'最大':>10}")
+    for name, durations in sorted(totals.items(), key=lambda x: sum(x[1]), reverse=True)[:top]:
+        print(f"  {name:<40} {len(durations):>6} {sum(durations) / 1000:>9.2f}s "
+              f"{sum(durations) / len(durations):>8.0f}ms {max(durations):>8.0f}ms")
+    if errors:
+        print(f"\n  ⚠ 失败 span: {errors}")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="链路追踪关键路径报告")
+    parser.add_argument("--path", default="logs/traces.jsonl", help="span JSONL 文件路径")
+    parser.add_argument("--session", default=None, help="只显示指定 session_id")
+    parser.add_argument("--top", type=int, default=15, help="汇总显示条目数")
+    parser.add_argument("--width", type=int, default=40, help="进度条宽度")
+    args = parser.parse_args()
+
+    if not Path(args.path).exists():
+        print(f"文件不存在: {args.path}")
+        sys.exit(1)
+
+    sessions = group_by_session(load_spans(args.path))
+    if args.session:
+        if args.session not in sessions:
+            print(f"未找到会话: {args.session}")
+            print(f"可用会话: {', '.join(sorted(sessions))}")
+            sys.exit(1)
+        sessions = {args.session: sessions[args.session]}
+
+    for session_id, spans in sorted(sessions.items(), key=lambda x: min(s.start_time for s in x[1])):
+        print_session(session_id, spans, top=args.top, width=args.width)
+
+
+if __name__ == "__main__":
+    main()
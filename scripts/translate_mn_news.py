@@ -3,53 +3,82 @@
 # dependencies = [
 #     "httpx>=0.25.0",
 #     "psycopg2-binary>=2.9.9",
+#     "pyyaml>=6.0",
+#     "python-dotenv>=1.0.0",
 # ]
 # ///
 """
-蒙语新闻批量翻译脚本（并发版）
+蒙语新闻批量翻译脚本（流水线版）
 使用讯蒙科技 Tengri API 将蒙语新闻翻译成中文
 
 用法 (使用 uv):
     uv run translate_mn_news.py [options]
 
 选项:
-    --concurrency   并发数量 (默认: 5)
-    --batch-size    批量处理大小，用于进度显示 (默认: 50)
+    --concurrency   初始并发请求数 (默认: settings.yaml 的 translation.concurrency.initial)
+    --max-concurrency  并发上限 (默认: translation.concurrency.max)
+    --workers       同时翻译的文章数 (默认: 并发上限)
+    --page-size     每次读取的文章数 (默认: 100)
+    --batch-size    每批写库的文章数 (默认: 50)
+    --flush-interval  写库最长间隔秒数，不足一批也写入 (默认: 5)
     --limit         最大处理数量 (默认: 无限制)
     --dry-run       试运行，不实际写入数据库
+    --checkpoint    断点文件 (默认: .translate_checkpoint.json)
+    --restart       忽略断点从最新文章重新扫描
+    --no-memory     不使用翻译记忆
+
+流水线：读取协程按发布日期从新到旧键集分页读取待翻译文章 → 有界队列 →
+固定数量的翻译协程（单篇慢不阻塞其他文章）→ 写库协程攒批后一条多行 upsert 提交。
+
+断点记录本轮开始时最大的文章 id（head）、已连续处理完的位置（cursor）和失败的文章 id。
+重跑时先重试失败的文章，再翻译 id 大于 head 的新入库文章（发布日期较早或缺失的
+补录文章同样按 id 识别），最后从 cursor 继续；一轮扫描完成后，之后的运行只处理
+失败重试和新文章。失败的文章不阻塞水位。
+
+数据库与讯蒙 API 配置取自 settings.yaml（database / translation 段）及环境变量；
+按发布日期排序的部分索引见 sql/migrate_translation_queue.sql。
+翻译记忆（pulseglobe/services/translation_memory.py，sql/create_translation_memory.sql）：
+标题和正文按句子切成句段，先查记忆表，只并发翻译未命中的句段并写回；署名、页脚、
+转载稿等重复内容不再重复请求。单次请求不超过 translation.max_segment_chars 字符，
+长文不会因整篇请求超时失败。运行结束时输出命中率和节省的字符数。
+
+并发由 AIMD 控制器自适应调整（pulseglobe/core/concurrency.py）：遇到 429 / 5xx / 超时
+收缩并退避重试，请求健康时逐步提高到上限。
 """
 
 import asyncio
 import argparse
+import json
 import logging
-from datetime import datetime
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 
 import httpx
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+from psycopg2.extras import RealDictCursor, execute_values
 
-# ============================================
-# 配置区域 - 请修改以下配置
-# ============================================
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-# 数据库配置
-DB_CONFIG = {
-    "host": "111.91.20.199",
-    "port": 5432,
-    "database": "news_db",
-    "user": "postgres",
-    "password": "admin123"
-}
+from pulseglobe.core.concurrency import AdaptiveLimiter
+from pulseglobe.core.config import get_config
+from pulseglobe.services.translation_memory import (
+    DEFAULT_MAX_SEGMENT_CHARS,
+    TranslationMemory,
+    assemble,
+    segment_key,
+    split_segments,
+)
 
-# 讯蒙 API 配置
-XMOR_API_KEY = "sk-cLT4ndg70eZR0ZrgRlASfEa2bcCLaZecWylTKKOwh2MgS0xj"
-XMOR_API_BASE = "https://api.xmor.cn"
+load_dotenv()
 
-# 源表和目标表
-SOURCE_TABLE = "news_articles"
-TARGET_TABLE = "news_articles_mn_zh"
+# 无发布日期的文章排在最后
+NULL_DATE = date(1900, 1, 1)
+SORT_KEY = f"COALESCE(s.publish_date, DATE '{NULL_DATE.isoformat()}')"
 
 # ============================================
 # 日志配置
@@ -83,77 +112,125 @@ class TranslationResult:
 # ============================================
 class XmorTranslator:
     """讯蒙科技 Tengri API 翻译客户端（支持并发）"""
-    
-    def __init__(self, api_key: str, base_url: str = XMOR_API_BASE, concurrency: int = 5):
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.xmor.cn",
+        limiter: AdaptiveLimiter = None,
+        memory: Optional[TranslationMemory] = None,
+        max_segment_chars: int = DEFAULT_MAX_SEGMENT_CHARS,
+    ):
         self.api_key = api_key
         self.base_url = base_url
-        self.semaphore = asyncio.Semaphore(concurrency)  # 限制并发数
+        self.limiter = limiter or AdaptiveLimiter(name="xmor")  # 自适应并发
+        self.memory = memory
+        self.max_segment_chars = max_segment_chars
         self.client = httpx.AsyncClient(
             headers={
                 "Authorization": f"Bearer {api_key}",
                 "Content-Type": "application/json"
             },
             timeout=120.0,
-            limits=httpx.Limits(max_connections=concurrency * 2)
+            limits=httpx.Limits(max_connections=self.limiter.max_limit * 2)
         )
-    
+
     async def translate(
-        self, 
-        text: str, 
+        self,
+        text: str,
         source_lang: str = "auto",
         target_lang: str = "zh"
     ) -> Optional[str]:
-        """翻译文本（带并发限制）"""
+        """翻译文本（自适应并发，过载时退避重试）"""
         if not text or not text.strip():
             return ""
-        
-        async with self.semaphore:  # 获取信号量，限制并发
-            try:
-                response = await self.client.post(
-                    f"{self.base_url}/v1/chat/translation",
-                    json={
-                        "model": "tengri-t1",
-                        "messages": [
-                            {"role": "user", "content": text}
-                        ],
-                        "from": source_lang,
-                        "to": target_lang
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                if "choices" in result:
-                    return result["choices"][0]["message"]["content"]
-                elif "translation" in result:
-                    return result["translation"]
-                elif "content" in result:
-                    return result["content"]
-                else:
-                    return str(result)
-                    
-            except httpx.HTTPStatusError as e:
-                logger.error(f"翻译 API 错误: {e.response.status_code}")
-                return None
-            except Exception as e:
-                logger.error(f"翻译请求失败: {e}")
-                return None
-    
+
+        try:
+            result = await self.limiter.run(self._post, text, source_lang, target_lang)
+        except httpx.HTTPStatusError as e:
+            logger.error(f"翻译 API 错误: {e.response.status_code}")
+            return None
+        except Exception as e:
+            logger.error(f"翻译请求失败: {type(e).__name__} {e}")
+            return None
+
+        if "choices" in result:
+            return result["choices"][0]["message"]["content"]
+        elif "translation" in result:
+            return result["translation"]
+        elif "content" in result:
+            return result["content"]
+        else:
+            return str(result)
+
+    async def _post(self, text: str, source_lang: str, target_lang: str) -> dict:
+        response = await self.client.post(
+            f"{self.base_url}/v1/chat/translation",
+            json={
+                "model": "tengri-t1",
+                "messages": [
+                    {"role": "user", "content": text}
+                ],
+                "from": source_lang,
+                "to": target_lang
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def translate_text(
+        self,
+        text: str,
+        source_lang: str = "auto",
+        target_lang: str = "zh"
+    ) -> Optional[str]:
+        """
+        按句段翻译一段文本，任一句段失败时返回 None
+
+        使用翻译记忆时逐句段查找，只并发翻译未命中的句段（同一文本内重复的句段只翻译一次）；
+        不使用时把相邻句子合并为不超过 max_segment_chars 的请求
+        """
+        if not text or not text.strip():
+            return ""
+
+        segments, gaps = split_segments(text, self.max_segment_chars, merge=self.memory is None)
+        if self.memory is None:
+            translations = await asyncio.gather(*(self.translate(s, source_lang, target_lang) for s in segments))
+            return None if any(t is None for t in translations) else assemble(translations, gaps)
+
+        keys = [segment_key(s, source_lang, target_lang) for s in segments]
+        found = await asyncio.to_thread(self.memory.lookup, segments, source_lang, target_lang)
+        missing = {key: segment for key, segment in zip(keys, segments) if key not in found}
+        results = await asyncio.gather(*(self.translate(s, source_lang, target_lang) for s in missing.values()))
+        translated = dict(zip(missing, results))
+
+        # 成功的句段先写回记忆，文章整体失败重试时也能复用
+        await asyncio.to_thread(
+            self.memory.store,
+            [(missing[key], result) for key, result in translated.items() if result],
+            source_lang,
+            target_lang,
+        )
+        self.memory.record(len(segments), [s for k, s in zip(keys, segments) if k in found], list(missing.values()))
+
+        if any(result is None for result in results):
+            return None
+        return assemble([found.get(key) or translated[key] for key in keys], gaps)
+
     async def translate_article(self, article: dict) -> TranslationResult:
         """
         翻译单篇文章（标题和正文并发翻译）
         """
-        article_id = article["original_id"]
         title = article.get("title", "")
         content = article.get("content", "")
-        
+
         try:
             # 并发翻译标题和正文
             title_zh, content_zh = await asyncio.gather(
-                self.translate(title),
-                self.translate(content)
+                self.translate_text(title),
+                self.translate_text(content)
             )
-            
+
             if title_zh and content_zh:
                 return TranslationResult(
                     article=article,
@@ -177,7 +254,7 @@ class XmorTranslator:
                 success=False,
                 error=str(e)
             )
-    
+
     async def close(self):
         await self.client.aclose()
 
@@ -187,213 +264,537 @@ class XmorTranslator:
 # ============================================
 class NewsDatabase:
     """新闻数据库操作类"""
-    
-    def __init__(self, config: dict):
-        self.config = config
+
+    INSERT_COLUMNS = (
+        "original_id", "title", "content", "publish_date", "scraped_time",
+        "url", "source_name", "language", "category", "file_path", "created_at",
+    )
+
+    def __init__(self, config: dict, source_table: str = "news_articles", target_table: str = "news_articles_mn_zh"):
+        self.config = {
+            "host": config.get("host", "localhost"),
+            "port": config.get("port", 5432),
+            "database": config.get("name", "news_db"),
+            "user": config.get("user", "postgres"),
+            "password": config.get("password", "")
+        }
+        self.source_table = source_table
+        self.target_table = target_table
         self.conn = None
-        self._lock = asyncio.Lock()  # 数据库写入锁
-    
+        self.reader = None    # 分页读取用的独立连接
+
     def connect(self):
         """建立数据库连接"""
         self.conn = psycopg2.connect(**self.config)
         logger.info(f"已连接到数据库: {self.config['database']}@{self.config['host']}")
-    
+
     def close(self):
         """关闭数据库连接"""
+        if self.reader:
+            self.reader.close()
         if self.conn:
             self.conn.close()
             logger.info("数据库连接已关闭")
-    
+
     def ensure_target_table_exists(self):
         """确保目标表存在"""
         with self.conn.cursor() as cur:
-            cur.execute(f"""
-                SELECT EXISTS (
-                    SELECT FROM information_schema.tables 
-                    WHERE table_name = '{TARGET_TABLE}'
-                );
-            """)
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL", (self.target_table,))
             exists = cur.fetchone()[0]
-            
-            if not exists:
-                logger.warning(f"目标表 {TARGET_TABLE} 不存在")
-                raise RuntimeError(f"目标表 {TARGET_TABLE} 不存在")
-            
-            logger.info(f"目标表 {TARGET_TABLE} 已存在")
-    
-    def get_untranslated_articles(self, limit: Optional[int] = None) -> list:
-        """获取尚未翻译的文章"""
-        query = f"""
-            SELECT s.* 
-            FROM {SOURCE_TABLE} s
-            WHERE s.language = 'mn'
-            AND NOT EXISTS (
-                SELECT 1 FROM {TARGET_TABLE} t 
-                WHERE t.original_id = s.original_id
-            )
-            ORDER BY s.id
+        self.conn.rollback()
+
+        if not exists:
+            logger.warning(f"目标表 {self.target_table} 不存在")
+            raise RuntimeError(f"目标表 {self.target_table} 不存在（见 scripts/create_mn_zh_table.sql）")
+
+        logger.info(f"目标表 {self.target_table} 已存在")
+
+    def newest_id(self) -> Optional[int]:
+        """当前最大的蒙语文章 id（新入库的文章 id 更大，与发布日期无关）"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT MAX(id) FROM {self.source_table} WHERE language = 'mn'")
+            newest = cur.fetchone()[0]
+        self.conn.rollback()
+        return newest
+
+    def _fetch_pending(self, clauses: list[str], params: dict) -> list:
+        """读取满足条件且尚未翻译的文章（使用独立的只读连接，可在线程中调用）"""
+        if self.reader is None or self.reader.closed:
+            self.reader = psycopg2.connect(**self.config)
+        try:
+            with self.reader.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"""
+                    SELECT s.*, {SORT_KEY} AS sort_date
+                    FROM {self.source_table} s
+                    WHERE s.language = 'mn'{"".join(f" AND {c}" for c in clauses)}
+                    AND NOT EXISTS (
+                        SELECT 1 FROM {self.target_table} t
+                        WHERE t.original_id = s.original_id
+                    )
+                    ORDER BY sort_date DESC, s.id DESC
+                    LIMIT %(size)s
+                """, params)
+                return cur.fetchall()
+        finally:
+            self.reader.rollback()
+
+    def fetch_pending_page(
+        self,
+        after: Optional[tuple],
+        size: int,
+        newer_than: Optional[int] = None,
+        up_to: Optional[int] = None,
+    ) -> list:
+        """
+        按 (发布日期, id) 从新到旧键集分页读取尚未翻译的文章
+
+        Args:
+            after: 只读取排在该键之后（更旧）的文章；None 表示从最新开始
+            newer_than: 只读取 id 大于它的文章（上一轮之后入库的文章）
+            up_to: 只读取 id 不超过它的文章（本轮开始时已存在的文章）
         """
-        if limit:
-            query += f" LIMIT {limit}"
-        
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query)
-            return cur.fetchall()
-    
-    def insert_translated_article(self, result: TranslationResult, dry_run: bool = False):
-        """插入翻译后的文章（线程安全）"""
-        if not result.success:
-            return False
-        
-        if dry_run:
-            return True
-        
-        article = result.article
+        clauses = []
+        params = {"size": size}
+        if after:
+            clauses.append(f"({SORT_KEY}, s.id) < (%(after_date)s, %(after_id)s)")
+            params.update(after_date=after[0], after_id=after[1])
+        if newer_than is not None:
+            clauses.append("s.id > %(newer_than)s")
+            params["newer_than"] = newer_than
+        if up_to is not None:
+            clauses.append("s.id <= %(up_to)s")
+            params["up_to"] = up_to
+        return self._fetch_pending(clauses, params)
+
+    def fetch_pending_ids(self, ids: list[int]) -> list:
+        """按 id 读取其中尚未翻译的文章（重试此前失败的文章）"""
+        return self._fetch_pending(["s.id = ANY(%(ids)s)"], {"ids": list(ids), "size": len(ids)})
+
+    def upsert_translations(self, results: list[TranslationResult], dry_run: bool = False) -> int:
+        """一条多行 upsert 写入一批翻译结果（一次提交），返回写入行数"""
+        rows = []
+        now = datetime.now()
+        for result in results:
+            article = result.article
+            rows.append((
+                article["original_id"],
+                result.title_zh,
+                result.content_zh,
+                article.get("publish_date"),
+                article.get("scraped_time"),
+                article.get("url"),
+                article.get("source_name"),
+                "zh",
+                article.get("category"),
+                article.get("file_path"),
+                now,
+            ))
+        if dry_run or not rows:
+            return len(rows)
+
         with self.conn.cursor() as cur:
-            cur.execute(f"""
-                INSERT INTO {TARGET_TABLE} (
-                    original_id, title, content, publish_date, scraped_time,
-                    url, source_name, language, category, file_path, created_at
-                ) VALUES (
-                    %(original_id)s, %(title)s, %(content)s, %(publish_date)s, %(scraped_time)s,
-                    %(url)s, %(source_name)s, %(language)s, %(category)s, %(file_path)s, %(created_at)s
-                )
+            execute_values(cur, f"""
+                INSERT INTO {self.target_table} ({", ".join(self.INSERT_COLUMNS)})
+                VALUES %s
                 ON CONFLICT (original_id) DO UPDATE SET
                     title = EXCLUDED.title,
                     content = EXCLUDED.content
-            """, {
-                "original_id": article["original_id"],
-                "title": result.title_zh,
-                "content": result.content_zh,
-                "publish_date": article.get("publish_date"),
-                "scraped_time": article.get("scraped_time"),
-                "url": article.get("url"),
-                "source_name": article.get("source_name"),
-                "language": "zh",
-                "category": article.get("category"),
-                "file_path": article.get("file_path"),
-                "created_at": datetime.now()
-            })
+            """, rows, page_size=len(rows))
         self.conn.commit()
-        return True
-    
+        return len(rows)
+
     def get_stats(self) -> dict:
         """获取翻译统计信息"""
         with self.conn.cursor() as cur:
-            cur.execute(f"SELECT COUNT(*) FROM {SOURCE_TABLE} WHERE language = 'mn'")
+            cur.execute(f"SELECT COUNT(*) FROM {self.source_table} WHERE language = 'mn'")
             total_source = cur.fetchone()[0]
-            
-            cur.execute(f"SELECT COUNT(*) FROM {TARGET_TABLE}")
+
+            cur.execute(f"SELECT COUNT(*) FROM {self.target_table}")
             completed = cur.fetchone()[0]
-            
-            return {
-                "total_source": total_source,
-                "completed": completed,
-                "pending": total_source - completed
-            }
+        self.conn.rollback()
+
+        return {
+            "total_source": total_source,
+            "completed": completed,
+            "pending": total_source - completed
+        }
 
 
 # ============================================
-# 主逻辑（并发版本）
+# 断点
 # ============================================
-async def translate_batch_concurrent(
+def _encode_key(key: Optional[tuple]) -> Optional[list]:
+    return [key[0].isoformat(), key[1]] if key else None
+
+
+def _decode_key(value: Optional[list]) -> Optional[tuple]:
+    return (date.fromisoformat(value[0]), int(value[1])) if value else None
+
+
+class Checkpoint:
+    """
+    翻译进度
+
+    head      本轮开始时最大的文章 id，id 更大的文章（含发布日期较早的补录文章）留给下次运行先处理
+    cursor    本轮已连续处理完（写入或失败）的最后一篇的排序键
+    complete  本轮已扫描到最旧的文章，之后只需处理 head 之后的新文章
+    failed    翻译失败的文章 id，下次运行最先重试
+    """
+
+    def __init__(self, path: str, source_table: str, target_table: str):
+        self.path = Path(path)
+        self.key = f"{source_table}->{target_table}"
+        self.head: Optional[int] = None
+        self.cursor: Optional[tuple] = None
+        self.complete = False
+        self.failed: set[int] = set()
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            # 旧格式的 head 为排序键，无法判断此后入库的文章，视为没有断点（反连接跳过已翻译的文章）
+            if data.get("key") == self.key and isinstance(data.get("head"), int):
+                self.head = data["head"]
+                self.cursor = _decode_key(data.get("cursor"))
+                self.complete = bool(data.get("complete"))
+                self.failed = set(data.get("failed") or [])
+
+    def save(self, head: Optional[int], cursor: Optional[tuple], complete: bool = False):
+        self.head, self.cursor, self.complete = head, cursor, complete
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({
+            "key": self.key,
+            "head": head,
+            "cursor": _encode_key(cursor),
+            "complete": complete,
+            "failed": sorted(self.failed),
+        }), encoding="utf-8")
+        tmp.replace(self.path)
+
+    def save_failed(self):
+        """只更新失败列表，水位不变"""
+        self.save(self.head, self.cursor, self.complete)
+
+    def reset(self):
+        self.head, self.cursor, self.complete = None, None, False
+        self.failed = set()
+        self.path.unlink(missing_ok=True)
+
+    def segments(self, newest: int) -> list[tuple]:
+        """
+        本次运行依次扫描的区间 [(after, newer_than, up_to, main), ...]
+
+        newest 为本次运行开始时最大的文章 id。main 为本轮的主扫描区间，只有它的进度写入
+        cursor；追新区间按 id 识别上一轮之后入库的文章，主区间只读此前已存在的文章，两者不重叠
+        """
+        if self.head is None or (not self.complete and self.cursor is None):
+            return [(None, None, newest, True)]
+        if self.complete:
+            return [(None, self.head, None, False)]
+        return [(None, self.head, None, False), (self.cursor, None, self.head, True)]
+
+
+class ProgressTracker:
+    """按读取顺序的完成水位：序号不超过水位的文章都已处理，完成顺序可以乱序"""
+
+    def __init__(self):
+        self.issued: dict[int, tuple] = {}    # 序号 -> (是否主区间, 排序键)
+        self.done: set[int] = set()
+        self.next_seq = 0
+
+    def issue(self, seq: int, main: bool, key: tuple):
+        self.issued[seq] = (main, key)
+
+    def complete(self, seqs) -> Optional[tuple]:
+        """标记完成，返回水位推进到的 (是否主区间, 排序键)，未推进时返回 None"""
+        self.done.update(seqs)
+        mark = None
+        while self.next_seq in self.done:
+            self.done.remove(self.next_seq)
+            mark = self.issued.pop(self.next_seq)
+            self.next_seq += 1
+        return mark
+
+
+# ============================================
+# 主逻辑（流水线）
+# ============================================
+async def read_articles(
     db: NewsDatabase,
+    queue: asyncio.Queue,
+    tracker: ProgressTracker,
+    checkpoint: Checkpoint,
+    segments: list[tuple],
+    page_size: int,
+    workers: int,
+    limit: Optional[int] = None,
+) -> bool:
+    """
+    读取协程：先重试失败的文章，再依次扫描各区间，文章连同序号放入有界队列，
+    结束时为每个翻译协程放入 None
+
+    Returns:
+        是否扫描完所有区间（未被 limit 截断）
+    """
+    seq = 0
+    seen = set()    # 本次运行已读取的文章 id，重试的文章在后续区间中不再读取
+    exhausted = True
+
+    async def issue(article: dict, main: bool):
+        nonlocal seq
+        seen.add(article["id"])
+        tracker.issue(seq, main, (article["sort_date"], article["id"]))
+        await queue.put((seq, article))
+        seq += 1
+
+    try:
+        retry = sorted(checkpoint.failed)
+        if limit is not None:
+            retry = retry[:limit]
+        for start in range(0, len(retry), page_size):
+            ids = retry[start:start + page_size]
+            page = await asyncio.to_thread(db.fetch_pending_ids, ids)
+            # 已被翻译或已从源表删除的文章不再重试
+            checkpoint.failed.difference_update(set(ids) - {article["id"] for article in page})
+            for article in page:
+                await issue(article, False)
+        if retry:
+            logger.info(f"重试此前失败的文章: {seq} 篇")
+
+        for after, newer_than, up_to, main in segments:
+            while True:
+                if limit is not None and seq >= limit:
+                    exhausted = False
+                    break
+                size = page_size if limit is None else min(page_size, limit - seq)
+                page = await asyncio.to_thread(db.fetch_pending_page, after, size, newer_than, up_to)
+                if not page:
+                    break
+                for article in page:
+                    if article["id"] not in seen:
+                        await issue(article, main)
+                after = (page[-1]["sort_date"], page[-1]["id"])
+            if not exhausted:
+                break
+    finally:
+        for _ in range(workers):
+            await queue.put(None)
+    return exhausted
+
+
+async def translate_articles(translator: XmorTranslator, inbox: asyncio.Queue, outbox: asyncio.Queue):
+    """翻译协程：逐篇翻译，结果放入写库队列"""
+    while (item := await inbox.get()) is not None:
+        seq, article = item
+        result = await translator.translate_article(article)
+        await outbox.put((seq, result))
+
+
+async def write_results(
+    db: NewsDatabase,
+    queue: asyncio.Queue,
+    tracker: ProgressTracker,
+    checkpoint: Checkpoint,
+    head: int,
+    batch_size: int,
+    flush_interval: float,
+    dry_run: bool,
+    stats: dict,
     translator: XmorTranslator,
+):
+    """写库协程：攒满 batch_size 篇或等待超过 flush_interval 秒时批量写入，并推进断点"""
+    buffer = []
+    start_time = time.perf_counter()
+
+    async def flush():
+        succeeded = [result for _, result in buffer if result.success]
+        await asyncio.to_thread(db.upsert_translations, succeeded, dry_run)
+        for _, result in buffer:
+            if result.success:
+                logger.info(f"  ✓ {result.article['original_id']}: {(result.title_zh or '')[:40]}...")
+            else:
+                logger.warning(f"  ✗ {result.article['original_id']}: {result.error}")
+        stats["success"] += len(succeeded)
+        stats["failed"] += len(buffer) - len(succeeded)
+        for _, result in buffer:
+            if result.success:
+                checkpoint.failed.discard(result.article["id"])
+            else:
+                checkpoint.failed.add(result.article["id"])
+
+        mark = tracker.complete(seq for seq, _ in buffer)
+        if not dry_run:
+            # 水位进入主区间时，之前的重试和追新区间必然已全部处理
+            if mark and mark[0]:
+                checkpoint.save(head, mark[1])
+            else:
+                checkpoint.save_failed()
+        buffer.clear()
+
+        elapsed = time.perf_counter() - start_time
+        snapshot = translator.limiter.snapshot()
+        memory = f" | 记忆命中 {translator.memory.hit_rate:.1%}" if translator.memory else ""
+        logger.info(f"--- 写入完成 | 累计成功: {stats['success']} | 累计失败: {stats['failed']} | "
+                    f"{stats['success'] / elapsed:.2f} 篇/s | 并发 {snapshot['limit']}, "
+                    f"过载 {snapshot['overload']}, 重试 {snapshot['retries']}{memory} ---")
+
+    while True:
+        try:
+            item = await asyncio.wait_for(queue.get(), timeout=flush_interval)
+        except asyncio.TimeoutError:
+            if buffer:
+                await flush()
+            continue
+        if item is None:
+            break
+        buffer.append(item)
+        if len(buffer) >= batch_size:
+            await flush()
+    if buffer:
+        await flush()
+
+
+async def translate_pipeline(
+    db: NewsDatabase,
+    translator: XmorTranslator,
+    checkpoint: Checkpoint,
+    workers: int = 16,
+    page_size: int = 100,
     batch_size: int = 50,
+    flush_interval: float = 5.0,
     limit: Optional[int] = None,
-    dry_run: bool = False
+    dry_run: bool = False,
 ):
-    """并发批量翻译文章"""
-    
-    # 获取待翻译文章
-    logger.info("正在从数据库获取待翻译文章...")
-    articles = db.get_untranslated_articles(limit=limit)
-    total = len(articles)
-    
-    if total == 0:
+    """读取 → 翻译协程池 → 批量写库"""
+    head = db.newest_id()
+    if head is None:
+        logger.info("源表中没有蒙语文章")
+        return
+    segments = checkpoint.segments(head)
+    if checkpoint.head is not None:
+        logger.info(f"断点: head=id {checkpoint.head}, cursor={checkpoint.cursor}, "
+                    f"失败待重试 {len(checkpoint.failed)} 篇, "
+                    f"{'本轮已完成，只处理新文章' if checkpoint.complete else '继续本轮扫描'}")
+
+    inbox = asyncio.Queue(maxsize=workers * 2)
+    outbox = asyncio.Queue(maxsize=batch_size * 2)
+    tracker = ProgressTracker()
+    stats = {"success": 0, "failed": 0}
+    start_time = time.perf_counter()
+
+    writer = asyncio.create_task(write_results(
+        db, outbox, tracker, checkpoint, head, batch_size, flush_interval, dry_run, stats, translator,
+    ))
+    reader = asyncio.create_task(read_articles(db, inbox, tracker, checkpoint, segments, page_size, workers, limit))
+    pool = [asyncio.create_task(translate_articles(translator, inbox, outbox)) for _ in range(workers)]
+
+    async def drain() -> bool:
+        await asyncio.gather(*pool)
+        exhausted = await reader
+        await outbox.put(None)
+        return exhausted
+
+    try:
+        # 写库失败时立即中止，避免翻译协程阻塞在已满的队列上
+        exhausted, _ = await asyncio.gather(drain(), writer)
+    except BaseException:
+        for task in (reader, writer, *pool):
+            task.cancel()
+        await asyncio.gather(reader, writer, *pool, return_exceptions=True)
+        raise
+
+    if exhausted and not dry_run:
+        checkpoint.save(head, None, complete=True)
+
+    total = stats["success"] + stats["failed"]
+    if not total:
         logger.info("没有需要翻译的文章")
         return
-    
-    logger.info(f"找到 {total} 篇待翻译文章，开始并发翻译...")
-    
-    success_count = 0
-    fail_count = 0
-    
-    # 分批处理，每批 batch_size 篇
-    for batch_start in range(0, total, batch_size):
-        batch_end = min(batch_start + batch_size, total)
-        batch = articles[batch_start:batch_end]
-        batch_num = batch_start // batch_size + 1
-        total_batches = (total + batch_size - 1) // batch_size
-        
-        logger.info(f"--- 批次 {batch_num}/{total_batches}: 翻译 {len(batch)} 篇 ({batch_start+1}-{batch_end}/{total}) ---")
-        
-        # 并发翻译这一批文章
-        tasks = [translator.translate_article(article) for article in batch]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 处理结果并写入数据库（顺序写入，避免并发问题）
-        for result in results:
-            if isinstance(result, Exception):
-                fail_count += 1
-                logger.error(f"  ✗ 异常: {result}")
-                continue
-            
-            if result.success:
-                db.insert_translated_article(result, dry_run=dry_run)
-                success_count += 1
-                title_preview = (result.title_zh or "")[:40]
-                logger.info(f"  ✓ {result.article['original_id']}: {title_preview}...")
-            else:
-                fail_count += 1
-                logger.warning(f"  ✗ {result.article['original_id']}: {result.error}")
-        
-        # 打印批次统计
-        logger.info(f"--- 批次完成 | 累计成功: {success_count} | 累计失败: {fail_count} ---")
-    
-    logger.info(f"\n翻译完成! 成功: {success_count}, 失败: {fail_count}")
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"\n翻译完成! 成功: {stats['success']}, 失败: {stats['failed']}, "
+                f"耗时 {elapsed:.1f}s ({total / elapsed:.2f} 篇/s)")
+    if translator.memory:
+        logger.info(translator.memory.summary())
 
 
 async def main():
-    parser = argparse.ArgumentParser(description="蒙语新闻批量翻译工具（并发版）")
-    parser.add_argument("--concurrency", type=int, default=5, help="并发数量 (默认: 5)")
-    parser.add_argument("--batch-size", type=int, default=50, help="批量处理大小 (默认: 50)")
+    config = get_config()
+    trans_config = config.get("translation", {}) or {}
+
+    parser = argparse.ArgumentParser(description="蒙语新闻批量翻译工具（流水线版）")
+    parser.add_argument("--concurrency", type=int, default=None, help="初始并发请求数")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="并发上限")
+    parser.add_argument("--workers", type=int, default=None, help="同时翻译的文章数 (默认: 并发上限)")
+    parser.add_argument("--page-size", type=int, default=100, help="每次读取的文章数 (默认: 100)")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批写库的文章数 (默认: 50)")
+    parser.add_argument("--flush-interval", type=float, default=5.0, help="写库最长间隔秒数 (默认: 5)")
     parser.add_argument("--limit", type=int, default=None, help="最大处理数量")
     parser.add_argument("--dry-run", action="store_true", help="试运行模式")
+    parser.add_argument("--checkpoint", default=".translate_checkpoint.json", help="断点文件")
+    parser.add_argument("--restart", action="store_true", help="忽略断点从最新文章重新扫描")
+    parser.add_argument("--no-memory", action="store_true", help="不使用翻译记忆")
     args = parser.parse_args()
-    
+
+    limiter = AdaptiveLimiter.from_config(
+        trans_config.get("concurrency"), name="xmor",
+        initial=args.concurrency, max_limit=args.max_concurrency,
+    )
+    workers = args.workers or limiter.max_limit
+    memory_config = trans_config.get("memory") or {}
+    memory = None
+    if not args.no_memory and str(memory_config.get("enabled", "true")).lower() in ("1", "true", "yes", "on"):
+        memory = TranslationMemory(config.database, table=memory_config.get("table", "translation_memory"))
+
     logger.info("=" * 60)
-    logger.info("蒙语新闻批量翻译工具（并发版）")
-    logger.info(f"并发数: {args.concurrency}, 批次大小: {args.batch_size}")
+    logger.info("蒙语新闻批量翻译工具（流水线版）")
+    logger.info(f"并发数: {limiter.current_limit} (上限 {limiter.max_limit}), 翻译协程: {workers}, "
+                f"每批写库: {args.batch_size}, 翻译记忆: {'开启' if memory else '关闭'}")
     logger.info("=" * 60)
-    
+
     if args.dry_run:
         logger.info(">>> 试运行模式: 不会实际写入数据库 <<<")
-    
+
     # 初始化
-    db = NewsDatabase(DB_CONFIG)
-    translator = XmorTranslator(XMOR_API_KEY, concurrency=args.concurrency)
-    
+    db = NewsDatabase(
+        config.database,
+        source_table=trans_config.get("source_table", "news_articles"),
+        target_table=trans_config.get("target_table", "news_articles_mn_zh"),
+    )
+    translator = XmorTranslator(
+        trans_config.get("api_key", ""),
+        base_url=trans_config.get("base_url", "https://api.xmor.cn"),
+        limiter=limiter,
+        memory=memory,
+        max_segment_chars=int(trans_config.get("max_segment_chars") or DEFAULT_MAX_SEGMENT_CHARS),
+    )
+    checkpoint = Checkpoint(args.checkpoint, db.source_table, db.target_table)
+    if args.restart:
+        checkpoint.reset()
+
     try:
         db.connect()
         db.ensure_target_table_exists()
-        
+
         stats = db.get_stats()
         logger.info(f"当前状态: 源表={stats['total_source']}, 已完成={stats['completed']}, 待处理={stats['pending']}")
-        
-        await translate_batch_concurrent(
+
+        await translate_pipeline(
             db=db,
             translator=translator,
+            checkpoint=checkpoint,
+            workers=workers,
+            page_size=args.page_size,
             batch_size=args.batch_size,
+            flush_interval=args.flush_interval,
             limit=args.limit,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
         )
-        
+
         stats = db.get_stats()
         logger.info(f"最终状态: 源表={stats['total_source']}, 已完成={stats['completed']}, 待处理={stats['pending']}")
-        
+
     finally:
         await translator.close()
+        if memory:
+            memory.close()
         db.close()
 
 
@@ -2,6 +2,7 @@
 # requires-python = ">=3.10"
 # dependencies = [
 #     "httpx>=0.25.0",
+#     "pgvector>=0.4.0",
 #     "psycopg2-binary>=2.9.9",
 #     "pyyaml>=6.0",
 #     "python-dotenv>=1.0.0",
@@ -15,27 +16,65 @@
     uv run vectorize_news.py [options]
 
 选项:
-    --concurrency   并发数量 (默认: 5)
-    --batch-size    批量处理大小 (默认: 50)
+    --concurrency   初始并发请求数 (默认: settings.yaml 的 embedding.concurrency.initial)
+    --max-concurrency  并发上限 (默认: embedding.concurrency.max)
+    --batch-size    每批写库的文档数 (默认: 50)
+    --request-size  每个 Embedding 请求的最大文档数 (默认: 32)
+    --request-tokens  每个 Embedding 请求的估算 token 上限 (默认: 16000)
     --limit         最大处理数量 (默认: 无限制)
     --dry-run       试运行，不实际写入数据库
+    --checkpoint    断点文件 (默认: .vectorize_checkpoint.json)
+    --restart       忽略断点从头扫描（失败的文档记入断点，下次运行时自动先重试）
+    --prefetch      预读的批次数 (默认: 2)
+    --backfill-prefix  为已有向量回填 embedding_prefix（不调用 Embedding API）
+    --chunks        生成段落级向量写入 pulseglobe_news_chunks（需先执行 sql/create_news_chunks.sql），
+                    断点默认为 .vectorize_chunks_checkpoint.json
+
+待处理文档按 id 键集分页流式读取，每批写库后更新断点水位，中断后重跑即从水位继续；
+失败的文档记入断点文件，下次运行时先重试。
+
+并发由 AIMD 控制器自适应调整（pulseglobe/core/concurrency.py）：请求健康时逐步提高，
+遇到 429 / 5xx / 超时减半，失败的请求退避后重新排队。
+
+设置 embedding.prefix_dimensions 后，新生成的向量会同时写入截断前缀列
+embedding_prefix（需先执行 sql/migrate_news_prefix.sql）
+
+整篇向量只覆盖标题 + 正文前 3000 字符；--chunks 按句子边界把全文切成段落
+（embedding.chunking，见 pulseglobe/services/chunking.py），每段以「标题 + 段落」向量化，
+供 rag.passages 段落检索使用
+
+向量写入 embedding.active_column 指定的列（模型取该列的配置）；更换模型时的
+影子列回填与切换见 scripts/reembed.py。断点按列区分，切换列后首次运行会从头补齐新列中为空的行
 """
 
 import asyncio
 import argparse
+import io
+import json
 import logging
+import math
 import os
+import re
+import struct
 import sys
+import time
 from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 
 import httpx
 import psycopg2
+from pgvector import Vector
 from psycopg2.extras import RealDictCursor
 import yaml
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pulseglobe.core.concurrency import AdaptiveLimiter, is_overload
+from pulseglobe.core.config import DEFAULT_EMBEDDING_COLUMN, embedding_profile
+from pulseglobe.services.chunking import chunk_text
+
 # 加载 .env 文件
 load_dotenv()
 
@@ -53,11 +92,14 @@ def load_config():
     with open(config_path, 'r', encoding='utf-8') as f:
         config = yaml.safe_load(f)
     
-    # 解析环境变量
+    # 解析环境变量 ${VAR} 或 ${VAR:default}
     def resolve_env(value):
-        if isinstance(value, str) and value.startswith("${") and value.endswith("}"):
-            env_name = value[2:-1]
-            return os.getenv(env_name, "")
+        if isinstance(value, str):
+            return re.sub(
+                r'\$\{([^}:]+)(?::([^}]*))?\}',
+                lambda m: os.getenv(m.group(1), m.group(2) or ""),
+                value,
+            )
         return value
     
     def resolve_dict(d):
@@ -81,6 +123,138 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def truncate_embedding(embedding: list, dimensions: int) -> list:
+    """截取前 dimensions 维并重新归一化（与 NewsRetriever 的查询前缀算法一致）"""
+    prefix = embedding[:dimensions]
+    norm = math.sqrt(sum(x * x for x in prefix))
+    return [x / norm for x in prefix] if norm else prefix
+
+
+def format_vector(embedding: list) -> str:
+    return "[" + ",".join(map(str, embedding)) + "]"
+
+
+# 批量写入用的临时表
+STAGING_TABLE = "vectorize_staging"
+CHUNK_STAGING_TABLE = "vectorize_chunk_staging"
+
+# PostgreSQL 二进制 COPY 的文件头（签名 + flags + 扩展区长度）与结束标记
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+
+
+def copy_binary(rows: list[tuple]) -> io.BytesIO:
+    """
+    把 (doc_id, 向量, ...) 等行编码为二进制 COPY 数据流
+    
+    文本字段为 UTF-8 字节，整数为 int4，向量字段使用 pgvector 的二进制格式（Vector.to_binary），
+    None 为 NULL；目标列类型须与之对应
+    """
+    buf = io.BytesIO()
+    buf.write(COPY_HEADER)
+    for row in rows:
+        buf.write(struct.pack(">h", len(row)))
+        for value in row:
+            if value is None:
+                buf.write(struct.pack(">i", -1))
+                continue
+            if isinstance(value, str):
+                data = value.encode("utf-8")
+            elif isinstance(value, int):
+                data = struct.pack(">i", value)
+            else:
+                data = Vector(value).to_binary()
+            buf.write(struct.pack(">i", len(data)))
+            buf.write(data)
+    buf.write(COPY_TRAILER)
+    buf.seek(0)
+    return buf
+
+
+def read_copy_binary(data: bytes) -> list[list[Optional[bytes]]]:
+    """解析二进制 COPY 输出（COPY ... TO STDOUT WITH (FORMAT binary)），逐行返回各字段的字节，NULL 为 None"""
+    rows = []
+    offset = len(COPY_HEADER)
+    while True:
+        (count,) = struct.unpack_from(">h", data, offset)
+        offset += 2
+        if count == -1:
+            return rows
+        row = []
+        for _ in range(count):
+            (size,) = struct.unpack_from(">i", data, offset)
+            offset += 4
+            if size == -1:
+                row.append(None)
+                continue
+            row.append(data[offset:offset + size])
+            offset += size
+        rows.append(row)
+
+
+def vector_from_binary(data: bytes) -> list:
+    """pgvector 二进制格式：int16 维度、int16 保留字段，随后是大端 float32"""
+    dimensions, _ = struct.unpack_from(">hh", data)
+    return list(struct.unpack_from(f">{dimensions}f", data, 4))
+
+
+# 截断过长文本（约 1500 中文字符 / 3000 字符）
+MAX_TEXT_CHARS = 3000
+
+
+def document_text(doc: dict) -> str:
+    """标题 + 内容拼接并截断"""
+    title = doc.get("title", "") or ""
+    content = doc.get("content", "") or ""
+    return f"{title}\n\n{content}"[:MAX_TEXT_CHARS]
+
+
+def expand_chunks(docs: list[dict], max_chars: int, overlap: int) -> list[dict]:
+    """
+    把文档切成段落，每段作为一个待向量化单元（title + 段落文本，可直接用于 pack_requests）
+    
+    正文为空的文档没有段落
+    """
+    units = []
+    for doc in docs:
+        for chunk in chunk_text(doc.get("content") or "", max_chars, overlap):
+            units.append({
+                "doc_id": doc["doc_id"],
+                "title": doc.get("title"),
+                "content": chunk.text,
+                "chunk_no": chunk.no,
+                "char_start": chunk.start,
+            })
+    return units
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中日韩字符约 1 token/字，其余约 4 字符/token"""
+    cjk = sum(1 for ch in text if "\u2e80" <= ch <= "\u9fff" or "\uac00" <= ch <= "\ud7af")
+    return cjk + (len(text) - cjk) // 4 + 1
+
+
+def pack_requests(docs: list[dict], max_items: int, max_tokens: int) -> list[list[dict]]:
+    """
+    按条数上限和估算 token 预算把文档打包成多条输入的请求
+    
+    单篇超出预算的文档独占一个请求
+    """
+    requests = []
+    current = []
+    current_tokens = 0
+    for doc in docs:
+        tokens = estimate_tokens(document_text(doc))
+        if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+            requests.append(current)
+            current, current_tokens = [], 0
+        current.append(doc)
+        current_tokens += tokens
+    if current:
+        requests.append(current)
+    return requests
+
+
 # ============================================
 # Embedding 结果
 # ============================================
@@ -98,68 +272,87 @@ class EmbeddingResult:
 class EmbeddingService:
     """通用 Embedding 服务（OpenAI 兼容接口）"""
     
-    def __init__(self, config: dict, concurrency: int = 5):
+    def __init__(self, config: dict, concurrency: Optional[int] = None, max_concurrency: Optional[int] = None):
         self.model = config.get("model", "Qwen/Qwen3-Embedding-4B")
         self.dimension = config.get("dimensions", 2560)
         self.base_url = config.get("base_url", "https://api.siliconflow.cn/v1")
         self.api_key = config.get("api_key", "")
         
-        self.semaphore = asyncio.Semaphore(concurrency)
+        self.limiter = AdaptiveLimiter.from_config(
+            config.get("concurrency"), name="embedding",
+            initial=concurrency, max_limit=max_concurrency,
+        )
+        self.requests = 0
+        self.tokens = 0    # 优先取响应中的 usage，缺失时按估算累计
         self.client = httpx.AsyncClient(
             headers={
                 "Authorization": f"Bearer {self.api_key}",
                 "Content-Type": "application/json"
             },
             timeout=60.0,
-            limits=httpx.Limits(max_connections=concurrency * 2)
+            limits=httpx.Limits(max_connections=self.limiter.max_limit * 2)
         )
         
-        logger.info(f"Embedding 服务初始化: model={self.model}, dim={self.dimension}")
+        logger.info(f"Embedding 服务初始化: model={self.model}, dim={self.dimension}, "
+                    f"并发 {self.limiter.current_limit} (上限 {self.limiter.max_limit})")
     
-    async def get_embedding(self, text: str) -> Optional[list]:
-        """获取单个文本的 embedding"""
-        if not text or not text.strip():
-            return None
-        
-        # 截断过长文本（bge 模型限制 512 tokens，约 1500 中文字符）
-        text = text[:3000]
-        
-        async with self.semaphore:
-            try:
-                response = await self.client.post(
-                    f"{self.base_url}/embeddings",
-                    json={
-                        "model": self.model,
-                        "input": text
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                return result["data"][0]["embedding"]
-            except httpx.HTTPStatusError as e:
-                logger.error(f"Embedding API 错误: {e.response.status_code} - {e.response.text[:200]}")
-                return None
-            except Exception as e:
-                logger.error(f"Embedding 请求失败: {e}")
-                return None
-    
-    async def embed_document(self, doc: dict) -> EmbeddingResult:
-        """为单个文档生成 embedding（标题 + 内容拼接）"""
-        doc_id = doc["doc_id"]
-        title = doc.get("title", "") or ""
-        content = doc.get("content", "") or ""
-        
-        # 拼接标题和内容
-        full_text = f"{title}\n\n{content}"
+    async def get_embeddings(self, texts: list[str]) -> list[Optional[list]]:
+        """
+        一次请求获取多个文本的 embedding（input 为列表），按返回的 index 对齐
         
+        整批失败时二分后分别重试，直到定位到单条失败的文本（返回 None）
+        """
         try:
-            embedding = await self.get_embedding(full_text)
-            if embedding:
-                return EmbeddingResult(doc_id=doc_id, embedding=embedding, success=True)
-            else:
-                return EmbeddingResult(doc_id=doc_id, embedding=None, success=False, error="空响应")
+            # 429 / 5xx / 超时由限流器退避后重新排队
+            result = await self.limiter.run(self._post, texts)
+            
+            embeddings = [None] * len(texts)
+            for item in result["data"]:
+                embeddings[item["index"]] = item["embedding"]
+            usage = result.get("usage") or {}
+            self.requests += 1
+            self.tokens += usage.get("total_tokens") or usage.get("prompt_tokens") or sum(map(estimate_tokens, texts))
+            return embeddings
         except Exception as e:
-            return EmbeddingResult(doc_id=doc_id, embedding=None, success=False, error=str(e))
+            if isinstance(e, httpx.HTTPStatusError):
+                error = f"{e.response.status_code} - {e.response.text[:200]}"
+            else:
+                error = str(e) or type(e).__name__
+            if len(texts) == 1 or is_overload(e):
+                # 过载重试耗尽时拆分只会加重负载，整批记入断点留待下次运行重试
+                logger.error(f"Embedding 请求失败 ({len(texts)} 条): {error}")
+                return [None] * len(texts)
+            
+            # 拆分重试：一条超长或非法文本不应拖垮整批
+            logger.warning(f"Embedding 批量请求失败 ({len(texts)} 条)，拆分重试: {error}")
+            middle = len(texts) // 2
+            left, right = await asyncio.gather(
+                self.get_embeddings(texts[:middle]),
+                self.get_embeddings(texts[middle:]),
+            )
+            return left + right
+    
+    async def _post(self, texts: list[str]) -> dict:
+        response = await self.client.post(
+            f"{self.base_url}/embeddings",
+            json={
+                "model": self.model,
+                "input": texts
+            }
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def embed_documents(self, docs: list[dict]) -> list[EmbeddingResult]:
+        """为一组文档生成 embedding（一次请求，标题 + 内容拼接）"""
+        texts = [document_text(doc) for doc in docs]
+        embeddings = await self.get_embeddings(texts)
+        return [
+            EmbeddingResult(doc_id=doc["doc_id"], embedding=embedding, success=True)
+            if embedding else
+            EmbeddingResult(doc_id=doc["doc_id"], embedding=None, success=False, error="请求失败")
+            for doc, embedding in zip(docs, embeddings)
+        ]
     
     async def close(self):
         await self.client.aclose()
@@ -171,7 +364,7 @@ class EmbeddingService:
 class VectorDatabase:
     """向量数据库操作"""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, prefix_dimensions: int = 0, column: str = DEFAULT_EMBEDDING_COLUMN):
         self.config = {
             "host": config.get("host", "localhost"),
             "port": config.get("port", 5432),
@@ -180,47 +373,199 @@ class VectorDatabase:
             "password": config.get("password", "")
         }
         self.conn = None
+        self.reader = None    # 分页读取用的独立连接
+        self._staging_ready = False
         self.table = "pulseglobe_news"
+        self.chunk_table = config.get("chunk_table", "pulseglobe_news_chunks")
+        self._chunk_staging_ready = False
+        self.column = column    # 新闻表与段落表中写入的向量列
+        # 截断前缀由 embedding 列派生，写入其他列时不更新
+        self.prefix_dimensions = prefix_dimensions if column == DEFAULT_EMBEDDING_COLUMN else 0
     
     def connect(self):
         self.conn = psycopg2.connect(**self.config)
+        self._staging_ready = False
+        self._chunk_staging_ready = False
         logger.info(f"已连接到数据库: {self.config['database']}@{self.config['host']}")
     
     def close(self):
+        if self.reader:
+            self.reader.close()
         if self.conn:
             self.conn.close()
             logger.info("数据库连接已关闭")
     
-    def get_pending_documents(self, limit: Optional[int] = None) -> list:
-        """获取待向量化的文档"""
-        query = f"""
-            SELECT doc_id, title, content 
-            FROM {self.table}
-            WHERE embedding IS NULL
-            ORDER BY id
+    def fetch_pending_page(self, after_id: int, size: int, chunks: bool = False) -> list:
+        """键集分页读取 id > after_id 的待向量化文档（使用独立的只读连接，可在线程中调用）"""
+        return self._fetch_pending("id > %s", after_id, size, chunks)
+    
+    def fetch_pending_ids(self, ids: list[int], chunks: bool = False) -> list:
+        """按 id 读取仍待向量化的文档（重试上次失败的文档，已处理的不再返回）"""
+        return self._fetch_pending("id = ANY(%s)", list(ids), len(ids), chunks)
+    
+    def _fetch_pending(self, condition: str, param, size: int, chunks: bool) -> list:
         """
-        if limit:
-            query += f" LIMIT {limit}"
+        读取满足 condition（作用于 id 列）的待向量化文档
         
-        with self.conn.cursor(cursor_factory=RealDictCursor) as cur:
-            cur.execute(query)
-            return cur.fetchall()
-    
-    def update_embedding(self, doc_id: str, embedding: list, dry_run: bool = False):
-        """更新文档的 embedding"""
-        if dry_run:
-            return True
+        chunks 为 True 时读取尚未切分段落、或有段落在当前列中没有向量的文档
+        （切换 active_column 前由其他列写入的段落，重新切分后按序号覆盖）
+        """
+        if chunks:
+            pending = (f"(NOT EXISTS (SELECT 1 FROM {self.chunk_table} c WHERE c.doc_id = n.doc_id)"
+                       f" OR EXISTS (SELECT 1 FROM {self.chunk_table} c"
+                       f" WHERE c.doc_id = n.doc_id AND c.{self.column} IS NULL))")
+        else:
+            pending = f"n.{self.column} IS NULL"
+        if self.reader is None or self.reader.closed:
+            self.reader = psycopg2.connect(**self.config)
+        try:
+            with self.reader.cursor(cursor_factory=RealDictCursor) as cur:
+                cur.execute(f"""
+                    SELECT n.id, n.doc_id, n.title, n.content
+                    FROM {self.table} n
+                    WHERE {pending} AND n.{condition}
+                    ORDER BY n.id
+                    LIMIT %s
+                """, (param, size))
+                return cur.fetchall()
+        finally:
+            self.reader.rollback()
+    
+    def update_embeddings(self, results: list, dry_run: bool = False):
+        """
+        批量写入一批文档的 embedding（一次提交）
         
-        embedding_str = "[" + ",".join(map(str, embedding)) + "]"
+        向量以 pgvector 二进制格式经 COPY 写入临时表，再用一条 UPDATE ... FROM 回写，
+        避免逐行拼接 2560 维的文本字面量和逐行 UPDATE
+        """
+        if dry_run or not results:
+            return
+        
+        columns = ["doc_id", "embedding"]
+        targets = [self.column]    # 与 columns[1:] 对应的目标列
+        rows = [(r.doc_id, r.embedding) for r in results]
+        if self.prefix_dimensions:
+            columns.append("embedding_prefix")
+            targets.append("embedding_prefix")
+            rows = [(doc_id, e, truncate_embedding(e, self.prefix_dimensions)) for doc_id, e in rows]
         
         with self.conn.cursor() as cur:
+            self._ensure_staging(cur)
+            cur.copy_expert(
+                f"COPY {STAGING_TABLE} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)",
+                copy_binary(rows),
+            )
+            assignments = ", ".join(f"{t} = s.{c}" for t, c in zip(targets, columns[1:]))
             cur.execute(f"""
-                UPDATE {self.table}
-                SET embedding = %s::vector
-                WHERE doc_id = %s
-            """, (embedding_str, doc_id))
+                UPDATE {self.table} t
+                SET {assignments}
+                FROM {STAGING_TABLE} s
+                WHERE t.doc_id = s.doc_id
+            """)
         self.conn.commit()
-        return True
+    
+    def _ensure_staging(self, cur):
+        if not self._staging_ready:
+            # 会话级临时表，提交时清空
+            cur.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                    doc_id TEXT, embedding vector, embedding_prefix vector
+                ) ON COMMIT DELETE ROWS
+            """)
+            self._staging_ready = True
+    
+    def insert_chunks(self, units: list[dict], results: list, dry_run: bool = False):
+        """
+        批量写入段落及其 embedding（一次提交）
+        
+        与 update_embeddings 相同，先二进制 COPY 到临时表，再一条 INSERT ... SELECT
+        从 pulseglobe_news 补上日期和国家；重复执行时覆盖同序号的段落
+        """
+        if dry_run or not units:
+            return
+        
+        rows = [
+            (unit["doc_id"], unit["chunk_no"], unit["char_start"], unit["content"], result.embedding)
+            for unit, result in zip(units, results)
+        ]
+        with self.conn.cursor() as cur:
+            if not self._chunk_staging_ready:
+                cur.execute(f"""
+                    CREATE TEMP TABLE IF NOT EXISTS {CHUNK_STAGING_TABLE} (
+                        doc_id TEXT, chunk_no INTEGER, char_start INTEGER, text TEXT, embedding vector
+                    ) ON COMMIT DELETE ROWS
+                """)
+                self._chunk_staging_ready = True
+            cur.copy_expert(
+                f"COPY {CHUNK_STAGING_TABLE} (doc_id, chunk_no, char_start, text, embedding) "
+                f"FROM STDIN WITH (FORMAT binary)",
+                copy_binary(rows),
+            )
+            cur.execute(f"""
+                INSERT INTO {self.chunk_table}
+                    (doc_id, chunk_no, char_start, text, publish_date, source_country, {self.column})
+                SELECT s.doc_id, s.chunk_no, s.char_start, s.text, n.publish_date, n.source_country, s.embedding
+                FROM {CHUNK_STAGING_TABLE} s
+                JOIN {self.table} n ON n.doc_id = s.doc_id
+                ON CONFLICT (doc_id, chunk_no) DO UPDATE SET
+                    char_start = EXCLUDED.char_start,
+                    text = EXCLUDED.text,
+                    {self.column} = EXCLUDED.{self.column}
+            """)
+        self.conn.commit()
+    
+    def backfill_prefix(self, batch_size: int = 500, limit: Optional[int] = None, dry_run: bool = False) -> int:
+        """
+        为已有 embedding 的文档回填 embedding_prefix（按 id 键集分批，每批提交）
+        
+        与 update_embeddings 相同走二进制格式：向量经 COPY TO STDOUT 读出、截断后
+        COPY 到临时表，每批一条 UPDATE ... FROM 回写，不经过文本字面量
+        
+        Returns:
+            回填行数
+        """
+        last_id = 0
+        total = 0
+        while limit is None or total < limit:
+            size = batch_size if limit is None else min(batch_size, limit - total)
+            buf = io.BytesIO()
+            with self.conn.cursor() as cur:
+                query = cur.mogrify(f"""
+                    SELECT id::int8, doc_id, embedding
+                    FROM {self.table}
+                    WHERE id > %s AND embedding IS NOT NULL AND embedding_prefix IS NULL
+                    ORDER BY id
+                    LIMIT %s
+                """, (last_id, size)).decode()
+                cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT binary)", buf)
+            rows = read_copy_binary(buf.getvalue())
+            if not rows:
+                self.conn.rollback()
+                break
+            
+            if not dry_run:
+                updates = [
+                    (doc_id.decode("utf-8"), truncate_embedding(vector_from_binary(data), self.prefix_dimensions))
+                    for _, doc_id, data in rows
+                ]
+                with self.conn.cursor() as cur:
+                    self._ensure_staging(cur)
+                    cur.copy_expert(
+                        f"COPY {STAGING_TABLE} (doc_id, embedding_prefix) FROM STDIN WITH (FORMAT binary)",
+                        copy_binary(updates),
+                    )
+                    cur.execute(f"""
+                        UPDATE {self.table} t
+                        SET embedding_prefix = s.embedding_prefix
+                        FROM {STAGING_TABLE} s
+                        WHERE t.doc_id = s.doc_id
+                    """)
+            self.conn.commit()
+            
+            last_id = struct.unpack(">q", rows[-1][0])[0]
+            total += len(rows)
+            logger.info(f"  前缀回填: +{len(rows)} (累计 {total}, id <= {last_id})")
+        return total
     
     def get_stats(self) -> dict:
         """获取向量化统计"""
@@ -228,7 +573,7 @@ class VectorDatabase:
             cur.execute(f"SELECT COUNT(*) FROM {self.table}")
             total = cur.fetchone()[0]
             
-            cur.execute(f"SELECT COUNT(*) FROM {self.table} WHERE embedding IS NOT NULL")
+            cur.execute(f"SELECT COUNT(*) FROM {self.table} WHERE {self.column} IS NOT NULL")
             vectorized = cur.fetchone()[0]
             
             return {
@@ -236,104 +581,312 @@ class VectorDatabase:
                 "vectorized": vectorized,
                 "pending": total - vectorized
             }
+    
+    def get_chunk_stats(self) -> dict:
+        """获取段落向量化统计"""
+        with self.conn.cursor() as cur:
+            cur.execute(f"SELECT COUNT(*) FROM {self.table}")
+            total = cur.fetchone()[0]
+            
+            cur.execute(f"SELECT COUNT(DISTINCT doc_id), COUNT(*) FROM {self.chunk_table}")
+            chunked, chunks = cur.fetchone()
+            
+            return {
+                "total": total,
+                "chunked": chunked,
+                "chunks": chunks,
+                "pending": total - chunked
+            }
+
+
+# ============================================
+# 断点
+# ============================================
+class Checkpoint:
+    """
+    断点水位：id <= last_id 的文档都已处理（成功写入，或失败并记入 failed）
+    
+    每批写库提交后原子更新；重启时先重试 failed 中的文档，再从水位之后继续，
+    不必重新扫描已处理的区间。
+    水位按 table（调用方传入表名与列名）和模型区分，换列或换模型后自动从头开始
+    """
+    
+    def __init__(self, path: str, table: str, model: str):
+        self.path = Path(path)
+        self.key = f"{table}:{model}"
+        self.last_id = 0
+        self.failed: set[int] = set()    # 向量化失败的 id，下次运行时先重试
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("key") == self.key:
+                self.last_id = int(data.get("last_id", 0))
+                self.failed = set(map(int, data.get("failed", [])))
+    
+    def save(self, last_id: int):
+        # 重试的失败文档排在前面，其 id 小于当前水位
+        self.last_id = max(self.last_id, last_id)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({
+            "key": self.key,
+            "last_id": self.last_id,
+            "failed": sorted(self.failed),
+        }), encoding="utf-8")
+        tmp.replace(self.path)
+    
+    def reset(self):
+        self.last_id = 0
+        self.failed = set()
+        self.path.unlink(missing_ok=True)
 
 
 # ============================================
 # 主逻辑
 # ============================================
+async def produce_pages(
+    db: VectorDatabase,
+    queue: asyncio.Queue,
+    checkpoint: Checkpoint,
+    batch_size: int,
+    limit: Optional[int] = None,
+    chunks: bool = False,
+):
+    """
+    生产者：先读取上次失败的文档，再按 id 键集分页读取水位之后的待处理文档，
+    放入有界队列，结束时放入 None
+    """
+    fetched = 0
+    try:
+        retry = sorted(checkpoint.failed)
+        if retry:
+            logger.info(f"重试上次失败的文档: {len(retry)} 个")
+        for start in range(0, len(retry), batch_size):
+            if limit is not None and fetched >= limit:
+                break
+            ids = retry[start:start + batch_size]
+            page = await asyncio.to_thread(db.fetch_pending_ids, ids, chunks)
+            # 已被删除或已由其他途径写入的文档不再重试
+            checkpoint.failed.difference_update(set(ids) - {doc["id"] for doc in page})
+            if page:
+                await queue.put(page)
+                fetched += len(page)
+        
+        after_id = checkpoint.last_id
+        while limit is None or fetched < limit:
+            size = batch_size if limit is None else min(batch_size, limit - fetched)
+            page = await asyncio.to_thread(db.fetch_pending_page, after_id, size, chunks)
+            if not page:
+                break
+            await queue.put(page)
+            fetched += len(page)
+            after_id = page[-1]["id"]
+    finally:
+        await queue.put(None)
+
+
 async def vectorize_batch(
     db: VectorDatabase,
     embedder: EmbeddingService,
+    checkpoint: Checkpoint,
     batch_size: int = 50,
     limit: Optional[int] = None,
-    dry_run: bool = False
+    dry_run: bool = False,
+    request_size: int = 32,
+    request_tokens: int = 16000,
+    prefetch: int = 2,
+    chunking: Optional[dict] = None,
+    max_rate: Optional[float] = None,
 ):
-    """批量向量化"""
+    """
+    流式批量向量化
     
-    logger.info("正在获取待向量化文档...")
-    docs = db.get_pending_documents(limit=limit)
-    total = len(docs)
+    生产者按 id 键集分页读取（队列最多缓存 prefetch 页，内存与待处理总量无关），
+    消费者每页按 request_size / request_tokens 打包成多条输入的请求并发调用，
+    写库提交后推进断点水位
     
-    if total == 0:
-        logger.info("没有待向量化的文档")
-        return
+    传入 chunking（{"max_chars", "overlap"}）时把每页文档切成段落后向量化，
+    一篇文章的段落全部成功才写入段落表，成功 / 失败按文章计数
     
-    logger.info(f"找到 {total} 个待向量化文档，开始处理...")
+    max_rate 限制平均处理速度（篇/s），后台回填时降低对 Embedding API 配额和数据库的占用
+    """
+    if checkpoint.last_id:
+        logger.info(f"从断点继续: id > {checkpoint.last_id}")
+    
+    queue = asyncio.Queue(maxsize=prefetch)
+    producer = asyncio.create_task(
+        produce_pages(db, queue, checkpoint, batch_size, limit, chunks=chunking is not None)
+    )
     
     success_count = 0
     fail_count = 0
+    batch_num = 0
+    start_time = time.perf_counter()
     
-    for batch_start in range(0, total, batch_size):
-        batch_end = min(batch_start + batch_size, total)
-        batch = docs[batch_start:batch_end]
-        batch_num = batch_start // batch_size + 1
-        total_batches = (total + batch_size - 1) // batch_size
-        
-        logger.info(f"--- 批次 {batch_num}/{total_batches}: 处理 {len(batch)} 个 ({batch_start+1}-{batch_end}/{total}) ---")
-        
-        # 并发处理
-        tasks = [embedder.embed_document(doc) for doc in batch]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 写入数据库
-        for result in results:
-            if isinstance(result, Exception):
-                fail_count += 1
-                logger.error(f"  ✗ 异常: {result}")
-                continue
+    try:
+        while (batch := await queue.get()) is not None:
+            batch_num += 1
+            units = batch
+            if chunking is not None:
+                units = expand_chunks(batch, chunking["max_chars"], chunking["overlap"])
+            requests = pack_requests(units, request_size, request_tokens)
+            logger.info(f"--- 批次 {batch_num}: 处理 {len(batch)} 个 (id {batch[0]['id']}-{batch[-1]['id']})，"
+                        f"{len(units) if chunking is not None else len(batch)} 个单元，{len(requests)} 个请求 ---")
+            
+            # 并发请求
+            tasks = [embedder.embed_documents(request) for request in requests]
+            outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+            
+            succeeded = []    # (单元, 结果)
+            failed = set()    # 失败的 doc_id
+            for request, outcome in zip(requests, outcomes):
+                if isinstance(outcome, Exception):
+                    failed.update(unit["doc_id"] for unit in request)
+                    logger.error(f"  ✗ 异常 ({len(request)} 个单元): {outcome}")
+                    continue
+                
+                for unit, result in zip(request, outcome):
+                    if result.success and result.embedding:
+                        succeeded.append((unit, result))
+                    else:
+                        failed.add(unit["doc_id"])
+                        logger.warning(f"  ✗ {result.doc_id}: {result.error}")
             
-            if result.success and result.embedding:
-                db.update_embedding(result.doc_id, result.embedding, dry_run=dry_run)
-                success_count += 1
+            # 写入数据库后推进水位，失败的文档记入断点，下次运行时先重试
+            if chunking is not None:
+                written = [(unit, result) for unit, result in succeeded if unit["doc_id"] not in failed]
+                db.insert_chunks([u for u, _ in written], [r for _, r in written], dry_run=dry_run)
+                success_count += len({unit["doc_id"] for unit, _ in written})
             else:
-                fail_count += 1
-                logger.warning(f"  ✗ {result.doc_id}: {result.error}")
-        
-        logger.info(f"--- 批次完成 | 累计成功: {success_count} | 累计失败: {fail_count} ---")
+                db.update_embeddings([result for _, result in succeeded], dry_run=dry_run)
+                success_count += len(succeeded)
+            fail_count += len(failed)
+            ids = {doc["doc_id"]: doc["id"] for doc in batch}
+            checkpoint.failed.difference_update(ids.values())
+            checkpoint.failed.update(ids[doc_id] for doc_id in failed)
+            if not dry_run:
+                checkpoint.save(batch[-1]["id"])
+            
+            elapsed = time.perf_counter() - start_time
+            if max_rate:
+                # 按累计处理量限速，批次间休眠
+                delay = (success_count + fail_count) / max_rate - elapsed
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            limiter = embedder.limiter.snapshot()
+            logger.info(f"--- 批次完成 | 累计成功: {success_count} | 累计失败: {fail_count} | "
+                        f"{success_count / elapsed:.1f} 篇/s, {embedder.tokens / elapsed:.0f} tokens/s | "
+                        f"并发 {limiter['limit']}, 过载 {limiter['overload']}, 重试 {limiter['retries']} ---")
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+    
+    if not batch_num:
+        logger.info("没有待向量化的文档")
+        return
     
-    logger.info(f"\n向量化完成! 成功: {success_count}, 失败: {fail_count}")
+    elapsed = time.perf_counter() - start_time
+    logger.info(f"\n向量化完成! 成功: {success_count}, 失败: {fail_count}, 耗时 {elapsed:.1f}s")
+    logger.info(f"吞吐: {success_count / elapsed:.1f} 篇/s, {embedder.tokens / elapsed:.0f} tokens/s, "
+                f"请求 {embedder.requests} 次 (平均 {success_count / max(embedder.requests, 1):.1f} 篇/请求)")
+
+
+def log_stats(db: VectorDatabase, label: str, chunks: bool = False):
+    if chunks:
+        stats = db.get_chunk_stats()
+        logger.info(f"{label}: 总数={stats['total']}, 已分段={stats['chunked']} ({stats['chunks']} 段), "
+                    f"待处理={stats['pending']}")
+    else:
+        stats = db.get_stats()
+        logger.info(f"{label}: 总数={stats['total']}, 已向量化={stats['vectorized']}, 待处理={stats['pending']}")
 
 
 async def main():
     parser = argparse.ArgumentParser(description="新闻向量化工具")
-    parser.add_argument("--concurrency", type=int, default=5, help="并发数量")
-    parser.add_argument("--batch-size", type=int, default=50, help="批量处理大小")
+    parser.add_argument("--concurrency", type=int, default=None, help="初始并发请求数")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="并发上限")
+    parser.add_argument("--batch-size", type=int, default=50, help="每批写库的文档数")
+    parser.add_argument("--request-size", type=int, default=32, help="每个 Embedding 请求的最大文档数")
+    parser.add_argument("--request-tokens", type=int, default=16000, help="每个 Embedding 请求的估算 token 上限")
     parser.add_argument("--limit", type=int, default=None, help="最大处理数量")
     parser.add_argument("--dry-run", action="store_true", help="试运行模式")
+    parser.add_argument("--checkpoint", default=None, help="断点文件")
+    parser.add_argument("--restart", action="store_true", help="忽略断点从头扫描")
+    parser.add_argument("--prefetch", type=int, default=2, help="预读的批次数")
+    parser.add_argument("--backfill-prefix", action="store_true", help="为已有向量回填 embedding_prefix")
+    parser.add_argument("--chunks", action="store_true", help="生成段落级向量（pulseglobe_news_chunks）")
     args = parser.parse_args()
     
-    # 加载配置
+    # 加载配置（模型取 active_column 对应的配置）
     config = load_config()
+    config["embedding"] = embedding_profile(config["embedding"])
+    prefix_dimensions = int(config["embedding"].get("prefix_dimensions") or 0)
+    
+    if args.backfill_prefix:
+        if not prefix_dimensions:
+            logger.error("请先在 settings.yaml 中设置 embedding.prefix_dimensions")
+            sys.exit(1)
+        db = VectorDatabase(config["database"], prefix_dimensions=prefix_dimensions)
+        try:
+            db.connect()
+            logger.info(f"回填 embedding_prefix: {prefix_dimensions} 维")
+            total = db.backfill_prefix(batch_size=args.batch_size, limit=args.limit, dry_run=args.dry_run)
+            logger.info(f"前缀回填完成: {total} 行")
+        finally:
+            db.close()
+        return
     
     logger.info("=" * 60)
     logger.info("新闻向量化工具")
     logger.info(f"模型: {config['embedding']['model']}")
-    logger.info(f"维度: {config['embedding']['dimension']}")
-    logger.info(f"并发数: {args.concurrency}, 批次大小: {args.batch_size}")
+    logger.info(f"维度: {config['embedding']['dimensions']}, 向量列: {config['embedding']['column']}")
+    chunking = None
+    if args.chunks:
+        chunk_config = config["embedding"].get("chunking") or {}
+        chunking = {
+            "max_chars": int(chunk_config.get("max_chars") or 600),
+            "overlap": int(chunk_config.get("overlap") or 0),
+        }
+        logger.info(f"段落向量: 每段 <= {chunking['max_chars']} 字符, 重叠 {chunking['overlap']} 句")
+    elif prefix_dimensions and config["embedding"]["column"] == DEFAULT_EMBEDDING_COLUMN:
+        logger.info(f"截断前缀: {prefix_dimensions} 维（同时写入 embedding_prefix）")
+    logger.info(f"批次大小: {args.batch_size}, "
+                f"每请求: {args.request_size} 篇 / {args.request_tokens} tokens")
     logger.info("=" * 60)
     
     if args.dry_run:
         logger.info(">>> 试运行模式 <<<")
     
-    db = VectorDatabase(config["database"])
-    embedder = EmbeddingService(config["embedding"], concurrency=args.concurrency)
+    db = VectorDatabase(config["database"], prefix_dimensions=prefix_dimensions, column=config["embedding"]["column"])
+    embedder = EmbeddingService(config["embedding"], concurrency=args.concurrency,
+                                max_concurrency=args.max_concurrency)
+    # 水位按表、列和模型区分：切换 active_column 后从头扫描新列中为空的行
+    if args.chunks:
+        checkpoint = Checkpoint(args.checkpoint or ".vectorize_chunks_checkpoint.json",
+                                f"{db.chunk_table}.{db.column}", embedder.model)
+    else:
+        checkpoint = Checkpoint(args.checkpoint or ".vectorize_checkpoint.json",
+                                f"{db.table}.{db.column}", embedder.model)
+    if args.restart:
+        checkpoint.reset()
     
     try:
         db.connect()
         
-        stats = db.get_stats()
-        logger.info(f"当前状态: 总数={stats['total']}, 已向量化={stats['vectorized']}, 待处理={stats['pending']}")
+        log_stats(db, "当前状态", args.chunks)
         
         await vectorize_batch(
             db=db,
             embedder=embedder,
+            checkpoint=checkpoint,
             batch_size=args.batch_size,
             limit=args.limit,
-            dry_run=args.dry_run
+            dry_run=args.dry_run,
+            request_size=args.request_size,
+            request_tokens=args.request_tokens,
+            prefetch=args.prefetch,
+            chunking=chunking,
         )
         
-        stats = db.get_stats()
-        logger.info(f"最终状态: 总数={stats['total']}, 已向量化={stats['vectorized']}, 待处理={stats['pending']}")
+        log_stats(db, "最终状态", args.chunks)
         
     finally:
         await embedder.close()
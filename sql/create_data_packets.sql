@@ -38,6 +38,9 @@ content_hash VARCHAR(64)              -- 内容哈希，用于去重
 -- 索引
 CREATE INDEX IF NOT EXISTS idx_packets_session ON data_packets (session_id);
 
+-- 键集分页：WHERE session_id = ? AND id > ? ORDER BY id
+CREATE INDEX IF NOT EXISTS idx_packets_session_id ON data_packets (session_id, id);
+
 CREATE INDEX IF NOT EXISTS idx_packets_source ON data_packets (source_type);
 
 CREATE INDEX IF NOT EXISTS idx_packets_keyword ON data_packets (keyword);
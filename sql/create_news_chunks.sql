@@ -0,0 +1,44 @@
+-- ============================================
+-- pulseglobe_news_chunks：新闻正文的段落级向量
+--   每篇文章按句子边界切成不超过 chunking.max_chars 的段落（pulseglobe/services/chunking.py），
+--   每段单独向量化；publish_date / source_country 从 pulseglobe_news 冗余过来，
+--   使日期、国家过滤能与单表检索一样下推到索引扫描
+-- NewsRetriever 在 rag.passages = true 时检索此表，按文章聚合并只返回命中的段落
+-- 用法：
+--   psql -d news_db -f create_news_chunks.sql          # 第 1 步
+--   uv run scripts/vectorize_news.py --chunks
+--   然后执行下方第 2 步建索引
+-- 注意：向量维度需与 settings.yaml 中 embedding.dimensions 一致
+-- ============================================
+
+-- ========== 1. 段落表 ==========
+CREATE TABLE IF NOT EXISTS pulseglobe_news_chunks (
+    id BIGSERIAL PRIMARY KEY,
+    doc_id VARCHAR(50) NOT NULL REFERENCES pulseglobe_news (doc_id) ON DELETE CASCADE,
+    chunk_no INTEGER NOT NULL,                -- 段序号，从 0 开始
+    char_start INTEGER NOT NULL,              -- 段落在 content 中的起始字符偏移
+    text TEXT NOT NULL,
+    publish_date DATE,
+    source_country VARCHAR(10),
+    embedding vector(2560),
+    created_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE (doc_id, chunk_no)
+);
+
+CREATE INDEX IF NOT EXISTS idx_news_chunks_publish_date ON pulseglobe_news_chunks (publish_date);
+CREATE INDEX IF NOT EXISTS idx_news_chunks_country ON pulseglobe_news_chunks (source_country);
+
+-- ========== 2. 索引（向量化完成后执行） ==========
+-- vector 类型 HNSW 最多 2000 维，2560 维按半精度表达式建索引（pgvector >= 0.7.0）；
+-- 表达式须与 NewsRetriever._passage_sql 完全一致。维度 <= 2000 时改用
+--   USING hnsw (embedding vector_cosine_ops)
+SET maintenance_work_mem = '1GB';
+
+CREATE INDEX IF NOT EXISTS idx_news_chunks_embedding_hnsw ON pulseglobe_news_chunks
+USING hnsw ((embedding::halfvec(2560)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- ========== 验证 ==========
+-- SELECT COUNT(DISTINCT doc_id) AS chunked_docs, COUNT(*) AS chunks,
+--        ROUND(AVG(length(text))) AS avg_chars
+-- FROM pulseglobe_news_chunks;
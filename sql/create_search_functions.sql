@@ -0,0 +1,43 @@
+-- ============================================
+-- 全文检索公共函数
+--   pulseglobe_search_text():  中文按二元组（bigram）切分，其余文字保持原样，
+--                              配合 'simple' 配置生成 tsvector，无需安装中文分词扩展
+--   pulseglobe_search_query(): 将检索词转换为 tsquery
+-- 被 migrate_packets_search.sql / migrate_news_search.sql 的生成列引用，需先执行
+-- 用法：psql -d pulseglobe -f create_search_functions.sql
+-- ============================================
+
+-- '蒙古国矿业' -> '蒙古 古国 国矿 矿业'；单个汉字原样保留；非中文文本原样保留
+CREATE OR REPLACE FUNCTION pulseglobe_search_text(input text)
+RETURNS text
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE STRICT
+AS $$
+DECLARE
+    run text;
+    parts text[] := ARRAY[]::text[];
+    i int;
+BEGIN
+    -- 非中文部分：把中文替换为空格后交给 simple 分词
+    parts := parts || regexp_replace(input, '[㐀-鿿]+', ' ', 'g');
+
+    FOR run IN SELECT m[1] FROM regexp_matches(input, '([㐀-鿿]+)', 'g') AS m LOOP
+        IF char_length(run) = 1 THEN
+            parts := parts || run;
+        ELSE
+            FOR i IN 1 .. char_length(run) - 1 LOOP
+                parts := parts || substr(run, i, 2);
+            END LOOP;
+        END IF;
+    END LOOP;
+
+    RETURN array_to_string(parts, ' ');
+END;
+$$;
+
+-- 将检索词转换为 tsquery（所有词元 AND）
+CREATE OR REPLACE FUNCTION pulseglobe_search_query(input text)
+RETURNS tsquery
+LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+AS $$
+    SELECT plainto_tsquery('simple', pulseglobe_search_text(input))
+$$;
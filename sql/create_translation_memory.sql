@@ -0,0 +1,27 @@
+-- ============================================
+-- translation_memory：句段级翻译记忆（精确匹配）
+--   scripts/translate_mn_news.py 把标题和正文按句子切成句段，先按 source_hash 查找，
+--   只翻译未命中的句段并写回；source_hash 为 SHA-256(源语言, 目标语言, 空白归一化后的原文)
+--   见 pulseglobe/services/translation_memory.py
+-- 用法：
+--   psql -d news_db -f create_translation_memory.sql
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS translation_memory (
+    source_hash CHAR(64) PRIMARY KEY,
+    source_lang VARCHAR(10) NOT NULL,
+    target_lang VARCHAR(10) NOT NULL,
+    source_text TEXT NOT NULL,
+    target_text TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,            -- 被复用的次数
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_used_at TIMESTAMP DEFAULT NOW()
+);
+
+-- 清理长期未使用的记忆时使用
+CREATE INDEX IF NOT EXISTS idx_translation_memory_last_used ON translation_memory (last_used_at);
+
+-- ========== 验证 ==========
+-- 复用最多的句段（署名、页脚、固定栏目）
+-- SELECT hits, left(source_text, 60), left(target_text, 40)
+-- FROM translation_memory ORDER BY hits DESC LIMIT 20;
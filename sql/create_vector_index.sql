@@ -1,6 +1,8 @@
 -- ============================================
 -- 向量索引创建脚本
 -- 在数据量增大后执行以加速检索
+-- 线上库推荐使用 scripts/manage_vector_index.py build：CONCURRENTLY 构建并替换旧索引
+-- （不阻塞读写）、设置构建内存与并行进程、输出构建进度，完成后做召回 / 延迟探测
 -- ============================================
 
 -- 修改向量维度为 1024（如果需要）
@@ -10,25 +12,35 @@
 -- ========== HNSW 索引（推荐） ==========
 -- 优点：召回质量高，查询速度快
 -- 缺点：构建时间较长，占用更多内存
-CREATE INDEX idx_news_embedding_hnsw ON pulseglobe_news USING hnsw (embedding vector_cosine_ops)
-WITH (m = 16, ef_construction = 64);
+-- vector 类型的 HNSW / IVFFlat 最多 2000 维，2560 维按 halfvec 表达式建索引（pgvector >= 0.7.0）；
+-- 表达式须与 retrieval.vector_order 一致（NewsRetriever 的全精度第一阶段按同一表达式排序）。
+-- 用 CONCURRENTLY 构建，不阻塞线上读写；不要用 psql -1 或在事务块中执行
+SET maintenance_work_mem = '2GB';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_embedding_hnsw ON pulseglobe_news
+USING hnsw ((embedding::halfvec(2560)) halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+
+-- 维度 <= 2000（如改为 1024 维）时直接在 vector 列上建索引：
+-- CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_embedding_hnsw ON pulseglobe_news
+-- USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 
 -- ========== 或者 IVFFlat 索引 ==========
 -- 优点：构建速度快
 -- 缺点：召回质量略低
--- 需要有数据后才能创建，lists 建议设置为 sqrt(行数)
--- CREATE INDEX idx_news_embedding_ivfflat
+-- 需要有数据后才能创建，lists 建议设置为 行数 / 1000（100 万行以上为 sqrt(行数)），
+-- manage_vector_index.py build --method ivfflat 会自动计算
+-- CREATE INDEX CONCURRENTLY idx_news_embedding_ivfflat
 -- ON pulseglobe_news
--- USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+-- USING ivfflat ((embedding::halfvec(2560)) halfvec_cosine_ops) WITH (lists = 100);
 
 -- ========== 查询示例 ==========
--- 相似度搜索（带日期过滤）
+-- 相似度搜索（带日期过滤），ORDER BY 与索引表达式一致
 -- SELECT doc_id, title,
 --        1 - (embedding <=> '[0.1, 0.2, ...]'::vector) AS similarity
 -- FROM pulseglobe_news
 -- WHERE source_country = 'MN'
 --   AND publish_date BETWEEN '2025-12-01' AND '2025-12-31'
--- ORDER BY embedding <=> '[0.1, 0.2, ...]'::vector
+-- ORDER BY (embedding::halfvec(2560)) <=> '[0.1, 0.2, ...]'::halfvec(2560)
 -- LIMIT 10;
 
 -- ========== 查看索引状态 ==========
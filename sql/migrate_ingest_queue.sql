@@ -0,0 +1,21 @@
+-- ============================================
+-- news_articles 入库流水线索引
+--   scripts/ingest_news.py 按 id 键集分页读取蒙语文章（id > 水位），
+--   部分索引使每次读取只扫描水位之后的新文章，不随表大小增长
+-- 用法：
+--   psql -d news_db -f migrate_ingest_queue.sql
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_news_articles_mn_id
+ON news_articles (id)
+WHERE language = 'mn';
+
+-- 其余查询均使用已有的唯一索引：
+--   news_articles_mn_zh.original_id（LEFT JOIN 带出已有译文、译文 upsert）
+--   pulseglobe_news.doc_id（入库 upsert、向量回写）
+
+-- ========== 验证 ==========
+-- EXPLAIN SELECT id FROM news_articles s
+-- WHERE s.language = 'mn' AND s.id > 100000
+-- ORDER BY s.id
+-- LIMIT 100;
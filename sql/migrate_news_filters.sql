@@ -0,0 +1,38 @@
+-- ============================================
+-- pulseglobe_news 过滤检索索引
+-- NewsRetriever 的日期 / 国家过滤条件会下推到向量检索中：
+--   pgvector >= 0.8：使用迭代扫描（settings.yaml rag.iterative_scan），
+--                    HNSW 扫描过滤后不足 limit 时继续扫描，无需额外索引
+--   pgvector <  0.8：按国家建部分 HNSW 索引，过滤后的候选集直接来自该国索引
+-- 用法：psql -d news_db -f migrate_news_filters.sql
+--   索引用 CONCURRENTLY 构建，不阻塞线上读写；不要用 psql -1 或在事务块中执行。
+--   构建中断会留下 INVALID 索引，DROP INDEX CONCURRENTLY 后重跑
+-- 注意：vector 类型的 HNSW 索引最多 2000 维，2560 维按 halfvec 表达式建索引（pgvector >= 0.7.0），
+--   表达式须与 retrieval.vector_order 完全一致
+-- ============================================
+
+-- ========== 1. 过滤列 B-tree 索引 ==========
+-- 选择性很高的日期窗口（如最近 3 天）由规划器直接走此索引再精确排序
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_country_date ON pulseglobe_news (source_country, publish_date);
+
+-- ========== 2. 按国家的部分 HNSW 索引 ==========
+-- 每个主要国家一条；查询条件 source_country = 'MN' 与索引谓词一致时自动使用。
+-- 维度 <= 2000 时改用 USING hnsw (embedding vector_cosine_ops)；
+-- 也可用 python scripts/manage_vector_index.py build --country MN 构建（自动使用同一表达式）；
+-- 使用 rag.first_pass = halfvec 时改为在 embedding_half 列上建（migrate_news_quantized.sql），即
+--   python scripts/manage_vector_index.py build --column embedding_half --country MN
+SET maintenance_work_mem = '2GB';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_embedding_hnsw_mn ON pulseglobe_news
+USING hnsw ((embedding::halfvec(2560)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64)
+WHERE source_country = 'MN';
+
+-- ========== 验证 ==========
+-- BEGIN;
+-- SET LOCAL hnsw.ef_search = 100;
+-- SET LOCAL hnsw.iterative_scan = relaxed_order;
+-- EXPLAIN SELECT doc_id FROM pulseglobe_news
+-- WHERE source_country = 'MN' AND publish_date >= '2025-12-01'
+-- ORDER BY (embedding::halfvec(2560)) <=> '[...]'::halfvec(2560) LIMIT 15;
+-- ROLLBACK;
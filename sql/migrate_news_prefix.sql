@@ -0,0 +1,26 @@
+-- ============================================
+-- pulseglobe_news 截断前缀向量（Matryoshka 两阶段检索）
+--   embedding_prefix vector(512)：全精度 embedding 的前 512 维，重新归一化
+--   HNSW 建在 512 维前缀上，索引约为全维度的 1/5；候选再用全精度 embedding 重排
+-- NewsRetriever 在 rag.first_pass = prefix 时使用
+-- 用法：
+--   psql -d news_db -f migrate_news_prefix.sql     # 第 1 步
+--   uv run scripts/vectorize_news.py --backfill-prefix
+--   然后执行下方第 2 步建索引（CONCURRENTLY 构建，不阻塞线上读写；不要用 psql -1 或在事务块中执行，
+--   构建中断会留下 INVALID 索引，DROP INDEX CONCURRENTLY 后重跑），或者
+--   python scripts/manage_vector_index.py build --column embedding_prefix（同名，带进度与召回探测）
+-- 注意：维度需与 settings.yaml 中 embedding.prefix_dimensions 一致
+-- ============================================
+
+-- ========== 1. 前缀列 ==========
+ALTER TABLE pulseglobe_news ADD COLUMN IF NOT EXISTS embedding_prefix vector(512);
+
+-- ========== 2. 索引（回填完成后执行） ==========
+SET maintenance_work_mem = '1GB';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_embedding_prefix_hnsw ON pulseglobe_news USING hnsw (embedding_prefix vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- ========== 验证 ==========
+-- SELECT COUNT(*) FILTER (WHERE embedding_prefix IS NULL AND embedding IS NOT NULL) AS pending
+-- FROM pulseglobe_news;
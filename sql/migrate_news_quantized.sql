@@ -0,0 +1,49 @@
+-- ============================================
+-- pulseglobe_news 半精度 / 二值量化向量
+--   embedding_half halfvec(2560)：全精度向量的半精度副本，单行 5 KB（原 10 KB）
+--   HNSW (halfvec_cosine_ops)：vector 类型 HNSW 最多 2000 维，2560 维只能用 halfvec 建索引
+--   HNSW (binary_quantize → bit, bit_hamming_ops)：每维 1 bit，索引约为 halfvec 的 1/16
+-- NewsRetriever 通过 rag.first_pass 选择第一阶段索引，候选再用全精度 embedding 精确重排
+-- 依赖：pgvector >= 0.7.0
+-- 用法：
+--   psql -d news_db -f migrate_news_quantized.sql
+--   python scripts/backfill_quantized.py          # 回填存量数据
+--   然后执行下方第 3 步建索引（CONCURRENTLY 构建，不阻塞线上读写；不要用 psql -1 或在事务块中执行，
+--   构建中断会留下 INVALID 索引，DROP INDEX CONCURRENTLY 后重跑）；半精度索引也可用
+--   python scripts/manage_vector_index.py build --column embedding_half 构建（同名，带进度与召回探测）
+-- 注意：维度需与 settings.yaml 中 embedding.dimensions 一致
+-- ============================================
+
+-- ========== 1. 半精度列 ==========
+ALTER TABLE pulseglobe_news ADD COLUMN IF NOT EXISTS embedding_half halfvec(2560);
+
+-- ========== 2. 写入 embedding 时同步半精度副本 ==========
+CREATE OR REPLACE FUNCTION pulseglobe_news_sync_half()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.embedding_half := NEW.embedding::halfvec(2560);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_news_sync_half ON pulseglobe_news;
+
+CREATE TRIGGER trg_news_sync_half
+BEFORE INSERT OR UPDATE OF embedding ON pulseglobe_news
+FOR EACH ROW EXECUTE FUNCTION pulseglobe_news_sync_half();
+
+-- ========== 3. 索引（回填完成后执行） ==========
+-- 表达式须与 NewsRetriever._first_pass_expr 完全一致
+SET maintenance_work_mem = '2GB';
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_embedding_half_hnsw ON pulseglobe_news USING hnsw (embedding_half halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_news_embedding_bit_hnsw ON pulseglobe_news USING hnsw ((binary_quantize(embedding_half)::bit(2560)) bit_hamming_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- ========== 验证 ==========
+-- SELECT pg_size_pretty(pg_relation_size('idx_news_embedding_half_hnsw')),
+--        pg_size_pretty(pg_relation_size('idx_news_embedding_bit_hnsw'));
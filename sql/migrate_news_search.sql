@@ -0,0 +1,22 @@
+-- ============================================
+-- pulseglobe_news 全文检索列（RAG 混合检索）
+--   search_vector 生成列 + GIN 索引（标题权重 A，正文权重 B）
+--   NewsRetriever 在 mode=hybrid 时与 HNSW 向量检索在同一条 SQL 中做倒数排名融合
+-- 依赖：create_search_functions.sql（需先执行）
+-- 用法：psql -d news_db -f migrate_news_search.sql
+-- 注意：添加生成列会重写全表，大表请在低峰期执行
+-- ============================================
+
+ALTER TABLE pulseglobe_news
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', pulseglobe_search_text(coalesce(title, ''))), 'A') ||
+    setweight(to_tsvector('simple', pulseglobe_search_text(left(coalesce(content, ''), 20000))), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_news_search ON pulseglobe_news USING GIN (search_vector);
+
+-- ========== 验证 ==========
+-- SELECT doc_id, title FROM pulseglobe_news
+-- WHERE search_vector @@ pulseglobe_search_query('矿业部')
+-- LIMIT 10;
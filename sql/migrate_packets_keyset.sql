@@ -0,0 +1,8 @@
+-- ============================================
+-- data_packets 键集分页索引
+-- PacketStorage.iter_session_pages / astream_* 按 (session_id, id) 翻页
+-- 用法：psql -d pulseglobe -f migrate_packets_keyset.sql
+-- ============================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_packets_session_id
+    ON data_packets (session_id, id);
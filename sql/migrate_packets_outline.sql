@@ -0,0 +1,62 @@
+-- ============================================
+-- data_packets 大纲摘要排序
+--   1. pulseglobe_packet_signal(): 由 engagement 计算组内排序信号
+--        rag     -> similarity（向量相似度）
+--        tavily  -> score（搜索相关度）
+--        social  -> ln(1 + 点赞 + 2*(转发 + 评论)) + 0.5*ln(1 + 播放)
+--   2. rank_signal 生成列 + 覆盖索引 (session_id, source_type, keyword, rank_signal DESC, id)
+--      PacketStorage.get_outline_digest 的窗口函数可直接按索引顺序读取，无需排序
+-- 用法：psql -d pulseglobe -f migrate_packets_outline.sql
+-- ============================================
+
+-- ========== 1. 排序信号 ==========
+CREATE OR REPLACE FUNCTION pulseglobe_packet_signal(engagement jsonb)
+RETURNS real
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE
+AS $$
+DECLARE
+    likes numeric := 0;
+    shares numeric := 0;
+    views numeric := 0;
+BEGIN
+    IF engagement IS NULL THEN
+        RETURN NULL;
+    END IF;
+    IF jsonb_typeof(engagement -> 'similarity') = 'number' THEN
+        RETURN (engagement ->> 'similarity')::real;
+    END IF;
+    IF jsonb_typeof(engagement -> 'score') = 'number' THEN
+        RETURN (engagement ->> 'score')::real;
+    END IF;
+
+    -- 只取数值型字段，避免异常数据导致写入失败
+    IF jsonb_typeof(engagement -> 'likes') = 'number' THEN
+        likes := greatest((engagement ->> 'likes')::numeric, 0);
+    END IF;
+    IF jsonb_typeof(engagement -> 'retweets') = 'number' THEN
+        shares := shares + greatest((engagement ->> 'retweets')::numeric, 0);
+    END IF;
+    IF jsonb_typeof(engagement -> 'comments_count') = 'number' THEN
+        shares := shares + greatest((engagement ->> 'comments_count')::numeric, 0);
+    END IF;
+    IF jsonb_typeof(engagement -> 'views') = 'number' THEN
+        views := greatest((engagement ->> 'views')::numeric, 0);
+    END IF;
+
+    IF likes + shares + views = 0 THEN
+        RETURN NULL;
+    END IF;
+    RETURN (ln(1 + likes + 2 * shares) + 0.5 * ln(1 + views))::real;
+END;
+$$;
+
+-- ========== 2. 排序列与覆盖索引 ==========
+ALTER TABLE data_packets
+ADD COLUMN IF NOT EXISTS rank_signal real
+GENERATED ALWAYS AS (pulseglobe_packet_signal(engagement)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_packets_outline
+    ON data_packets (session_id, source_type, keyword, rank_signal DESC NULLS LAST, id);
+
+-- ========== 验证 ==========
+-- SELECT pulseglobe_packet_signal('{"likes": 120, "retweets": 30, "views": 5000}');
@@ -0,0 +1,35 @@
+-- ============================================
+-- data_packets 全文检索与子串检索
+--   1. search_vector 生成列 + GIN 索引（title > summary > content_zh > content）
+--      中文切分见 create_search_functions.sql（需先执行）
+--   2. pg_trgm GIN 索引：keyword / title / content_zh 的 ILIKE 子串匹配
+-- 用法：psql -d pulseglobe -f migrate_packets_search.sql
+-- 注意：添加生成列会重写全表，大表请在低峰期执行
+-- ============================================
+
+-- ========== 1. 全文检索列 ==========
+ALTER TABLE data_packets
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', pulseglobe_search_text(coalesce(title, ''))), 'A') ||
+    setweight(to_tsvector('simple', pulseglobe_search_text(coalesce(summary, ''))), 'B') ||
+    setweight(to_tsvector('simple', pulseglobe_search_text(coalesce(content_zh, ''))), 'C') ||
+    -- 原文可能很长，只索引前 20000 字符，避免超出 tsvector 上限
+    setweight(to_tsvector('simple', pulseglobe_search_text(left(coalesce(content, ''), 20000))), 'D')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_packets_search ON data_packets USING GIN (search_vector);
+
+-- ========== 2. 子串检索（pg_trgm） ==========
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_packets_keyword_trgm ON data_packets USING GIN (keyword gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_packets_title_trgm ON data_packets USING GIN (title gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_packets_content_zh_trgm ON data_packets USING GIN (content_zh gin_trgm_ops);
+
+-- ========== 验证 ==========
+-- SELECT pulseglobe_search_text('蒙古国矿业 Oyu Tolgoi');
+-- EXPLAIN SELECT id FROM data_packets
+-- WHERE session_id = 'sess_xxx' AND search_vector @@ pulseglobe_search_query('矿业投资');
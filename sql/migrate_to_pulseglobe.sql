@@ -1,6 +1,7 @@
 -- ============================================
 -- 数据迁移脚本：news_articles_mn_zh → pulseglobe_news
 -- 用途：将翻译后的中文新闻导入 RAG 向量库
+-- 日常增量入库请使用 scripts/ingest_news.py（翻译、入库、向量化一条流水线）
 -- ============================================
 
 -- ========== 配置区域 ==========
@@ -0,0 +1,21 @@
+-- ============================================
+-- news_articles 蒙语翻译队列索引
+--   scripts/translate_mn_news.py 按 (发布日期, id) 从新到旧键集分页读取待翻译文章，
+--   无发布日期的文章排在最后；表达式须与脚本中的 SORT_KEY 一致
+--   上一轮之后入库的文章按 id > head 读取（主键范围扫描），补录的旧日期文章也不会遗漏
+-- 用法：
+--   psql -d news_db -f migrate_translation_queue.sql
+-- ============================================
+
+CREATE INDEX IF NOT EXISTS idx_news_articles_mn_queue
+ON news_articles ((COALESCE(publish_date, DATE '1900-01-01')) DESC, id DESC)
+WHERE language = 'mn';
+
+-- 反连接判断是否已翻译（create_mn_zh_table.sql 的 UNIQUE 约束已提供索引）
+-- SELECT indexname FROM pg_indexes WHERE tablename = 'news_articles_mn_zh';
+
+-- ========== 验证 ==========
+-- EXPLAIN SELECT id FROM news_articles s
+-- WHERE s.language = 'mn'
+-- ORDER BY COALESCE(s.publish_date, DATE '1900-01-01') DESC, s.id DESC
+-- LIMIT 100;
@@ -0,0 +1,57 @@
+"""
+正文分段测试
+"""
+import pytest
+
+from pulseglobe.services.chunking import chunk_text, split_sentences
+
+
+class TestSplitSentences:
+    """句子边界"""
+
+    def test_chinese_and_cyrillic(self):
+        text = "蒙古国总统访华。双方签署了协议！  Монгол Улсын Ерөнхийлөгч айлчлав. Гэрээ байгуулав?\n第三段"
+        sentences = [text[start:end] for start, end in split_sentences(text)]
+        assert sentences == [
+            "蒙古国总统访华。",
+            "双方签署了协议！",
+            "Монгол Улсын Ерөнхийлөгч айлчлав.",
+            "Гэрээ байгуулав?",
+            "第三段",
+        ]
+
+    def test_keeps_decimals_and_closing_quotes(self):
+        text = "增长率为3.5%。他说：“会继续合作。”随后离开"
+        sentences = [text[start:end] for start, end in split_sentences(text)]
+        assert sentences == ["增长率为3.5%。", "他说：“会继续合作。”", "随后离开"]
+
+
+class TestChunkText:
+    """段落合并"""
+
+    def test_respects_limit_and_offsets(self):
+        text = "".join(f"第{i}句话讲述了一件事。" for i in range(40))
+        chunks = chunk_text(text, max_chars=50, overlap=0)
+        assert len(chunks) > 1
+        assert all(len(c.text) <= 50 for c in chunks)
+        assert all(text[c.start:c.end] == c.text for c in chunks)
+        assert "".join(c.text for c in chunks) == text
+        assert [c.no for c in chunks] == list(range(len(chunks)))
+
+    def test_overlap_repeats_last_sentence(self):
+        text = "".join(f"第{i}句。" for i in range(10))
+        chunks = chunk_text(text, max_chars=12, overlap=1)
+        for previous, current in zip(chunks, chunks[1:]):
+            last_sentence = previous.text[previous.text.rstrip("。").rfind("。") + 1:]
+            assert current.text.startswith(last_sentence)
+
+    def test_long_sentence_is_split(self):
+        text = "长" * 130
+        chunks = chunk_text(text, max_chars=50)
+        assert [len(c.text) for c in chunks] == [50, 50, 30]
+
+    def test_empty(self):
+        assert chunk_text("") == []
+        assert chunk_text("   \n ") == []
+        with pytest.raises(ValueError):
+            chunk_text("内容", max_chars=0)
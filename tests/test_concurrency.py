@@ -0,0 +1,91 @@
+"""
+自适应并发控制测试
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from pulseglobe.core.concurrency import AdaptiveLimiter, is_overload
+
+
+def _status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example.com/v1/embeddings")
+    response = httpx.Response(status, request=request, headers=headers)
+    return httpx.HTTPStatusError(f"{status}", request=request, response=response)
+
+
+class TestAdaptiveLimiter:
+    """AIMD 调整与退避重试"""
+
+    def test_is_overload(self):
+        assert is_overload(_status_error(429))
+        assert is_overload(_status_error(503))
+        assert is_overload(httpx.ReadTimeout("timeout"))
+        assert not is_overload(_status_error(400))
+        assert not is_overload(ValueError("bad json"))
+
+    def test_grows_when_saturated_and_halves_on_overload(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial=2, max_limit=8)
+
+            async def call():
+                await asyncio.sleep(0.001)
+
+            for _ in range(10):
+                await asyncio.gather(*(limiter.run(call) for _ in range(limiter.current_limit)))
+            grown = limiter.current_limit
+
+            async def overloaded():
+                raise _status_error(429)
+
+            with pytest.raises(httpx.HTTPStatusError):
+                await limiter.run(overloaded, retries=0)
+            return grown, limiter.current_limit
+
+        grown, after = asyncio.run(scenario())
+        assert grown > 2
+        assert after == max(1, int(grown / 2))
+
+    def test_respects_limit(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial=3, max_limit=3)
+            peak = 0
+
+            async def call():
+                nonlocal peak
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.001)
+
+            await asyncio.gather(*(limiter.run(call) for _ in range(20)))
+            return peak, limiter.in_flight
+
+        peak, remaining = asyncio.run(scenario())
+        assert peak == 3
+        assert remaining == 0
+
+    def test_retries_overload_but_not_client_errors(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial=2)
+            attempts = {"flaky": 0, "bad": 0}
+
+            async def flaky():
+                attempts["flaky"] += 1
+                if attempts["flaky"] < 3:
+                    raise _status_error(503, headers={"Retry-After": "0"})
+                return "ok"
+
+            async def bad():
+                attempts["bad"] += 1
+                raise _status_error(400)
+
+            result = await limiter.run(flaky, base_delay=0.001)
+            with pytest.raises(httpx.HTTPStatusError):
+                await limiter.run(bad, base_delay=0.001)
+            return result, attempts, limiter.stats
+
+        result, attempts, stats = asyncio.run(scenario())
+        assert result == "ok"
+        assert attempts == {"flaky": 3, "bad": 1}
+        assert stats["retries"] == 2
+        assert stats["overload"] == 2
@@ -0,0 +1,77 @@
+"""
+数据包模型测试
+"""
+import hashlib
+
+from pulseglobe.models import DataPacket, PacketBatch
+
+
+def _packet(i: int, session_id: str = "sess_1", **kwargs) -> DataPacket:
+    return DataPacket(
+        session_id=session_id,
+        source_type="rag",
+        title=f"标题{i}",
+        content=f"内容{i}",
+        url=f"https://news.example.mn/{i}",
+        **kwargs,
+    )
+
+
+class TestDataPacket:
+    """DataPacket 测试"""
+
+    def test_slots(self):
+        """实例没有 __dict__"""
+        assert not hasattr(_packet(1), "__dict__")
+
+    def test_content_hash_matches_original_formula(self):
+        """哈希与数据库中已有记录的算法保持一致"""
+        packet = _packet(1)
+        text = f"{packet.source_type}:{packet.url}:{packet.title}:{packet.content[:500]}"
+        assert packet.content_hash == hashlib.sha256(text.encode()).hexdigest()
+
+    def test_content_hash_cached_and_invalidated(self):
+        """哈希缓存只在相关字段变化时失效"""
+        packet = _packet(1)
+        original = packet.content_hash
+
+        packet.keyword = "新关键词"
+        assert packet._cached_hash() == original
+
+        packet.content = "修改后的内容"
+        assert packet._cached_hash() is None
+        assert packet.content_hash != original
+        assert packet._cached_hash() == packet.content_hash
+
+    def test_from_dict_reuses_stored_hash(self):
+        """从数据库行构建时复用 content_hash 列"""
+        packet = DataPacket.from_dict({"session_id": "s", "source_type": "rag", "content_hash": "abc"})
+        assert packet.content_hash == "abc"
+
+
+class TestPacketBatch:
+    """PacketBatch 测试"""
+
+    def test_hashes_match_packets(self):
+        """批量哈希与单包哈希一致"""
+        packets = [_packet(i) for i in range(5)]
+        batch = PacketBatch.from_packets(_packet(i) for i in range(5))
+        assert batch.content_hashes() == [p.content_hash for p in packets]
+
+    def test_dedup_keeps_first_per_session(self):
+        """按 (session_id, content_hash) 去重"""
+        packets = [_packet(1), _packet(2), _packet(1), _packet(1, session_id="sess_2")]
+        unique = PacketBatch.from_packets(packets).dedup()
+
+        assert len(unique) == 3
+        assert unique.column("session_id") == ["sess_1", "sess_1", "sess_2"]
+
+    def test_rows_and_round_trip(self):
+        """rows 按插入列顺序输出，to_packets 可还原"""
+        packet = _packet(1, engagement={"likes": 3})
+        batch = PacketBatch.from_packets([packet])
+
+        row = next(batch.rows())
+        assert len(row) == len(PacketBatch.COLUMNS) + 1
+        assert row[-1] == packet.content_hash
+        assert batch.to_packets() == [packet]
@@ -0,0 +1,39 @@
+"""
+MMR 重排测试
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pulseglobe.services.diversity import mmr, parse_vector
+
+
+class TestMMR:
+    """最大边际相关选择"""
+
+    def test_lambda_one_is_relevance_order(self):
+        rng = np.random.default_rng(0)
+        candidates = rng.standard_normal((20, 8))
+        query = rng.standard_normal(8)
+
+        normalized = candidates / np.linalg.norm(candidates, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ query))[:5].tolist()
+        assert mmr(query, candidates, 5, lambda_=1.0) == expected
+
+    def test_skips_near_duplicates(self):
+        query = np.array([1.0, 0.0, 0.0])
+        candidates = np.array([
+            [0.95, 0.30, 0.0],    # 原稿
+            [0.95, 0.31, 0.0],    # 转载，几乎相同
+            [0.90, 0.0, 0.43],    # 不同角度
+        ])
+        assert mmr(query, candidates, 2, lambda_=1.0) == [0, 1]
+        assert mmr(query, candidates, 2, lambda_=0.5) == [0, 2]
+
+    def test_k_larger_than_candidates(self):
+        candidates = np.eye(3)
+        assert sorted(mmr([1, 1, 1], candidates, 10)) == [0, 1, 2]
+        assert mmr([1, 0, 0], np.empty((0, 3)), 5) == []
+
+    def test_parse_vector(self):
+        assert parse_vector("[0.5,-1,2e-3]").tolist() == pytest.approx([0.5, -1.0, 0.002])
@@ -0,0 +1,37 @@
+"""
+向量列配置测试
+"""
+import pytest
+
+from pulseglobe.core.config import embedding_columns, embedding_profile
+
+EMBEDDING = {
+    "model": "Qwen/Qwen3-Embedding-4B",
+    "dimensions": 2560,
+    "base_url": "https://api.siliconflow.cn/v1",
+    "active_column": "embedding",
+    "columns": {"embedding_v2": {"model": "BAAI/bge-m3", "dimensions": 1024}},
+}
+
+
+class TestEmbeddingProfile:
+    """按列合并模型配置"""
+
+    def test_active_column_by_default(self):
+        profile = embedding_profile(EMBEDDING)
+        assert profile["column"] == "embedding"
+        assert profile["model"] == "Qwen/Qwen3-Embedding-4B"
+        assert "columns" not in profile
+
+    def test_column_overrides_keep_defaults(self):
+        profile = embedding_profile({**EMBEDDING, "active_column": "embedding_v2"})
+        assert (profile["column"], profile["model"], profile["dimensions"]) == ("embedding_v2", "BAAI/bge-m3", 1024)
+        assert profile["base_url"] == EMBEDDING["base_url"]
+
+    def test_rejects_invalid_column(self):
+        with pytest.raises(ValueError):
+            embedding_profile(EMBEDDING, "embedding; DROP TABLE x")
+
+    def test_columns(self):
+        assert embedding_columns(EMBEDDING) == ["embedding", "embedding_v2"]
+        assert embedding_columns({}) == ["embedding"]
@@ -0,0 +1,74 @@
+"""
+会话导出测试（内存中的行，不连接数据库）
+"""
+from datetime import datetime
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from pulseglobe.services.export import SessionExporter, arrow_schema, open_export, resolve_columns
+
+
+class FakeCursor:
+    """按 fetchmany 分批返回预置行的服务端游标"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.itersize = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params):
+        self.query = query
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def cursor(self, name=None):
+        return FakeCursor(self.rows)
+
+    def rollback(self):
+        pass
+
+
+class FakeStorage:
+    def __init__(self, rows):
+        self.conn = FakeConnection(rows)
+
+    def _get_connection(self):
+        return self.conn
+
+
+# summaries 投影：id, source_type, keyword, title, summary, url, publish_date, engagement
+ROWS = [
+    (i, "rag", "矿业", f"标题{i}", f"摘要{i}", f"https://news.example.mn/{i}",
+     datetime(2025, 1, i % 28 + 1), '{"likes": %d}' % i)
+    for i in range(1, 26)
+]
+
+
+@pytest.mark.parametrize("fmt, suffix, compression", [("parquet", "parquet", "zstd"), ("arrow", "arrow", "none")])
+def test_export_session(tmp_path, fmt, suffix, compression):
+    exporter = SessionExporter(storage=FakeStorage(ROWS))
+    path = tmp_path / f"sess.{suffix}"
+
+    stats = exporter.export_session(
+        "sess_1", str(path), columns="summaries", format=fmt, compression=compression, batch_size=10,
+    )
+    assert (stats["rows"], stats["batches"]) == (25, 3)
+
+    table = open_export(str(path))
+    assert table.schema == arrow_schema(resolve_columns("summaries"))
+    assert table.num_rows == 25
+    assert table.column("title").to_pylist() == [row[3] for row in ROWS]
@@ -0,0 +1,87 @@
+"""
+mmap 索引测试
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pulseglobe.services.mmap_index import MmapIndexWriter, MmapNewsIndex
+
+
+def _build(path, vectors, rows, allocate=None):
+    with MmapIndexWriter(path, allocate or len(rows), vectors.shape[1], model="test") as writer:
+        for start in range(0, len(rows), 7):
+            writer.append(rows[start:start + 7], vectors[start:start + 7])
+    return MmapNewsIndex(path, chunk_rows=16)
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, 8)).astype(np.float32)
+    rows = [
+        {
+            "doc_id": f"doc_{i}",
+            "title": f"标题{i}",
+            "content": "",
+            "url": f"https://example.mn/{i}",
+            "source_name": "test",
+            "publish_date": f"2025-{i % 12 + 1:02d}-01" if i % 5 else None,
+            "source_country": "MN" if i % 2 else "CN",
+        }
+        for i in range(50)
+    ]
+    return vectors, rows
+
+
+class TestMmapNewsIndex:
+    """分块 top-k 与精确检索一致"""
+
+    def test_matches_brute_force(self, tmp_path, corpus):
+        vectors, rows = corpus
+        index = _build(tmp_path / "idx", vectors, rows)
+        query = vectors[3] + 0.1
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+
+        hits = index.search(query, 10)
+        assert [row for row, _ in hits] == expected.tolist()
+        assert hits[0][1] == pytest.approx(float(normalized[expected[0]] @ (query / np.linalg.norm(query))), abs=1e-5)
+        assert index.fetch([hits[0][0]])[hits[0][0]]["doc_id"] == f"doc_{expected[0]}"
+        index.close()
+
+    def test_search_many_matches_search(self, tmp_path, corpus):
+        vectors, rows = corpus
+        index = _build(tmp_path / "idx", vectors, rows)
+
+        batch = index.search_many(vectors[:4], 5, country="MN")
+        for hits, vector in zip(batch, vectors[:4]):
+            single = index.search(vector, 5, country="MN")
+            assert [row for row, _ in hits] == [row for row, _ in single]
+            assert [score for _, score in hits] == pytest.approx([score for _, score in single], abs=1e-5)
+        index.close()
+
+    def test_filters(self, tmp_path, corpus):
+        vectors, rows = corpus
+        index = _build(tmp_path / "idx", vectors, rows)
+
+        hits = index.search(vectors[0], 50, date_from="2025-06-01", country="MN")
+        allowed = {
+            i for i, row in enumerate(rows)
+            if row["source_country"] == "MN" and row["publish_date"] and row["publish_date"] >= "2025-06-01"
+        }
+        assert {row for row, _ in hits} == allowed
+
+        # 无日期的文档不满足日期上限
+        hits = index.search(vectors[0], 50, date_to="2025-12-31")
+        assert all(rows[row]["publish_date"] for row, _ in hits)
+        index.close()
+
+    def test_truncates_unused_rows(self, tmp_path, corpus):
+        vectors, rows = corpus
+        index = _build(tmp_path / "idx", vectors[:20], rows[:20], allocate=30)
+        assert len(index) == 20
+        assert index.manifest["count"] == 20
+        assert len(index.search(vectors[0], 50)) == 20
+        index.close()
@@ -0,0 +1,38 @@
+"""
+独立脚本的导入测试
+
+scripts/ 下的 PEP 723 脚本只声明了自身用到的依赖（uv run 时不安装 langchain 等），
+在屏蔽这些包的子进程中导入脚本，确保其经 pulseglobe 包的导入链不依赖它们
+"""
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+SCRIPTS = Path(__file__).resolve().parent.parent / "scripts"
+
+# 项目依赖中 PEP 723 脚本未声明的包
+UNDECLARED = ("langchain", "langchain_core", "langchain_openai", "langgraph", "tavily")
+
+IMPORT_CHECK = textwrap.dedent("""
+    import importlib, importlib.abc, sys
+
+    class Blocker(importlib.abc.MetaPathFinder):
+        def find_spec(self, name, path, target=None):
+            if name.split(".")[0] in {blocked!r}:
+                raise ModuleNotFoundError(f"No module named {{name!r}}")
+
+    sys.meta_path.insert(0, Blocker())
+    sys.path.insert(0, {scripts!r})
+    importlib.import_module({module!r})
+""")
+
+
+@pytest.mark.parametrize("module", ["vectorize_news", "translate_mn_news", "ingest_news"])
+def test_script_imports_without_undeclared_dependencies(module, tmp_path):
+    code = IMPORT_CHECK.format(blocked=UNDECLARED, scripts=str(SCRIPTS), module=module)
+    # 脚本在导入时创建日志文件，放到临时目录
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,49 @@
+"""
+数据包存储测试（不连接数据库）
+"""
+import re
+
+import pytest
+
+from pulseglobe.services.storage import PacketStorage
+
+
+class FakeStorage(PacketStorage):
+    """按查询的列投影返回内存中的行"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def _fetch_page(self, query, params, session_id):
+        self.queries.append(query)
+        columns = re.match(r"SELECT (.+?) FROM", query).group(1).split(", ")
+        last_id = params[1]
+        rows = [r for r in self.rows if r["id"] > last_id][: params[-1]]
+        return [{c: r[c] for c in columns} for r in rows]
+
+
+ROWS = [
+    {
+        "id": i, "session_id": "sess_1", "source_type": "rag",
+        "title": f"标题{i}", "summary": f"摘要{i}", "content": f"内容{i}",
+        "url": f"https://news.example.mn/{i}", "content_hash": f"hash{i}",
+    }
+    for i in range(1, 6)
+]
+
+
+class TestAstreamPackets:
+    """列投影读取"""
+
+    @pytest.mark.asyncio
+    async def test_narrow_projection(self):
+        storage = FakeStorage(ROWS)
+        packets = [p async for p in storage.astream_packets("sess_1", columns=("title", "summary"), page_size=2)]
+
+        assert [p.title for p in packets] == [f"标题{i}" for i in range(1, 6)]
+        assert all(p.session_id == "sess_1" and p.source_type == "rag" for p in packets)
+        # 未投影的字段取默认值，哈希沿用库中存储的值而不是由部分字段计算
+        assert all(p.content == "" for p in packets)
+        assert [p.content_hash for p in packets] == [f"hash{i}" for i in range(1, 6)]
+        assert len(storage.queries) == 3
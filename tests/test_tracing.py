@@ -0,0 +1,120 @@
+"""
+链路追踪测试
+"""
+import asyncio
+
+import pytest
+
+from pulseglobe.core.tracing import (
+    Span,
+    SpanExporter,
+    Tracer,
+    critical_path,
+    group_by_session,
+    set_tracer,
+    span,
+    trace_context,
+    traced,
+)
+
+
+class ListExporter(SpanExporter):
+    """收集到内存列表的导出器"""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, spans: list[Span]):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exporter():
+    exporter = ListExporter()
+    tracer = Tracer(exporter, batch_size=1)
+    set_tracer(tracer)
+    yield exporter
+    set_tracer(None)
+
+
+def _make_span(name, span_id, parent_id, start, end):
+    return Span(name=name, trace_id="t", span_id=span_id, parent_id=parent_id,
+                start_time=start, end_time=end)
+
+
+class TestTracer:
+    """Tracer 测试"""
+
+    def test_nested_spans_inherit_parent_and_context(self, exporter):
+        """子 span 继承父 span 与上下文属性"""
+        with trace_context(session_id="sess_1"):
+            with span("parent"):
+                with trace_context(keyword="蒙古"):
+                    with span("child", stage="search"):
+                        pass
+
+        child, parent = exporter.spans
+        assert child.parent_id == parent.span_id
+        assert child.trace_id == parent.trace_id
+        assert child.attributes == {"session_id": "sess_1", "keyword": "蒙古", "stage": "search"}
+        assert parent.attributes == {"session_id": "sess_1"}
+
+    @pytest.mark.asyncio
+    async def test_gather_tasks_share_parent(self, exporter):
+        """asyncio.gather 中的任务挂在同一父 span 下"""
+        @traced("task")
+        async def task():
+            await asyncio.sleep(0)
+
+        with span("root"):
+            await asyncio.gather(task(), task())
+
+        root = exporter.spans[-1]
+        tasks = [s for s in exporter.spans if s.name == "task"]
+        assert len(tasks) == 2
+        assert all(s.parent_id == root.span_id for s in tasks)
+
+    def test_error_status(self, exporter):
+        """异常时记录错误状态并继续抛出"""
+        with pytest.raises(ValueError):
+            with span("failing"):
+                raise ValueError("boom")
+
+        assert exporter.spans[0].status == "error"
+        assert "boom" in exporter.spans[0].error
+
+    def test_disabled_tracer_is_noop(self):
+        """未配置导出器时不记录"""
+        tracer = Tracer()
+        with tracer.span("noop") as s:
+            s.set_attribute("key", "value")
+        assert not tracer.enabled
+
+
+class TestCriticalPath:
+    """关键路径测试"""
+
+    def test_parallel_children_pick_longest_branch(self):
+        """并行分支只保留决定总耗时的一支"""
+        spans = [
+            _make_span("root", "r", None, 0.0, 10.0),
+            _make_span("fast", "a", "r", 1.0, 3.0),
+            _make_span("slow", "b", "r", 1.0, 8.0),
+            _make_span("tail", "c", "r", 8.0, 9.5),
+            _make_span("leaf", "d", "b", 2.0, 7.0),
+        ]
+        path = critical_path(spans)
+
+        assert [s.name for s, _, _ in path] == ["root", "slow", "leaf", "tail"]
+        assert [depth for _, depth, _ in path] == [0, 1, 2, 1]
+        # root 自耗时 = 10 - (7 + 1.5)
+        assert path[0][2] == pytest.approx(1500)
+
+    def test_group_by_session(self):
+        """按 session_id 分组"""
+        a = _make_span("a", "1", None, 0, 1)
+        a.attributes["session_id"] = "s1"
+        b = _make_span("b", "2", None, 0, 1)
+
+        groups = group_by_session([a, b])
+        assert set(groups) == {"s1", "trace:t"}
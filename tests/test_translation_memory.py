@@ -0,0 +1,32 @@
+"""
+翻译记忆句段切分测试
+"""
+from pulseglobe.services.translation_memory import assemble, segment_key, split_segments
+
+
+class TestSegments:
+    """句段切分与拼接"""
+
+    def test_split_keeps_gaps(self):
+        text = "Өнөөдөр хурал болов. Сайд үг хэлэв.\n\nМонцамэ агентлаг"
+        segments, gaps = split_segments(text)
+        assert segments == ["Өнөөдөр хурал болов.", "Сайд үг хэлэв.", "Монцамэ агентлаг"]
+        assert gaps == ["", " ", "\n\n", ""]
+        assert "".join(g + s for g, s in zip(gaps, segments)) + gaps[-1] == text
+
+    def test_assemble_keeps_paragraphs(self):
+        _, gaps = split_segments("Нэг. Хоёр.\nГурав.")
+        assert assemble(["一。", "二。", "三。"], gaps) == "一。二。\n三。"
+
+    def test_long_sentence_and_merge(self):
+        segments, _ = split_segments("а" * 2500, max_chars=1000)
+        assert [len(s) for s in segments] == [1000, 1000, 500]
+
+        text = "Нэг. Хоёр. Гурав. Дөрөв."
+        merged, gaps = split_segments(text, max_chars=12, merge=True)
+        assert merged == ["Нэг. Хоёр.", "Гурав.", "Дөрөв."]
+        assert all(len(s) <= 12 for s in merged)
+
+    def test_key_ignores_whitespace_but_not_language(self):
+        assert segment_key("Монцамэ  агентлаг\n", "auto", "zh") == segment_key("Монцамэ агентлаг", "auto", "zh")
+        assert segment_key("Монцамэ агентлаг", "auto", "zh") != segment_key("Монцамэ агентлаг", "auto", "en")